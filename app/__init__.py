@@ -1,13 +1,24 @@
 # app/__init__.py
 from flask import Flask, render_template
 from config import config_by_name
-from .extensions import cache
+from .extensions import cache, databricks_pool, cache_warmer, export_jobs, metrics, profiler, summary_refresher, query_executor, http_compression, result_cache, last_known_good, warehouse_breaker, stale_marker
 
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config_by_name[config_name])
 
     cache.init_app(app)
+    databricks_pool.init_app(app)
+    query_executor.init_app(app)
+    result_cache.init_app(app)
+    last_known_good.init_app(app, prefix='LAST_KNOWN_GOOD', default_dir='tecnomundo_last_known_good')
+    warehouse_breaker.init_app(app)
+    export_jobs.init_app(app)
+    metrics.init_app(app)
+    stale_marker.init_app(app)
+    profiler.init_app(app)
+    # Después de métricas y perfilado: sus after_request ven ya el 304 o la respuesta comprimida.
+    http_compression.init_app(app)
 
     # Registrar Blueprints
     from .api import api_bp, actions_bp # Importar el nuevo blueprint
@@ -17,6 +28,9 @@ def create_app(config_name='default'):
     from .errors import register_error_handlers
     register_error_handlers(app)
 
+    cache_warmer.init_app(app)
+    summary_refresher.init_app(app)
+
     @app.route('/')
     def index():
         return render_template('dashboard.html')
@@ -1,14 +1,32 @@
-from flask import Blueprint, render_template, jsonify, request, abort, send_file
-from app.services.dashboard_service import DashboardService
-from app.services.pdf_service import PDFService
-from .extensions import cache
+from flask import Blueprint, render_template, jsonify, request, abort, send_file, current_app, Response, stream_with_context, url_for
+from werkzeug.local import LocalProxy
+from app.services.dashboard_service import get_dashboard_service, INVENTORY_FIELDS
+from app.services.inventory_index import normalize_inventory_filters
+from app.utils.warehouse_backend import WarehouseUnavailable
+from .extensions import databricks_pool, cache_warmer, export_jobs, metrics, profiler, summary_refresher, result_cache, last_known_good, warehouse_breaker
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE
+from app.utils.view_cache import cached_view
+from app.utils.dtypes import frame_to_records
+from app.utils.columnar import negotiate_columnar_format, columnar_cache_variant, columnar_response
+from app.utils.pagination import (
+    NDJSON_MIMETYPE,
+    parse_list_arg,
+    parse_fields,
+    parse_sort,
+    parse_pagination,
+    paginate_frame,
+    wants_ndjson,
+    iter_ndjson,
+)
 import logging
+import os
 from datetime import datetime
+from io import BytesIO
 
 api_bp = Blueprint('api', __name__, template_folder='templates', static_folder='static')
 actions_bp = Blueprint('actions', __name__)  # Nuevo Blueprint para acciones
-dashboard_service = DashboardService()
-pdf_service = PDFService()
+# El servicio se crea en la primera petición (ver get_dashboard_service), no al importar.
+dashboard_service = LocalProxy(get_dashboard_service)
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +36,7 @@ def index():
 
 
 @api_bp.route('/data/sales_analysis')
-@cache.cached(timeout=300, query_string=True)
+@cached_view(timeout=300, query_string=True, vary=lambda: columnar_cache_variant(request))
 def get_sales_analysis_data():
     logger.info("¡Endpoint de análisis de ventas ejecutado! No se encontró caché para esta petición.")
     try:
@@ -26,59 +44,231 @@ def get_sales_analysis_data():
         top_n = request.args.get('top_n', 10, type=int)
         if category and category.lower() == 'all':
             category = None
-        data = dashboard_service.get_sales_analysis_data(category, top_n)
+        mode = current_app.config.get('SALES_ANALYSIS_MODE', 'warehouse')
+        columnar_format = negotiate_columnar_format(request)
+        if columnar_format:
+            df = dashboard_service.get_top_products_frame(category, top_n, mode=mode)
+            if df is None:
+                return jsonify({"error": "No se pudieron obtener los datos"}), 500
+            return columnar_response(df, columnar_format)
+        data = dashboard_service.get_sales_analysis_data(category, top_n, mode=mode)
         return jsonify(data) if data else (jsonify({"error": "No se pudieron obtener los datos"}), 500)
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error en el endpoint /data/sales_analysis: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
 
 
 @api_bp.route('/categories')
-@cache.cached(timeout=3600)
+@cached_view(timeout=3600)
 def get_categories():
     logger.info("¡Endpoint de categorías ejecutado! No se encontró caché.")
     try:
         categories = dashboard_service.get_all_categories()
         return jsonify(categories)
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error en el endpoint /categories: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
 
 
 @api_bp.route('/data/inventory_analysis')
-@cache.cached(timeout=300, query_string=True)
+@cached_view(timeout=300, query_string=True, unless=lambda: wants_ndjson(request),
+             vary=lambda: columnar_cache_variant(request))
 def get_inventory_analysis_data():
     logger.info("¡Endpoint de análisis de inventario ejecutado! No se encontró caché para esta petición.")
+    query = _parse_inventory_query()
     try:
-        category = request.args.get('category')
-        if category and category.lower() == 'all':
-            category = None
-        data = dashboard_service.get_inventory_analysis_data(category)
-        if data is not None:
-            return jsonify(data)
-        else:
+        df = dashboard_service.query_inventory(query['filters'], query['sort_by'], query['descending'])
+        if df is None:
             return jsonify({"error": "No se pudieron obtener los datos de inventario"}), 500
+        df = df[query['fields']]
+
+        meta = None
+        if query['pagination']:
+            df, meta = paginate_frame(df, *query['pagination'])
+
+        if wants_ndjson(request):
+            return Response(stream_with_context(iter_ndjson(df)), mimetype=NDJSON_MIMETYPE)
+        columnar_format = negotiate_columnar_format(request)
+        if columnar_format:
+            return columnar_response(df, columnar_format)
+        if meta is not None:
+            return jsonify({"items": frame_to_records(df), **meta})
+        return jsonify(frame_to_records(df))
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error en el endpoint /data/inventory_analysis: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
 
 
+def _parse_inventory_query() -> dict:
+    """
+    Lee los filtros (`category`/`categoria`, `estado`, `stock_min`/`stock_max`,
+    `ventas_min`/`ventas_max` y `q` para buscar en el nombre), el orden (`sort`,
+    `order`), la proyección (`fields`) y la paginación (`limit`, `offset`, `cursor`)
+    comunes a los endpoints de inventario. Responde 400 si alguno no es válido.
+    """
+    args = request.args
+    categories = parse_list_arg(args, 'categoria')
+    category = args.get('category')
+    if category and category.lower() != 'all':
+        categories.append(category)
+    try:
+        filters = normalize_inventory_filters({
+            "categories": categories,
+            "statuses": parse_list_arg(args, 'estado'),
+            "stock_min": args.get('stock_min'),
+            "stock_max": args.get('stock_max'),
+            "sales_min": args.get('ventas_min'),
+            "sales_max": args.get('ventas_max'),
+            "name": args.get('q'),
+        })
+        sort_by, descending = parse_sort(args, INVENTORY_FIELDS)
+        return {
+            "filters": filters,
+            "sort_by": sort_by,
+            "descending": descending,
+            "fields": parse_fields(args, INVENTORY_FIELDS),
+            "pagination": parse_pagination(args),
+        }
+    except ValueError as e:
+        abort(400, description=str(e))
+
+
+@api_bp.route('/dashboard/bootstrap')
+@cached_view(timeout=300, query_string=True)
+def get_dashboard_bootstrap():
+    """
+    Paneles iniciales del dashboard en una sola petición, consultados en paralelo.
+    Si algún panel falla o no termina a tiempo, se devuelven los demás con un 503
+    (que no se cachea) y el detalle en `errors`.
+    """
+    category = request.args.get('category')
+    if category and category.lower() == 'all':
+        category = None
+    top_n = request.args.get('top_n', 10, type=int)
+    include_inventory_data = request.args.get('include_inventory_data', 'false').lower() == 'true'
+    try:
+        panels, errors = dashboard_service.get_dashboard_bootstrap(
+            category, top_n,
+            mode=current_app.config.get('SALES_ANALYSIS_MODE', 'warehouse'),
+            include_inventory_data=include_inventory_data,
+        )
+        payload = dict(panels, errors=errors)
+        return jsonify(payload) if not errors else (jsonify(payload), 503)
+    except WarehouseUnavailable:
+        raise
+    except Exception as e:
+        logger.error(f"Error en el endpoint /dashboard/bootstrap: {e}")
+        return jsonify({"error": "Error interno del servidor"}), 500
+
+
+@api_bp.route('/status/pool')
+def get_pool_status():
+    return jsonify(databricks_pool.metrics())
+
+
+@api_bp.route('/status/result_cache')
+def get_result_cache_status():
+    return jsonify(result_cache.stats())
+
+
+@api_bp.route('/status/warehouse')
+def get_warehouse_status():
+    """
+    Estado del cortocircuito del warehouse y de los últimos resultados correctos (modo degradado).
+    """
+    return jsonify({"circuit": warehouse_breaker.metrics(), "last_known_good": last_known_good.stats()})
+
+
+@api_bp.route('/metrics')
+def get_metrics():
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@api_bp.route('/profiles/<profile_id>')
+def get_profile(profile_id):
+    """
+    Descarga un perfil guardado (.prof de cProfile) o, con ?format=text, su resumen.
+    """
+    path = profiler.path_for(profile_id)
+    if path is None or not os.path.exists(path):
+        abort(404, description="Perfil no encontrado.")
+    if request.args.get('format') == 'text':
+        return Response(profiler.render_text(profile_id), mimetype='text/plain')
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{profile_id}.prof")
+
+
+@api_bp.route('/status/cache_warmer')
+def get_cache_warmer_status():
+    return jsonify(cache_warmer.status())
+
+
+@api_bp.route('/status/summary_tables')
+def get_summary_tables_status():
+    return jsonify(summary_refresher.status())
+
+
 @api_bp.route('/reports/inventory_health')
-@cache.cached(timeout=3600)
+@cached_view(timeout=3600, query_string=True)
 def get_inventory_health_report():
+    include_data = request.args.get('include_data', 'true').lower() != 'false'
+    query = _parse_inventory_query() if include_data else None
     try:
-        report_data = dashboard_service.get_inventory_health_report_data()
-        if report_data:
-            return jsonify(report_data)
-        else:
+        report_data = dashboard_service.get_inventory_health_report_data(include_data=False)
+        if not report_data:
             return jsonify({"error": "No se pudo generar el informe"}), 500
+
+        if include_data:
+            df = dashboard_service.query_inventory(query['filters'], query['sort_by'], query['descending'])
+            df = df[query['fields']]
+            if query['pagination']:
+                df, meta = paginate_frame(df, *query['pagination'])
+                report_data["inventory_page"] = meta
+            report_data["inventory_data"] = frame_to_records(df)
+        return jsonify(report_data)
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error en el endpoint /reports/inventory_health: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
 
 
+@api_bp.route('/reports/reorder')
+@cached_view(timeout=300, query_string=True)
+def get_reorder_report():
+    """
+    Productos con reposición sugerida: fecha estimada de quiebre, punto de reorden y
+    cantidad a pedir. Admite los mismos filtros, orden, campos y paginación que el
+    inventario; sin `sort`, primero los que antes quiebran.
+    """
+    query = _parse_inventory_query()
+    try:
+        df = dashboard_service.query_reorder(query['filters'], query['sort_by'], query['descending'])
+        if dashboard_service.forecast_reference_date is None:
+            # Sin histórico de ventas no hay previsión: 503, que no se cachea.
+            return jsonify({"error": "La previsión de demanda no está disponible"}), 503
+        report_data = {"summary": dashboard_service.get_reorder_summary(df)}
+        df = df[query['fields']]
+        if query['pagination']:
+            df, meta = paginate_frame(df, *query['pagination'])
+            report_data["page"] = meta
+        report_data["items"] = frame_to_records(df)
+        return jsonify(report_data)
+    except WarehouseUnavailable:
+        raise
+    except Exception as e:
+        logger.error(f"Error en el endpoint /reports/reorder: {e}")
+        return jsonify({"error": "Error interno del servidor"}), 500
+
+
 @api_bp.route('/reports/sales_date_range')
-@cache.cached(timeout=3600)
+@cached_view(timeout=3600)
 def get_sales_date_range():
     try:
         date_range = dashboard_service.get_sales_date_range()
@@ -86,13 +276,15 @@ def get_sales_date_range():
             return jsonify(date_range)
         else:
             return jsonify({"error": "No se pudo obtener el rango de fechas"}), 404
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error en /reports/sales_date_range: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
 
 
 @api_bp.route('/reports/sales_trend')
-@cache.cached(timeout=300, query_string=True)
+@cached_view(timeout=300, query_string=True, vary=lambda: columnar_cache_variant(request))
 def get_sales_trend():
     start_date_str = request.args.get('start_date')
     end_date_str = request.args.get('end_date')
@@ -100,46 +292,110 @@ def get_sales_trend():
     if not start_date_str or not end_date_str:
         abort(400, description="Los parámetros 'start_date' y 'end_date' son requeridos.")
 
+    category = request.args.get('category')
+    if category and category.lower() == 'all':
+        category = None
+
     try:
         datetime.strptime(start_date_str, '%Y-%m-%d')
         datetime.strptime(end_date_str, '%Y-%m-%d')
 
-        trend_data = dashboard_service.get_sales_trend(start_date_str, end_date_str)
+        columnar_format = negotiate_columnar_format(request)
+        if columnar_format:
+            df = dashboard_service.get_sales_trend_frame(start_date_str, end_date_str, category)
+            if df is None:
+                return jsonify({"error": "No se pudieron obtener los datos de tendencia"}), 500
+            return columnar_response(df, columnar_format)
+
+        trend_data = dashboard_service.get_sales_trend(start_date_str, end_date_str, category)
         if trend_data is not None:
             return jsonify(trend_data)
         else:
             return jsonify({"error": "No se pudieron obtener los datos de tendencia"}), 500
     except ValueError:
         abort(400, description="Formato de fecha inválido. Use YYYY-MM-DD.")
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error en /reports/sales_trend: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
 
 
-# --- ENDPOINT DE EXPORTACIÓN MODIFICADO ---
+# --- EXPORTACIÓN PDF EN SEGUNDO PLANO ---
 @actions_bp.route('/export/inventory_pdf', methods=['POST'])
 def export_inventory_pdf():
+    """
+    Encola la exportación y devuelve el identificador del trabajo (202).
+    El PDF se descarga desde /export/jobs/<job_id>/download cuando está listo.
+    """
     try:
-        filters = request.get_json()
-        if not filters or not filters.get('statuses'):
+        filters = request.get_json(silent=True)
+        if not isinstance(filters, dict):
+            filters = {}
+        try:
+            filters = normalize_inventory_filters(filters)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not filters.get('statuses'):
             return jsonify({"error": "Debe seleccionar al menos un estado de inventario."}), 400
 
-        data = dashboard_service.get_filtered_inventory_data(filters)
-        if not data:
-            return jsonify({"error": "No se encontraron datos con los filtros seleccionados."}), 404
-
         title = "Informe de Inventario Filtrado"  # Título genérico
-        pdf_buffer = pdf_service.create_inventory_list_pdf(data, title)
-
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        filename = f"informe-inventario-{date_str}.pdf"
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+        # Versión y filas salen de la misma instantánea: la clave del PDF describe su contenido.
+        inventory, version = dashboard_service.get_versioned_inventory()
+        job = export_jobs.submit(
+            filters,
+            version,
+            lambda: dashboard_service.get_filtered_inventory_data(filters, inventory),
+            title,
         )
+        if job is None:
+            return jsonify({"error": "No se encontraron datos con los filtros seleccionados."}), 404
+
+        status_url = url_for('actions.get_export_job', job_id=job['job_id'])
+        return jsonify(_export_job_payload(job)), 202, {"Location": status_url}
+    except WarehouseUnavailable:
+        raise
     except Exception as e:
-        logger.error(f"Error al exportar el PDF de inventario: {e}")
+        logger.error(f"Error al encolar la exportación PDF de inventario: {e}")
         return jsonify({"error": "Error interno del servidor al generar el PDF"}), 500
+
+
+@actions_bp.route('/export/jobs/<job_id>')
+def get_export_job(job_id):
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo de exportación no encontrado"}), 404
+    return jsonify(_export_job_payload(job))
+
+
+@actions_bp.route('/export/jobs/<job_id>/download')
+def download_export_job(job_id):
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo de exportación no encontrado"}), 404
+
+    pdf_bytes = export_jobs.get_result(job_id)
+    if pdf_bytes is None:
+        return jsonify({"error": "El PDF aún no está disponible", **_export_job_payload(job)}), 409
+
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    filename = f"informe-inventario-{date_str}.pdf"
+    return send_file(
+        BytesIO(pdf_bytes),
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/pdf'
+    )
+
+
+def _export_job_payload(job: dict) -> dict:
+    payload = {
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "cached": job['cached'],
+        "error": job['error'],
+        "status_url": url_for('actions.get_export_job', job_id=job['job_id']),
+    }
+    if job['status'] == 'done':
+        payload["download_url"] = url_for('actions.download_export_job', job_id=job['job_id'])
+    return payload
@@ -1,5 +1,9 @@
+import math
+
 from flask import jsonify
 
+from app.utils.warehouse_backend import WarehouseUnavailable
+
 
 def register_error_handlers(app):
     @app.errorhandler(404)
@@ -11,6 +15,16 @@ def register_error_handlers(app):
         app.logger.error(f"Error interno del servidor: {error}", exc_info=True)
         return jsonify({"error": "Error interno del servidor", "message": "Ocurrió un problema inesperado."}), 500
 
+    @app.errorhandler(WarehouseUnavailable)
+    def warehouse_unavailable_error(error):
+        # 503: no lo guarda la caché de vistas y el cliente sabe que debe reintentar.
+        app.logger.warning(f"Warehouse no disponible: {error}")
+        response = jsonify({"error": "Servicio no disponible",
+                            "message": "El almacén de datos no responde. Inténtelo de nuevo en unos segundos."})
+        if error.retry_after:
+            response.headers['Retry-After'] = str(math.ceil(error.retry_after))
+        return response, 503
+
     @app.errorhandler(400)
     def bad_request_error(error):
         return jsonify({"error": "Solicitud incorrecta",
@@ -1,5 +1,70 @@
 # app/extensions.py
 from flask_caching import Cache
+from app.utils.connection_pool import ConnectionPool
+from app.services.cache_warmer import CacheWarmer
+from app.services.export_jobs import ExportJobQueue
+from app.services.summary_refresher import SummaryTableRefresher
+from app.utils.metrics import MetricsRegistry
+from app.utils.profiling import RequestProfiler
+from app.utils.http_caching import HttpCompression
+from app.utils.query_executor import QueryExecutor
+from app.utils.result_cache import QueryResultCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.staleness import StaleResponseMarker
 
 # Solo creamos la instancia aquí. No la configuramos.
 cache = Cache()
+
+# Pool de conexiones a Databricks compartido por todos los hilos del proceso.
+databricks_pool = ConnectionPool()
+
+# Ejecución en paralelo de consultas independientes dentro de una petición.
+query_executor = QueryExecutor()
+
+# Resultados de consultas en disco (Arrow IPC con memory-mapping), compartidos por los workers.
+result_cache = QueryResultCache()
+
+# Último resultado correcto de cada consulta, servido cuando el warehouse falla (modo degradado).
+last_known_good = QueryResultCache()
+
+# Cortocircuito del warehouse: tras varios fallos seguidos las consultas fallan al instante.
+warehouse_breaker = CircuitBreaker()
+
+# Cabeceras X-Data-Stale / X-Data-Age en las respuestas servidas con datos antiguos.
+stale_marker = StaleResponseMarker()
+
+# Precalentamiento periódico de la caché del dashboard (se inicia en create_app).
+cache_warmer = CacheWarmer()
+
+# Cola de exportaciones PDF en segundo plano (pool de procesos acotado).
+export_jobs = ExportJobQueue()
+
+# Mantenimiento de las tablas resumen de la capa gold (tarea programada y comando CLI).
+summary_refresher = SummaryTableRefresher()
+
+# Métricas de consultas, rutas y caché expuestas en /api/metrics.
+metrics = MetricsRegistry()
+metrics.gauge(
+    'databricks_pool_connections', 'Conexiones del pool de Databricks por estado.',
+    lambda: {(state,): databricks_pool.metrics()[state] for state in ('in_use', 'idle')},
+    labels=('state',))
+metrics.gauge(
+    'warehouse_result_cache_total', 'Operaciones de la caché de resultados por tipo (contadores del proceso).',
+    lambda: {(kind,): result_cache.stats()[kind]
+             for kind in ('hits', 'misses', 'expired', 'writes', 'evictions', 'errors', 'dropped')},
+    labels=('result',))
+metrics.gauge(
+    'warehouse_circuit_state', 'Estado del cortocircuito del warehouse (0 cerrado, 1 semiabierto, 2 abierto).',
+    lambda: {'closed': 0, 'half_open': 1, 'open': 2}[warehouse_breaker.state])
+metrics.gauge(
+    'warehouse_circuit_rejected', 'Consultas rechazadas con el circuito abierto (contador del proceso).',
+    lambda: warehouse_breaker.metrics()['rejected'])
+metrics.gauge(
+    'warehouse_result_cache_bytes', 'Bytes ocupados por la caché de resultados en disco.',
+    lambda: result_cache.stats()['bytes'])
+
+# Perfilado opcional por petición (solo si PROFILING_ENABLED).
+profiler = RequestProfiler()
+
+# ETag y compresión gzip/brotli de las respuestas que no pasan por la caché de vistas.
+http_compression = HttpCompression()
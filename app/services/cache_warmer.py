@@ -0,0 +1,149 @@
+# app/services/cache_warmer.py
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from flask import g
+
+from app import extensions
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = "cache-warmer/status"
+LOCK_KEY = "lock/cache-warmer"
+
+
+class CacheWarmer:
+    """
+    Refresca periódicamente las entradas de caché del dashboard para que ningún
+    usuario pague las consultas en frío tras un despliegue o una caducidad.
+
+    En cada ciclo se leen las categorías y el rango de fechas, y se recalculan en
+    paralelo el análisis de ventas e inventario por categoría, el informe de salud
+    y la ventana de tendencia por defecto. Con varios workers, solo el que obtiene
+    el candado compartido ejecuta el ciclo.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 240
+        self.max_workers = 4
+        self.max_warehouse_queries = 2
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('CACHE_WARMER_INTERVAL', self.interval)
+        self.max_workers = app.config.get('CACHE_WARMER_WORKERS', self.max_workers)
+        self.max_warehouse_queries = app.config.get('CACHE_WARMER_MAX_QUERIES', self.max_warehouse_queries)
+        if app.config.get('CACHE_WARMER_ENABLED') and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+        self._thread.start()
+        logger.info(f"Precalentamiento de caché iniciado (cada {self.interval}s).")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error en el ciclo de precalentamiento de caché: {e}", exc_info=True)
+            self._stop.wait(self.interval)
+
+    def run_once(self) -> bool:
+        """
+        Ejecuta un ciclo completo de precalentamiento. Devuelve False si otro
+        worker ya lo está ejecutando en este intervalo.
+        """
+        with self.app.app_context():
+            if not extensions.cache.add(LOCK_KEY, uuid.uuid4().hex, timeout=max(int(self.interval) - 1, 1)):
+                logger.debug("Otro worker ya está precalentando la caché.")
+                return False
+
+            started = time.perf_counter()
+            results = {}
+
+            # Primero las entradas de las que dependen las demás.
+            for url in ('/api/categories', '/api/reports/sales_date_range'):
+                results[url] = self._refresh(url)
+
+            budget = threading.Semaphore(self.max_warehouse_queries)
+            targets = self.build_targets()
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache-warmer") as pool:
+                futures = {url: pool.submit(self._refresh, url, budget) for url in targets}
+                for url, future in futures.items():
+                    results[url] = future.result()
+
+            status = {
+                "last_cycle_at": datetime.now().isoformat(timespec='seconds'),
+                "last_cycle_duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "keys": results,
+            }
+            extensions.cache.set(STATUS_KEY, status, timeout=0)
+            logger.info(f"Caché precalentada: {len(results)} claves en {status['last_cycle_duration_ms']} ms.")
+            return True
+
+    def build_targets(self) -> list:
+        """
+        URLs a refrescar. Los parámetros coinciden con los que envía el dashboard
+        para que las claves de caché sean las mismas.
+        """
+        from app.services.dashboard_service import get_dashboard_service
+
+        dashboard_service = get_dashboard_service()
+        categories = ['all'] + [c for c in dashboard_service.get_all_categories() if c]
+        targets = []
+        for category in categories:
+            targets.append('/api/data/sales_analysis?' + urlencode({'top_n': 10, 'category': category}))
+            targets.append('/api/data/inventory_analysis?' + urlencode({'category': category}))
+        targets.append('/api/reports/inventory_health')
+        targets.append('/api/reports/reorder')
+        targets.append('/api/dashboard/bootstrap')
+
+        date_range = dashboard_service.get_sales_date_range()
+        if date_range:
+            end_date = datetime.strptime(date_range['max_date'], '%Y-%m-%d')
+            start_date = end_date - timedelta(days=29)
+            targets.append('/api/reports/sales_trend?' + urlencode({
+                'start_date': start_date.strftime('%Y-%m-%d'),
+                'end_date': end_date.strftime('%Y-%m-%d'),
+            }))
+        return targets
+
+    def _refresh(self, url: str, budget: threading.Semaphore = None) -> dict:
+        if budget is not None:
+            budget.acquire()
+        started = time.perf_counter()
+        try:
+            with self.app.test_request_context(url):
+                g.cache_force_refresh = True
+                response = self.app.full_dispatch_request()
+            result = {"status_code": response.status_code}
+        except Exception as e:
+            logger.error(f"Error al precalentar {url}: {e}")
+            result = {"status_code": None, "error": str(e)}
+        finally:
+            if budget is not None:
+                budget.release()
+        result["refreshed_at"] = datetime.now().isoformat(timespec='seconds')
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    @staticmethod
+    def status() -> dict:
+        return extensions.cache.get(STATUS_KEY) or {"last_cycle_at": None, "keys": {}}
@@ -1,137 +1,398 @@
 # app/services/dashboard_service.py
 import pandas as pd
-import numpy as np
-from app.utils.databricks_connector import DatabricksConnector
+from flask import current_app
+from app import extensions
+from app.utils.warehouse_backend import WarehouseBackend, WarehouseUnavailable, create_warehouse_backend
+from app.utils.dtypes import frame_to_records
+from app.utils.settings import get_setting
+from app.services.inventory_snapshot import InventorySnapshot
+from app.services.inventory_index import InventoryIndex, normalize_inventory_filters
+from app.services.demand_forecast import get_forecast_settings, build_demand_matrix, forecast_demand, stockout_dates
+from app.services.product_dimension import ProductDimensionCache
+from app.services.sales_trend_store import SalesTrendStore
+from app.services.inventory_rules import (
+    get_status_thresholds,
+    compute_days_of_inventory,
+    classify_inventory_status,
+    STATUS_RIESGO,
+    STATUS_ESTANCADO,
+    STATUS_SIN_STOCK,
+    STATUS_SALUDABLE,
+    STATUS_ALTA_ROTACION,
+)
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Columnas públicas del inventario (proyectables, filtrables y ordenables desde la API).
+INVENTORY_FIELDS = ['nombre_del_producto', 'stock_actual', 'unidades_vendidas_30d', 'estado', 'categoria',
+                    'demanda_diaria', 'fecha_quiebre', 'punto_reorden', 'cantidad_reorden']
 
-class DashboardService:
-    def __init__(self):
-        self.connector = DatabricksConnector()
-
-    def get_sales_analysis_data(self, category: str = None, top_n: int = 10):
-        try:
-            logger.info("Obteniendo datos de ventas y productos por separado...")
-            # CORRECCIÓN: Se eliminó la columna 'precio_unitario' que causaba el error, ya que no se utiliza en este análisis.
-            sales_query = "SELECT codigo_producto, cantidad FROM workspace.tecnomundo_data_gold.fact_sales"
-            products_query = "SELECT codigo_producto, nombre_del_producto, categoria FROM workspace.tecnomundo_data_gold.dim_products"
 
-            df_sales = self.connector.execute_query(sales_query)
-            df_products = self.connector.execute_query(products_query)
+def raise_if_unavailable(errors: dict):
+    """
+    Relanza el primer WarehouseUnavailable de los errores de un fan-out: un warehouse
+    caído no debe parecer un resultado vacío.
+    """
+    for error in errors.values():
+        if isinstance(error, WarehouseUnavailable):
+            raise error
 
-            if df_sales.empty or df_products.empty:
-                logger.warning("Una de las tablas (ventas o productos) está vacía.")
-                return {"top_products_by_quantity": []}
 
-            df_sales['codigo_producto'] = df_sales['codigo_producto'].astype(str)
-            df_products['codigo_producto'] = df_products['codigo_producto'].astype(str)
-
-            df_merged = pd.merge(df_sales, df_products, on='codigo_producto', how='left')
+class DashboardService:
+    def __init__(self, connector: WarehouseBackend = None):
+        # Sin conector explícito se usa el backend de `WAREHOUSE_BACKEND` (Databricks o DuckDB local).
+        self.connector = connector or create_warehouse_backend()
+        self.product_dimension = ProductDimensionCache(self.connector.get_product_dimension,
+                                                       self.connector.get_product_dimension_signature)
+        self.inventory_snapshot = InventorySnapshot(self._load_inventory_frame)
+        self._inventory_index = None
+        self._inventory_index_lock = threading.Lock()
+        # Última fecha con ventas del histórico usado en la previsión de la instantánea vigente.
+        self.forecast_reference_date = None
+        self.sales_trend_store = SalesTrendStore(self.connector.get_daily_sales_by_category)
+
+    def get_sales_analysis_data(self, category: str = None, top_n: int = 10, mode: str = 'warehouse'):
+        """
+        Devuelve el top N de productos por unidades vendidas.
+        En modo 'warehouse' (por defecto) la agregación se resuelve en Databricks y solo
+        viajan `top_n` filas; el modo 'pandas' se conserva como alternativa explícita.
+        """
+        top_products = self.get_top_products_frame(category, top_n, mode)
+        if top_products is None or top_products.empty:
+            return {"top_products_by_quantity": []}
+        return {"top_products_by_quantity": frame_to_records(top_products)}
 
-            if category and category.lower() != 'all':
-                df_filtered = df_merged[df_merged['categoria'] == category].copy()
+    def get_top_products_frame(self, category: str = None, top_n: int = 10, mode: str = 'warehouse'):
+        """
+        Igual que `get_sales_analysis_data`, pero devuelve el DataFrame sin convertirlo a registros.
+        """
+        try:
+            if mode == 'pandas':
+                top_products = self._get_top_products_pandas(category, top_n)
             else:
-                df_filtered = df_merged.copy()
-
-            df_filtered.dropna(subset=['nombre_del_producto'], inplace=True)
-            df_filtered['cantidad'] = pd.to_numeric(df_filtered['cantidad'], errors='coerce').fillna(0)
-
-            if df_filtered.empty:
-                logger.warning("El DataFrame está vacío después de filtrar y limpiar.")
-                return {"top_products_by_quantity": []}
-
-            top_products = df_filtered.groupby(['codigo_producto', 'nombre_del_producto'])['cantidad'].sum().nlargest(
-                top_n).reset_index()
-            top_products.rename(columns={'cantidad': 'total_unidades'}, inplace=True)
+                top_products = self._get_top_products_warehouse(category, top_n)
 
-            return {"top_products_by_quantity": top_products.to_dict(orient='records')}
+            if top_products.empty:
+                logger.warning("No se encontraron productos para el análisis de ventas.")
+            return top_products
 
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error crítico al procesar los datos de análisis de ventas: {e}", exc_info=True)
-            return {"top_products_by_quantity": []}
+            return None
+
+    def _get_top_products_warehouse(self, category: str = None, top_n: int = 10) -> pd.DataFrame:
+        logger.info("Obteniendo el top de productos agregado en Databricks...")
+        df = self.connector.get_top_products(category, top_n)
+        if df.empty:
+            return df
+
+        df['codigo_producto'] = df['codigo_producto'].astype(str)
+        df['total_unidades'] = pd.to_numeric(df['total_unidades'], errors='coerce').fillna(0)
+        return df[['codigo_producto', 'nombre_del_producto', 'total_unidades']]
+
+    def _get_top_products_pandas(self, category: str = None, top_n: int = 10) -> pd.DataFrame:
+        logger.info("Obteniendo datos de ventas y productos por separado (modo pandas)...")
+        sales_query = "SELECT codigo_producto, cantidad FROM workspace.tecnomundo_data_gold.fact_sales"
+
+        # La descarga de ventas y el sondeo (o carga) de la dimensión son independientes: en paralelo.
+        fan_out = extensions.query_executor.run_all({
+            'sales': lambda: self.connector.execute_query(sales_query, label='fact_sales_scan'),
+            'products': self.product_dimension.get,
+        })
+        if not fan_out.ok:
+            logger.error(f"Error al descargar ventas y productos: {fan_out.errors}")
+            raise_if_unavailable(fan_out.errors)
+            return pd.DataFrame()
+        df_sales = fan_out.results['sales']
+        dimension = fan_out.results['products']
+
+        if df_sales.empty or dimension is None:
+            logger.warning("Una de las tablas (ventas o productos) está vacía.")
+            return pd.DataFrame()
+
+        # Se agregan las ventas por código antes de unir: la tabla de hechos no se
+        # une ni se convierte a texto; solo el agregado y la dimensión, que tienen
+        # una fila por producto.
+        quantities = pd.to_numeric(df_sales['cantidad'], errors='coerce').fillna(0)
+        sales_by_product = quantities.groupby(df_sales['codigo_producto']).sum()
+        sales_by_product.index = sales_by_product.index.astype(str)
+
+        # La dimensión ya excluye 'Servicio Tecnico' y resuelve la categoría con su índice.
+        products = dimension.products(category if category and category.lower() != 'all' else None)
+        products = products[products['nombre_del_producto'].notna()]
+        products = pd.DataFrame({
+            'codigo_producto': products.index.astype(str),
+            'nombre_del_producto': products['nombre_del_producto'].to_numpy(),
+        })
+        df_filtered = products.join(sales_by_product.rename('cantidad'), on='codigo_producto', how='inner')
+
+        if df_filtered.empty:
+            logger.warning("El DataFrame está vacío después de filtrar y limpiar.")
+            return pd.DataFrame()
+
+        top_products = (
+            df_filtered.groupby(['codigo_producto', 'nombre_del_producto'])['cantidad'].sum()
+            .reset_index()
+            .sort_values(['cantidad', 'codigo_producto'], ascending=[False, True])
+            .head(top_n)
+        )
+        top_products.rename(columns={'cantidad': 'total_unidades'}, inplace=True)
+        return top_products.reset_index(drop=True)
 
     def get_all_categories(self):
+        """
+        Categorías de producto (sin 'Servicio Tecnico'), desde la dimensión en memoria.
+        """
         try:
+            dimension = self.product_dimension.get()
+            if dimension is not None:
+                return list(dimension.categories)
             return self.connector.get_categories()
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error al obtener las categorías: {e}")
             return []
 
+    def _excluded_codes(self):
+        """
+        Códigos de 'Servicio Tecnico' para excluirlos por código en el warehouse, o None
+        (consulta con JOIN a dim_products) si la dimensión no está disponible o la lista
+        supera `PRODUCT_DIMENSION_MAX_EXCLUDED_CODES`.
+        """
+        dimension = self.product_dimension.get()
+        if dimension is None:
+            return None
+        if len(dimension.service_codes) > get_setting('PRODUCT_DIMENSION_MAX_EXCLUDED_CODES', 1000):
+            return None
+        return dimension.service_codes
+
+    def _load_inventory_frame(self) -> pd.DataFrame:
+        """
+        Ejecuta la consulta de inventario para todas las categorías, le añade nombre y
+        categoría desde la dimensión de productos y calcula días de inventario, estado
+        y la previsión de quiebre y reposición. Es la única consulta de inventario que
+        se lanza contra el warehouse; el resto de vistas filtran este resultado.
+        """
+        thresholds = get_status_thresholds()
+        forecast_settings = get_forecast_settings()
+        fan_out = extensions.query_executor.run_all({
+            'inventory': lambda: self.connector.get_inventory_data(window_days=thresholds['window_days']),
+            'products': self.product_dimension.get,
+            'daily_sales': lambda: self.connector.get_daily_sales_by_product(forecast_settings['history_days']),
+            'last_sales_date': self.connector.get_last_sales_date,
+        })
+        if 'inventory' in fan_out.errors or 'products' in fan_out.errors:
+            logger.error(f"Error al obtener el inventario: {fan_out.errors}")
+            raise_if_unavailable({name: fan_out.errors.get(name) for name in ('inventory', 'products')})
+            return pd.DataFrame()
+        df = fan_out.results['inventory']
+        dimension = fan_out.results['products']
+        if df.empty or dimension is None:
+            return pd.DataFrame()
+
+        # Nombre, categoría y exclusión de 'Servicio Tecnico' desde la dimensión en memoria.
+        df = dimension.attach(df)
+
+        df['stock_actual'] = pd.to_numeric(df['stock_actual']).fillna(0)
+        df['unidades_vendidas_30d'] = pd.to_numeric(df['unidades_vendidas_30d']).fillna(0)
+
+        df['dias_inventario'] = compute_days_of_inventory(
+            df['stock_actual'], df['unidades_vendidas_30d'], thresholds['window_days'])
+        df['estado'] = classify_inventory_status(
+            df['stock_actual'],
+            df['unidades_vendidas_30d'],
+            df['dias_inventario'],
+            risk_days=thresholds['risk_days'],
+            high_rotation_days=thresholds['high_rotation_days'],
+            slow_rotation_days=thresholds['slow_rotation_days'],
+        )
+
+        # Sin histórico de ventas se sirve el inventario igualmente, con la previsión vacía.
+        if 'daily_sales' in fan_out.errors or 'last_sales_date' in fan_out.errors:
+            logger.error(f"Error al obtener el histórico para la previsión de demanda: {fan_out.errors}")
+            self._attach_forecast(df, None, None, forecast_settings)
+        else:
+            self._attach_forecast(df, fan_out.results['daily_sales'], fan_out.results['last_sales_date'],
+                                  forecast_settings)
+
+        return df[INVENTORY_FIELDS]
+
+    def _attach_forecast(self, df: pd.DataFrame, daily_sales: pd.DataFrame, reference_date, settings: dict):
+        """
+        Añade a `df` la demanda diaria, la fecha estimada de quiebre, el punto de reorden
+        y la cantidad sugerida, calculados para todos los productos en una sola pasada.
+        """
+        if daily_sales is None or daily_sales.empty or reference_date is None:
+            self.forecast_reference_date = None
+            for column in ('demanda_diaria', 'punto_reorden', 'cantidad_reorden'):
+                df[column] = float('nan')
+            df['fecha_quiebre'] = pd.Series(pd.NA, index=df.index, dtype=pd.StringDtype('pyarrow'))
+            return
+
+        matrix = build_demand_matrix(daily_sales, df['codigo_producto'].to_numpy(), settings['history_days'])
+        forecast = forecast_demand(
+            matrix,
+            df['stock_actual'].to_numpy(dtype='float64'),
+            rate_window_days=settings['rate_window_days'],
+            horizon_days=settings['horizon_days'],
+            lead_time_days=settings['lead_time_days'],
+            review_days=settings['review_days'],
+            service_level=settings['service_level'],
+        )
+        self.forecast_reference_date = reference_date.strftime('%Y-%m-%d')
+        df['demanda_diaria'] = forecast['demanda_diaria'].round(3)
+        df['fecha_quiebre'] = stockout_dates(reference_date, forecast['dias_hasta_quiebre'], index=df.index)
+        df['punto_reorden'] = forecast['punto_reorden']
+        df['cantidad_reorden'] = forecast['cantidad_reorden']
+
+    def get_inventory_frame(self, category: str = None) -> pd.DataFrame:
+        """
+        Devuelve el inventario desde la instantánea compartida, filtrado por categoría si se indica.
+        """
+        df = self.inventory_snapshot.get()
+        if df.empty or not category:
+            return df
+        return df[df['categoria'] == category]
+
+    def get_inventory_index(self, frame: pd.DataFrame = None):
+        """
+        Índice de filtrado de la instantánea vigente (o de `frame`, una instantánea
+        ya leída); se reconstruye solo cuando la instantánea cambia. None si no hay inventario.
+        """
+        df = frame if frame is not None else self.get_inventory_frame()
+        if df.empty:
+            return None
+        index = self._inventory_index
+        if index is not None and index.frame is df:
+            return index
+        if frame is not None:
+            # Una instantánea ya sustituida no desplaza el índice de la vigente.
+            return InventoryIndex(df)
+        with self._inventory_index_lock:
+            index = self._inventory_index
+            if index is None or index.frame is not df:
+                index = self._inventory_index = InventoryIndex(df)
+            return index
+
+    def query_inventory(self, filters: dict = None, sort_by: str = None,
+                        descending: bool = True, frame: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Filtra y ordena la instantánea de inventario en memoria (o `frame`). `filters`
+        admite `categories`, `statuses`, `stock_min`/`stock_max`, `sales_min`/`sales_max`
+        y `name` (ver `normalize_inventory_filters`).
+        """
+        index = self.get_inventory_index(frame)
+        if index is None:
+            return pd.DataFrame(columns=INVENTORY_FIELDS)
+
+        df = index.select(normalize_inventory_filters(filters))
+        if sort_by:
+            df = df.sort_values(sort_by, ascending=not descending, kind='stable')
+        return df
+
+    def query_reorder(self, filters: dict = None, sort_by: str = None,
+                      descending: bool = True) -> pd.DataFrame:
+        """
+        Productos con reposición sugerida (`cantidad_reorden` > 0). Sin orden explícito,
+        primero los que antes quiebran y, a igual fecha, los que más unidades necesitan.
+        """
+        df = self.query_inventory(filters, sort_by, descending)
+        df = df[df['cantidad_reorden'] > 0]
+        if not sort_by:
+            df = df.sort_values(['fecha_quiebre', 'cantidad_reorden'], ascending=[True, False],
+                                kind='stable', na_position='last')
+        return df
+
+    def get_reorder_summary(self, df: pd.DataFrame) -> dict:
+        """
+        Totales del informe de reposición y parámetros con los que se ha calculado.
+        """
+        settings = get_forecast_settings()
+        return {
+            "reference_date": self.forecast_reference_date,
+            "products_to_reorder": len(df),
+            "units_to_reorder": int(df['cantidad_reorden'].sum()) if len(df) else 0,
+            "lead_time_days": settings['lead_time_days'],
+            "review_days": settings['review_days'],
+            "service_level": settings['service_level'],
+        }
+
+    def get_filtered_inventory_data(self, filters: dict, frame: pd.DataFrame = None):
+        """
+        Inventario filtrado para la exportación PDF. `filters` admite `statuses` y,
+        opcionalmente, `categories`, rangos de stock y ventas y `name`. Con `frame`
+        se filtra esa instantánea (la de `get_versioned_inventory`) y no la vigente.
+        """
+        try:
+            df = self.query_inventory(filters, frame=frame)
+            return frame_to_records(df)
+        except WarehouseUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"Error al filtrar los datos de inventario: {e}")
+            return []
+
+    def get_versioned_inventory(self) -> tuple:
+        """
+        `(instantánea, versión)` del inventario vigente, leídos de la misma carga: la
+        versión (cambia cuando cambia el contenido) describe exactamente esas filas.
+        """
+        return self.inventory_snapshot.get_versioned()
+
     def get_inventory_analysis_data(self, category: str = None):
         try:
-            df = self.connector.get_inventory_data(category)
+            df = self.get_inventory_frame(category)
             if df.empty:
                 return []
+            return frame_to_records(df)
 
-            df['stock_actual'] = pd.to_numeric(df['stock_actual']).fillna(0)
-            df['unidades_vendidas_30d'] = pd.to_numeric(df['unidades_vendidas_30d']).fillna(0)
-
-            venta_diaria_promedio = df['unidades_vendidas_30d'] / 30
-            df['dias_inventario'] = np.where(
-                venta_diaria_promedio > 0,
-                df['stock_actual'] / venta_diaria_promedio,
-                np.inf
-            )
-
-            def assign_status_doi(row):
-                stock = row['stock_actual']
-                ventas_30d = row['unidades_vendidas_30d']
-                doi = row['dias_inventario']
-
-                if stock <= 0:
-                    return 'Sin Stock'
-                if ventas_30d == 0:
-                    return 'Inventario Estancado'
-                if doi <= 7:
-                    return 'Riesgo de Quiebre'
-                if doi <= 30:
-                    return 'Alta Rotación'
-                if doi > 90:
-                    return 'Lenta Rotación'
-                return 'Rotación Saludable'
-
-            df['estado'] = df.apply(assign_status_doi, axis=1)
-
-            df_final = df[
-                ['nombre_del_producto', 'stock_actual', 'unidades_vendidas_30d', 'estado', 'categoria']].copy()
-            return df_final.to_dict(orient='records')
-
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error al procesar los datos de inventario: {e}")
             return None
 
-    def get_inventory_health_report_data(self):
+    def get_inventory_health_report_data(self, include_data: bool = True):
+        """
+        KPIs y distribución de estados del inventario. Con `include_data=False`
+        se omite la lista completa de productos.
+        """
         try:
-            inventory_list = self.get_inventory_analysis_data()
+            df = self.get_inventory_frame()
 
-            if not inventory_list:
+            if df.empty:
                 return {
                     "kpis": {"risk_products_count": 0, "stagnant_products_count": 0, "healthy_percentage": 0},
                     "distribution": {},
                     "inventory_data": []
                 }
 
-            df = pd.DataFrame(inventory_list)
             total_products = len(df)
-            risk_products_count = len(df[df['estado'] == 'Riesgo de Quiebre'])
-            stagnant_products_count = len(df[df['estado'] == 'Inventario Estancado'])
-            healthy_states = ['Rotación Saludable', 'Alta Rotación']
-            healthy_products_count = len(df[df['estado'].isin(healthy_states)])
+            risk_products_count = int((df['estado'] == STATUS_RIESGO).sum())
+            stagnant_products_count = int((df['estado'] == STATUS_ESTANCADO).sum())
+            healthy_states = [STATUS_SALUDABLE, STATUS_ALTA_ROTACION]
+            healthy_products_count = int(df['estado'].isin(healthy_states).sum())
             healthy_percentage = (healthy_products_count / total_products) * 100 if total_products > 0 else 0
-            distribution = df['estado'].value_counts().to_dict()
+            # value_counts de una columna categórica incluye los estados sin productos: se omiten.
+            distribution = {str(k): int(v) for k, v in df['estado'].value_counts().items() if v > 0}
 
             return {
                 "kpis": {
-                    "risk_products_count": int(risk_products_count),
-                    "stagnant_products_count": int(stagnant_products_count),
+                    "risk_products_count": risk_products_count,
+                    "stagnant_products_count": stagnant_products_count,
                     "healthy_percentage": healthy_percentage
                 },
                 "distribution": distribution,
-                "inventory_data": inventory_list
+                "inventory_data": frame_to_records(df) if include_data else []
             }
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error al generar el informe de salud de inventario: {e}")
             return None
@@ -142,42 +403,97 @@ class DashboardService:
         ordenados por criticidad.
         """
         try:
-            inventory_list = self.get_inventory_analysis_data()
-            if not inventory_list:
+            df = self.get_inventory_frame()
+            if df.empty:
                 return []
 
-            critical_states = ["Sin Stock", "Riesgo de Quiebre", "Inventario Estancado"]
-            critical_inventory = [p for p in inventory_list if p['estado'] in critical_states]
+            critical_states = [STATUS_SIN_STOCK, STATUS_RIESGO, STATUS_ESTANCADO]
+            df_critical = df[df['estado'].isin(critical_states)]
 
-            if not critical_inventory:
+            if df_critical.empty:
                 return []
 
-            # Convertir a DataFrame para ordenar por estado de criticidad
-            df_critical = pd.DataFrame(critical_inventory)
+            # Ordenar por estado de criticidad
             status_order = pd.CategoricalDtype(categories=critical_states, ordered=True)
-            df_critical['estado'] = df_critical['estado'].astype(status_order)
-            df_critical.sort_values('estado', inplace=True)
+            df_critical = df_critical.assign(estado=df_critical['estado'].astype(str).astype(status_order))
+            df_critical = df_critical.sort_values('estado', kind='stable')
 
-            return df_critical.to_dict(orient='records')
+            return frame_to_records(df_critical)
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error al obtener datos de inventario crítico: {e}")
             return []
 
     def get_sales_date_range(self):
         try:
-            df = self.connector.get_sales_date_range()
+            df = self.connector.get_sales_date_range(excluded_codes=self._excluded_codes())
             if not df.empty and df['min_date'][0] is not None:
                 min_date = pd.to_datetime(df['min_date'][0]).strftime('%Y-%m-%d')
                 max_date = pd.to_datetime(df['max_date'][0]).strftime('%Y-%m-%d')
                 return {"min_date": min_date, "max_date": max_date}
             return None
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error al obtener el rango de fechas de ventas: {e}")
             return None
 
-    def get_sales_trend(self, start_date: str, end_date: str):
+    def get_dashboard_bootstrap(self, category: str = None, top_n: int = 10, mode: str = 'warehouse',
+                                include_inventory_data: bool = False, deadline: float = None):
+        """
+        Paneles iniciales del dashboard (categorías, top de ventas, salud del inventario,
+        rango de fechas y tendencia de los últimos 30 días) en un único fan-out paralelo.
+        Devuelve los paneles obtenidos y un diccionario de errores por panel.
+        """
+        def sales_trend():
+            date_range = self.get_sales_date_range()
+            if not date_range:
+                return None
+            end_date = datetime.strptime(date_range['max_date'], '%Y-%m-%d')
+            start_date = (end_date - timedelta(days=29)).strftime('%Y-%m-%d')
+            end_date = end_date.strftime('%Y-%m-%d')
+            data = self.get_sales_trend(start_date, end_date)
+            if data is None:
+                return None
+            return {"start_date": start_date, "end_date": end_date, "data": data}
+
+        fan_out = extensions.query_executor.run_all({
+            'categories': self.get_all_categories,
+            'sales_analysis': lambda: self.get_sales_analysis_data(category, top_n, mode),
+            'inventory_health': lambda: self.get_inventory_health_report_data(include_data=include_inventory_data),
+            'sales_date_range': self.get_sales_date_range,
+            'sales_trend': sales_trend,
+        }, deadline)
+
+        errors = {name: str(error) for name, error in fan_out.errors.items()}
+        panels = {}
+        for name, value in fan_out.results.items():
+            if value is None:
+                errors[name] = "No se pudieron obtener los datos"
+            else:
+                panels[name] = value
+        return panels, errors
+
+    def get_sales_trend(self, start_date: str, end_date: str, category: str = None):
+        df = self.get_sales_trend_frame(start_date, end_date, category)
+        if df is None:
+            return None
+        df = df.assign(fecha=df['fecha'].dt.strftime('%Y-%m-%d'))
+        return frame_to_records(df)
+
+    def get_sales_trend_frame(self, start_date: str, end_date: str, category: str = None):
+        """
+        Unidades vendidas por día en el rango, con los días sin ventas a cero.
+        Se responde desde el agregado diario local, que solo pide al warehouse los
+        días nuevos. Devuelve un DataFrame con las columnas `fecha` (datetime) y `unidades`.
+        """
         try:
-            df = self.connector.get_sales_trend_data(start_date, end_date)
+            if self.sales_trend_store.ensure_fresh():
+                return self.sales_trend_store.get_range(start_date, end_date, category)
+
+            logger.warning("Agregado de ventas diarias no disponible; se consulta el rango directamente.")
+            df = self.connector.get_sales_trend_data(start_date, end_date, excluded_codes=self._excluded_codes())
 
             date_range_index = pd.date_range(start=start_date, end=end_date, freq='D')
 
@@ -189,10 +505,30 @@ class DashboardService:
                 df.set_index('fecha_venta', inplace=True)
                 df = df.reindex(date_range_index, fill_value=0).reset_index()
                 df.rename(columns={'index': 'fecha', 'total_unidades': 'unidades'}, inplace=True)
+                df['unidades'] = pd.to_numeric(df['unidades']).fillna(0).round().astype('int64')
 
-            df['fecha'] = df['fecha'].dt.strftime('%Y-%m-%d')
-
-            return df.to_dict(orient='records')
+            return df[['fecha', 'unidades']]
+        except WarehouseUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error al obtener la tendencia de ventas: {e}")
             return None
+
+
+_service_lock = threading.Lock()
+
+
+def get_dashboard_service() -> DashboardService:
+    """
+    Servicio del dashboard de la aplicación actual. Se construye en el primer uso,
+    dentro del contexto de la aplicación y con su configuración (backend, pool), y
+    se guarda en `app.extensions`; importar la API no abre ni prepara el warehouse.
+    """
+    app = current_app._get_current_object()
+    service = app.extensions.get('dashboard_service')
+    if service is None:
+        with _service_lock:
+            service = app.extensions.get('dashboard_service')
+            if service is None:
+                service = app.extensions['dashboard_service'] = DashboardService()
+    return service
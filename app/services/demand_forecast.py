@@ -0,0 +1,129 @@
+# app/services/demand_forecast.py
+"""
+Previsión de demanda por producto y sugerencias de reposición, calculadas para
+todo el catálogo a la vez sobre una matriz producto × día.
+
+Para cada producto se estima en una sola pasada de NumPy:
+- demanda diaria: media de la ventana reciente (`FORECAST_RATE_WINDOW_DAYS`).
+- tendencia: pendiente por mínimos cuadrados de la serie diaria del histórico
+  (unidades/día por día), como un único producto matriz × vector.
+- variabilidad: desviación típica de la demanda diaria del histórico.
+
+Con demanda d(t) = demanda + tendencia · t, el quiebre llega cuando la demanda
+acumulada alcanza el stock: demanda · h + tendencia · h² / 2 = stock. El punto
+de reorden cubre la demanda del plazo de entrega más un stock de seguridad
+z · σ · √plazo, y la cantidad sugerida lleva el stock hasta cubrir plazo de
+entrega + periodo de revisión.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from app.utils.settings import get_setting
+
+
+def get_forecast_settings() -> dict:
+    """
+    Parámetros de la previsión leídos de la configuración.
+    """
+    return {
+        "history_days": get_setting('FORECAST_HISTORY_DAYS', 90),
+        "rate_window_days": get_setting('FORECAST_RATE_WINDOW_DAYS', 28),
+        "horizon_days": get_setting('FORECAST_HORIZON_DAYS', 365),
+        "lead_time_days": get_setting('REORDER_LEAD_TIME_DAYS', 7),
+        "review_days": get_setting('REORDER_REVIEW_DAYS', 14),
+        "service_level": get_setting('REORDER_SERVICE_LEVEL', 0.95),
+    }
+
+
+def build_demand_matrix(daily: pd.DataFrame, product_codes, history_days: int) -> np.ndarray:
+    """
+    Matriz float32 (productos × días) con las unidades vendidas por día a partir de
+    filas `codigo_producto`, `dias_atras`, `total_unidades`. La fila i corresponde a
+    `product_codes[i]` y la última columna a `dias_atras` = 0; los días sin ventas
+    valen 0 y se descartan los productos que no están en `product_codes`.
+    """
+    matrix = np.zeros((len(product_codes), history_days), dtype='float32')
+    if daily.empty or not len(product_codes):
+        return matrix
+
+    # Se resuelven primero los códigos distintos (pocos) y después cada fila con un take.
+    codes, uniques = pd.factorize(daily['codigo_producto'])
+    rows = pd.Index(product_codes).get_indexer(uniques)[codes]
+    columns = history_days - 1 - pd.to_numeric(daily['dias_atras']).to_numpy(dtype='int64', na_value=-1)
+
+    valid = (codes >= 0) & (rows >= 0) & (columns >= 0) & (columns < history_days)
+    units = pd.to_numeric(daily['total_unidades']).to_numpy(dtype='float64', na_value=0)
+    flat = np.bincount(rows[valid] * history_days + columns[valid], weights=units[valid],
+                       minlength=matrix.size)
+    matrix[:] = flat.reshape(matrix.shape)
+    return matrix
+
+
+def forecast_demand(matrix: np.ndarray, stock, rate_window_days: int = 28, horizon_days: int = 365,
+                    lead_time_days: float = 7, review_days: float = 14,
+                    service_level: float = 0.95) -> dict:
+    """
+    Previsión y reposición de todos los productos de `matrix` a la vez. Devuelve
+    arrays alineados con sus filas: `demanda_diaria`, `tendencia_diaria`,
+    `desviacion_diaria`, `dias_hasta_quiebre` (inf si no hay quiebre dentro de
+    `horizon_days`), `punto_reorden` y `cantidad_reorden`.
+    """
+    products, days = matrix.shape
+    stock = np.asarray(stock, dtype='float64')
+    window = max(1, min(int(rate_window_days), days))
+
+    rate = matrix[:, days - window:].mean(axis=1, dtype='float64')
+
+    # Pendiente por mínimos cuadrados: Σ(t - t̄)·y / Σ(t - t̄)², con t centrado.
+    centered = np.arange(days, dtype='float32') - np.float32((days - 1) / 2)
+    denominator = float(np.dot(centered, centered)) or 1.0
+    trend = (matrix @ centered).astype('float64') / denominator
+
+    # Varianza como E[y²] - E[y]² para no materializar una copia centrada de la matriz.
+    mean = matrix.mean(axis=1, dtype='float64')
+    mean_square = np.einsum('ij,ij->i', matrix, matrix, dtype='float64') / days
+    std = np.sqrt(np.clip(mean_square - mean * mean, 0, None))
+
+    # Días hasta el quiebre: raíz positiva de tendencia·h²/2 + demanda·h - stock = 0,
+    # en la forma 2·stock / (demanda + √disc), estable también con tendencia 0.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discriminant = rate * rate + 2 * trend * np.clip(stock, 0, None)
+        root = np.sqrt(np.clip(discriminant, 0, None))
+        reachable = (discriminant >= 0) & (rate + root > 0)
+        days_to_stockout = np.where(reachable, 2 * np.clip(stock, 0, None) / (rate + root), np.inf)
+    days_to_stockout = np.where(stock <= 0, 0.0, days_to_stockout)
+    days_to_stockout[days_to_stockout > horizon_days] = np.inf
+
+    z = NormalDist().inv_cdf(service_level)
+
+    def demand_over(period: float) -> np.ndarray:
+        return np.clip(rate * period + trend * period * period / 2, 0, None)
+
+    reorder_point = np.ceil(demand_over(lead_time_days) + z * std * np.sqrt(lead_time_days))
+    cover_days = lead_time_days + review_days
+    order_up_to = np.ceil(demand_over(cover_days) + z * std * np.sqrt(cover_days))
+    needs_reorder = (stock <= reorder_point) & (demand_over(cover_days) > 0)
+    reorder_quantity = np.where(needs_reorder, np.clip(order_up_to - stock, 0, None), 0.0)
+
+    return {
+        "demanda_diaria": rate,
+        "tendencia_diaria": trend,
+        "desviacion_diaria": std,
+        "dias_hasta_quiebre": days_to_stockout,
+        "punto_reorden": reorder_point,
+        "cantidad_reorden": np.ceil(reorder_quantity),
+    }
+
+
+def stockout_dates(reference_date, days_to_stockout: np.ndarray, index=None) -> pd.Series:
+    """
+    Fecha estimada de quiebre (AAAA-MM-DD) a partir de la fecha de referencia; nulo
+    si no hay quiebre dentro del horizonte.
+    """
+    finite = np.isfinite(days_to_stockout)
+    offsets = np.where(finite, np.floor(days_to_stockout), 0).astype('int64')
+    dates = np.datetime64(pd.Timestamp(reference_date).date(), 'D') + offsets.astype('timedelta64[D]')
+    values = np.where(finite, np.datetime_as_string(dates, unit='D'), None)
+    return pd.Series(values, index=index, dtype=pd.StringDtype('pyarrow'))
@@ -0,0 +1,225 @@
+# app/services/export_jobs.py
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app import extensions
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+def render_pdf(data, title: str) -> bytes:
+    """
+    Punto de entrada del pool de procesos. ReportLab se importa aquí, en el proceso
+    que renderiza, y no al arrancar la aplicación.
+    """
+    from app.services.pdf_service import render_inventory_pdf
+
+    return render_inventory_pdf(data, title)
+
+
+class ExportJobQueue:
+    """
+    Cola de exportaciones PDF en segundo plano.
+
+    El renderizado con ReportLab se ejecuta en un pool de procesos acotado para no
+    competir por el GIL con los hilos de la API. El estado de cada trabajo y los
+    PDF terminados se guardan en la caché compartida, de modo que cualquier worker
+    puede responder al sondeo y a la descarga. Los PDF se reutilizan por una clave
+    que combina los filtros y la versión de los datos de inventario.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.max_workers = 2
+        self.job_ttl = 3600
+        self.result_ttl = 3600
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get('PDF_EXPORT_WORKERS', self.max_workers)
+        self.job_ttl = app.config.get('PDF_EXPORT_JOB_TTL', self.job_ttl)
+        self.result_ttl = app.config.get('PDF_EXPORT_RESULT_TTL', self.result_ttl)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # El pool se crea en la primera exportación para no lanzar procesos al arrancar.
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """
+        Descarta un pool roto (un proceso hijo murió) para que la siguiente exportación
+        cree otro. Si ya se ha sustituido, no hace nada.
+        """
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Pool de exportación PDF roto; se creará uno nuevo.")
+
+    @staticmethod
+    def result_key(filters: dict, data_version) -> str:
+        # El orden de los valores de una lista de filtros no cambia el resultado.
+        normalized = {k: sorted(v) if isinstance(v, list) else v for k, v in filters.items()}
+        payload = json.dumps({"filters": normalized, "version": data_version}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def submit(self, filters: dict, data_version, load_data, title: str) -> dict:
+        """
+        Encola una exportación y devuelve el estado inicial del trabajo.
+        `load_data` solo se invoca si el PDF no está ya en caché ni en curso; si ya hay
+        un trabajo en curso con los mismos filtros y datos, se devuelve ese trabajo.
+        """
+        result_key = self.result_key(filters, data_version)
+        cache = extensions.cache
+
+        if cache.get(f"export-pdf/{result_key}") is not None:
+            job = self._new_job(result_key, JOB_DONE, cached=True)
+            self._save(job)
+            return self.get(job['job_id'])
+
+        job = self._new_job(result_key, JOB_QUEUED)
+        running_job = self._claim(job)
+        if running_job is not None:
+            return running_job
+
+        try:
+            data = load_data()
+        except Exception:
+            self._release_claim(result_key, job['job_id'])
+            cache.delete(f"export-job/{job['job_id']}")
+            raise
+        if not data:
+            self._release_claim(result_key, job['job_id'])
+            cache.delete(f"export-job/{job['job_id']}")
+            return None
+
+        # Se marca en curso antes de enviarlo: el callback de fin puede ejecutarse enseguida.
+        self._update(job['job_id'], status=JOB_RUNNING)
+        executor = self.executor
+        try:
+            try:
+                future = executor.submit(render_pdf, data, title)
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                executor = self.executor
+                future = executor.submit(render_pdf, data, title)
+        except Exception as e:
+            self._update(job['job_id'], status=JOB_FAILED, error=str(e))
+            self._release_claim(result_key, job['job_id'])
+            raise
+        future.add_done_callback(lambda f: self._on_done(job['job_id'], result_key, executor, f))
+        return self.get(job['job_id'])
+
+    def _claim(self, job: dict):
+        """
+        Reserva la exportación de `job['result_key']` para `job`. `cache.add` solo
+        escribe si la clave no existe, así que de varias peticiones simultáneas con
+        los mismos filtros solo una lanza el trabajo; el resto recibe ese trabajo.
+        Devuelve None si la reserva es de `job` o el trabajo en curso en otro caso.
+        """
+        cache = extensions.cache
+        running_key = f"export-running/{job['result_key']}"
+        # El trabajo se guarda antes de reservar: quien encuentre la reserva puede leerlo.
+        self._save(job)
+        for _ in range(2):
+            if cache.add(running_key, job['job_id'], timeout=self.job_ttl):
+                return None
+            running_job_id = cache.get(running_key)
+            running_job = self.get(running_job_id) if running_job_id else None
+            if running_job and running_job['status'] in (JOB_QUEUED, JOB_RUNNING):
+                cache.delete(f"export-job/{job['job_id']}")
+                return running_job
+            # Reserva de un trabajo que ya no está en curso (terminó o caducó): se libera y se reintenta.
+            if running_job_id and cache.get(running_key) == running_job_id:
+                cache.delete(running_key)
+        # Otra petición ganó la reserva liberada; se lanza igualmente para no dejar esta sin trabajo.
+        logger.warning(f"No se pudo reservar la exportación {job['result_key']}; se lanza sin reserva.")
+        return None
+
+    @staticmethod
+    def _release_claim(result_key: str, job_id: str):
+        # Solo se libera la reserva propia: pudo caducar y pasar a otro trabajo.
+        cache = extensions.cache
+        running_key = f"export-running/{result_key}"
+        if cache.get(running_key) == job_id:
+            cache.delete(running_key)
+
+    def get(self, job_id: str):
+        return extensions.cache.get(f"export-job/{job_id}")
+
+    def get_result(self, job_id: str):
+        """
+        Devuelve los bytes del PDF de un trabajo terminado, o None si no están disponibles.
+        """
+        job = self.get(job_id)
+        if not job or job['status'] != JOB_DONE:
+            return None
+        return extensions.cache.get(f"export-pdf/{job['result_key']}")
+
+    def _on_done(self, job_id: str, result_key: str, executor: ProcessPoolExecutor, future):
+        with self.app.app_context():
+            cache = extensions.cache
+            try:
+                pdf_bytes = future.result()
+                cache.set(f"export-pdf/{result_key}", pdf_bytes, timeout=self.result_ttl)
+                self._update(job_id, status=JOB_DONE)
+                logger.info(f"Exportación PDF {job_id} terminada ({len(pdf_bytes)} bytes).")
+            except BrokenProcessPool as e:
+                self._discard_executor(executor)
+                logger.error(f"Error en la exportación PDF {job_id}: {e}")
+                self._update(job_id, status=JOB_FAILED, error=str(e))
+            except Exception as e:
+                logger.error(f"Error en la exportación PDF {job_id}: {e}")
+                self._update(job_id, status=JOB_FAILED, error=str(e))
+            finally:
+                self._release_claim(result_key, job_id)
+
+    def _new_job(self, result_key: str, status: str, cached: bool = False) -> dict:
+        now = time.time()
+        return {
+            "job_id": uuid.uuid4().hex,
+            "status": status,
+            "result_key": result_key,
+            "cached": cached,
+            "created_at": now,
+            "updated_at": now,
+            "error": None,
+        }
+
+    def _update(self, job_id: str, **changes):
+        job = extensions.cache.get(f"export-job/{job_id}")
+        if job is None:
+            return
+        job.update(changes, updated_at=time.time())
+        self._save(job)
+
+    def _save(self, job: dict):
+        extensions.cache.set(f"export-job/{job['job_id']}", job, timeout=self.job_ttl)
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
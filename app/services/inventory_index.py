@@ -0,0 +1,176 @@
+# app/services/inventory_index.py
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+# Filtros de rango admitidos: (columna, clave del mínimo, clave del máximo).
+RANGE_FILTERS = (
+    ('stock_actual', 'stock_min', 'stock_max'),
+    ('unidades_vendidas_30d', 'sales_min', 'sales_max'),
+)
+LIST_FILTERS = ('categories', 'statuses')
+NAME_FILTER = 'name'
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    if not isinstance(value, (list, tuple, set)):
+        raise ValueError(f"Se esperaba una lista de valores y se recibió '{value}'.")
+    return [str(v) for v in value if v is not None and str(v) != '']
+
+
+def normalize_inventory_filters(filters: dict) -> dict:
+    """
+    Valida y normaliza los filtros de inventario: `categories` y `statuses` (listas),
+    `stock_min`/`stock_max` y `sales_min`/`sales_max` (números, ambos extremos incluidos)
+    y `name` (subcadena del nombre, sin distinguir mayúsculas). Omite los vacíos y
+    lanza ValueError si alguno no es válido.
+    """
+    filters = filters or {}
+    normalized = {}
+    for key in LIST_FILTERS:
+        values = _as_list(filters.get(key))
+        if values:
+            normalized[key] = values
+
+    for _, low, high in RANGE_FILTERS:
+        for key in (low, high):
+            raw = filters.get(key)
+            if raw is None or raw == '':
+                continue
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                value = float('nan')
+            if np.isnan(value):
+                raise ValueError(f"El filtro '{key}' debe ser numérico.")
+            normalized[key] = value
+        if low in normalized and high in normalized and normalized[low] > normalized[high]:
+            raise ValueError(f"'{low}' no puede ser mayor que '{high}'.")
+
+    name = filters.get(NAME_FILTER)
+    if name is not None and not isinstance(name, str):
+        raise ValueError(f"El filtro '{NAME_FILTER}' debe ser texto.")
+    if name and name.strip():
+        normalized[NAME_FILTER] = name.strip()
+    return normalized
+
+
+class _SortedColumn:
+    """
+    Columna numérica ordenada una sola vez: un rango se resuelve con dos búsquedas
+    binarias y marca solo las posiciones que caen dentro.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.order = np.argsort(values, kind='stable')
+        self.sorted = values[self.order]
+        # Los NaN quedan al final y no pertenecen a ningún rango.
+        self.valid = len(self.sorted) - int(np.isnan(self.sorted).sum())
+
+    def mask(self, size: int, low: float = None, high: float = None) -> np.ndarray:
+        start = 0 if low is None else int(np.searchsorted(self.sorted[:self.valid], low, side='left'))
+        stop = self.valid if high is None else int(np.searchsorted(self.sorted[:self.valid], high, side='right'))
+        mask = np.zeros(size, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return mask
+
+
+class InventoryIndex:
+    """
+    Índices sobre una instantánea de inventario para filtrar sin recorrer el
+    DataFrame en cada petición:
+    - estado y categoría: códigos categóricos; un conjunto de valores se traduce a
+      una tabla de consulta por código y la máscara sale de un solo acceso indexado.
+    - stock y ventas a 30 días: posiciones ordenadas por valor (búsqueda binaria).
+    - nombre: nombres ya en minúsculas como array Arrow para buscar subcadenas;
+      la búsqueda se hace al final y solo sobre las filas que quedan.
+
+    Las máscaras se combinan con AND de numpy. El índice es inmutable y se construye
+    una vez por versión de la instantánea.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        started = time.perf_counter()
+        self.frame = frame
+        self.size = len(frame)
+        self._codes = {}
+        self._categories = {}
+        for column in ('estado', 'categoria'):
+            codes, categories = self._encode(frame[column])
+            self._codes[column] = codes
+            self._categories[column] = {value: code for code, value in enumerate(categories)}
+        self._ranges = {
+            column: _SortedColumn(pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+            for column, _, _ in RANGE_FILTERS
+        }
+        names = pa.array(frame['nombre_del_producto'].astype(object), type=pa.large_string(), from_pandas=True)
+        self._names = pc.utf8_lower(names)
+        logger.info(f"Índice de inventario construido ({self.size} productos) "
+                    f"en {(time.perf_counter() - started) * 1000:.1f} ms.")
+
+    @staticmethod
+    def _encode(series: pd.Series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy(), [str(c) for c in series.cat.categories]
+        codes, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+        return codes, [str(u) for u in uniques]
+
+    def _values_mask(self, column: str, values: list) -> np.ndarray:
+        lookup = self._categories[column]
+        # Una posición más para el código -1 (nulo), que nunca coincide.
+        table = np.zeros(len(lookup) + 1, dtype=bool)
+        for value in values:
+            code = lookup.get(value)
+            if code is not None:
+                table[code] = True
+        return table[self._codes[column]]
+
+    def _match_name(self, text: str, positions: np.ndarray = None) -> np.ndarray:
+        names = self._names if positions is None else self._names.take(positions)
+        matches = pc.match_substring(names, pattern=text.lower())
+        return pc.fill_null(matches, False).to_numpy(zero_copy_only=False)
+
+    def mask(self, filters: dict) -> np.ndarray:
+        """
+        Máscara booleana de las filas que cumplen `filters` (ya normalizados), o None
+        si no hay ningún filtro.
+        """
+        masks = []
+        if filters.get('statuses'):
+            masks.append(self._values_mask('estado', filters['statuses']))
+        if filters.get('categories'):
+            masks.append(self._values_mask('categoria', filters['categories']))
+        for column, low_key, high_key in RANGE_FILTERS:
+            low, high = filters.get(low_key), filters.get(high_key)
+            if low is not None or high is not None:
+                masks.append(self._ranges[column].mask(self.size, low, high))
+        result = np.logical_and.reduce(masks) if masks else None
+
+        name = filters.get(NAME_FILTER)
+        if name:
+            if result is None:
+                return self._match_name(name)
+            # La búsqueda de subcadenas es lo más caro: solo sobre las filas que
+            # ya han pasado el resto de filtros.
+            candidates = np.flatnonzero(result)
+            result[candidates[~self._match_name(name, candidates)]] = False
+        return result
+
+    def select(self, filters: dict) -> pd.DataFrame:
+        """
+        Filas de la instantánea que cumplen `filters`, en su orden original.
+        """
+        mask = self.mask(filters)
+        if mask is None:
+            return self.frame
+        return self.frame.iloc[np.flatnonzero(mask)]
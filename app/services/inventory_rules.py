@@ -0,0 +1,74 @@
+# app/services/inventory_rules.py
+import numpy as np
+import pandas as pd
+
+from app.utils.settings import get_setting
+
+# Estados de inventario en el orden de sus códigos categóricos.
+STATUS_SIN_STOCK = 'Sin Stock'
+STATUS_ESTANCADO = 'Inventario Estancado'
+STATUS_RIESGO = 'Riesgo de Quiebre'
+STATUS_ALTA_ROTACION = 'Alta Rotación'
+STATUS_LENTA_ROTACION = 'Lenta Rotación'
+STATUS_SALUDABLE = 'Rotación Saludable'
+
+INVENTORY_STATUSES = [
+    STATUS_SIN_STOCK,
+    STATUS_ESTANCADO,
+    STATUS_RIESGO,
+    STATUS_ALTA_ROTACION,
+    STATUS_LENTA_ROTACION,
+    STATUS_SALUDABLE,
+]
+INVENTORY_STATUS_DTYPE = pd.CategoricalDtype(categories=INVENTORY_STATUSES)
+
+
+def get_status_thresholds() -> dict:
+    """
+    Umbrales de clasificación leídos de la configuración.
+    """
+    return {
+        "window_days": get_setting('INVENTORY_SALES_WINDOW_DAYS', 30),
+        "risk_days": get_setting('INVENTORY_RISK_DAYS', 7),
+        "high_rotation_days": get_setting('INVENTORY_HIGH_ROTATION_DAYS', 30),
+        "slow_rotation_days": get_setting('INVENTORY_SLOW_ROTATION_DAYS', 90),
+    }
+
+
+def compute_days_of_inventory(stock: pd.Series, sales_window: pd.Series, window_days: int) -> np.ndarray:
+    """
+    Días de inventario a partir de la venta diaria media de la ventana; infinito si no hay ventas.
+    """
+    daily_sales = sales_window.to_numpy(dtype='float64') / window_days
+    stock_values = stock.to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(daily_sales > 0, stock_values / daily_sales, np.inf)
+
+
+def classify_inventory_status(stock: pd.Series, sales_window: pd.Series, days_of_inventory,
+                              risk_days: float = 7, high_rotation_days: float = 30,
+                              slow_rotation_days: float = 90) -> pd.Categorical:
+    """
+    Clasifica todos los productos de una vez. Las reglas se evalúan en orden y
+    gana la primera que se cumple, igual que la antigua función por fila.
+    """
+    stock_values = stock.to_numpy(dtype='float64')
+    sales_values = sales_window.to_numpy(dtype='float64')
+    doi = np.asarray(days_of_inventory, dtype='float64')
+
+    conditions = [
+        stock_values <= 0,
+        sales_values == 0,
+        doi <= risk_days,
+        doi <= high_rotation_days,
+        doi > slow_rotation_days,
+    ]
+    choices = [
+        INVENTORY_STATUSES.index(STATUS_SIN_STOCK),
+        INVENTORY_STATUSES.index(STATUS_ESTANCADO),
+        INVENTORY_STATUSES.index(STATUS_RIESGO),
+        INVENTORY_STATUSES.index(STATUS_ALTA_ROTACION),
+        INVENTORY_STATUSES.index(STATUS_LENTA_ROTACION),
+    ]
+    codes = np.select(conditions, choices, default=INVENTORY_STATUSES.index(STATUS_SALUDABLE)).astype('int8')
+    return pd.Categorical.from_codes(codes, dtype=INVENTORY_STATUS_DTYPE)
@@ -0,0 +1,142 @@
+# app/services/inventory_snapshot.py
+import contextlib
+import logging
+import threading
+import time
+
+import pandas as pd
+
+from app.utils.result_cache import fresh_results
+from app.utils.settings import get_setting
+from app.utils.staleness import collect_stale, mark_stale
+
+logger = logging.getLogger(__name__)
+
+
+class InventorySnapshot:
+    """
+    Instantánea en memoria del inventario completo.
+
+    El DataFrame de inventario se calcula una sola vez con `loader` y se sirve
+    durante `INVENTORY_SNAPSHOT_TTL` segundos. Las vistas por categoría, el informe
+    de salud y la lista crítica filtran esta instantánea en memoria en lugar de
+    volver a lanzar la consulta de inventario.
+
+    Si la carga usó resultados antiguos del warehouse (modo degradado), la
+    instantánea solo se reutiliza `DEGRADED_CACHE_TIMEOUT` segundos y cada petición
+    que la lee queda marcada con esos resultados. Lo mismo si la última recarga
+    falló y se sigue sirviendo la instantánea anterior; en ese caso no se vuelve a
+    intentar hasta pasados `min(ttl, INVENTORY_SNAPSHOT_RETRY_INTERVAL)` segundos,
+    para que cada petición no relance la carga contra un warehouse con problemas.
+    """
+
+    def __init__(self, loader, ttl: float = None):
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._frame = None
+        self._version = None
+        # (instantánea, versión) de la misma carga, en un solo atributo para leerlos juntos.
+        self._current = (None, None)
+        self._loaded_at = 0.0
+        # (consulta, antigüedad al cargar) de los resultados antiguos con que se construyó.
+        self._stale = []
+        self._refresh_failed = False
+        self._retry_at = 0.0
+
+    @property
+    def ttl(self) -> float:
+        ttl = self._ttl if self._ttl is not None else get_setting('INVENTORY_SNAPSHOT_TTL', 300)
+        if self._stale:
+            return min(ttl, get_setting('DEGRADED_CACHE_TIMEOUT', 30))
+        return ttl
+
+    @property
+    def version(self):
+        """
+        Sello de versión del contenido de la instantánea (None si aún no se ha cargado).
+        """
+        return self._version
+
+    @property
+    def loaded_at(self) -> float:
+        return self._loaded_at
+
+    def is_fresh(self) -> bool:
+        if self._frame is None:
+            return False
+        now = time.time()
+        return now - self._loaded_at < self.ttl or now < self._retry_at
+
+    def get(self) -> pd.DataFrame:
+        """
+        Devuelve la instantánea vigente, recalculándola si ha caducado.
+        Solo un hilo recalcula; el resto sigue usando la versión anterior si existe.
+        """
+        if self.is_fresh():
+            return self._serve()
+
+        blocking = self._frame is None
+        if not self._lock.acquire(blocking=blocking):
+            return self._serve()
+        try:
+            if self.is_fresh():
+                return self._serve()
+            self._refresh()
+            return self._serve() if self._frame is not None else pd.DataFrame()
+        finally:
+            self._lock.release()
+
+    def get_versioned(self) -> tuple:
+        """
+        Devuelve `(instantánea, versión)` de una misma carga, aunque otro hilo
+        recalcule la instantánea entre medias. Sin inventario, `(DataFrame vacío, None)`.
+        """
+        self.get()
+        frame, version = self._current
+        if frame is None:
+            return pd.DataFrame(), None
+        return frame, version
+
+    def _serve(self) -> pd.DataFrame:
+        elapsed = time.time() - self._loaded_at
+        for label, age in self._stale:
+            mark_stale(label, age + elapsed)
+        if self._refresh_failed:
+            mark_stale('inventory_snapshot', elapsed)
+        return self._frame
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+            self._retry_at = 0.0
+
+    def _refresh(self):
+        started = time.perf_counter()
+        # Una recarga pide datos actuales; la primera carga de un worker puede salir de la caché de resultados.
+        reload = fresh_results() if self._frame is not None else contextlib.nullcontext()
+        try:
+            with collect_stale() as stale, reload:
+                frame = self._loader()
+        except Exception as e:
+            # Sin instantánea previa el error llega a quien la pide; con ella, se sigue sirviendo.
+            if self._frame is None:
+                raise
+            logger.error(f"Error al recargar la instantánea de inventario: {e}")
+            frame = None
+        if frame is None or frame.empty:
+            # No se guarda un resultado vacío: suele indicar un fallo del warehouse.
+            logger.warning("La carga de la instantánea de inventario no devolvió datos.")
+            self._refresh_failed = self._frame is not None
+            self._retry_at = time.time() + min(self.ttl, get_setting('INVENTORY_SNAPSHOT_RETRY_INTERVAL', 30))
+            return
+
+        self._frame = frame
+        self._stale = list(stale)
+        self._refresh_failed = False
+        self._retry_at = 0.0
+        self._version = format(int(pd.util.hash_pandas_object(frame, index=False).sum()) & 0xFFFFFFFFFFFFFFFF, '016x')
+        self._current = (frame, self._version)
+        self._loaded_at = time.time()
+        logger.info(f"Instantánea de inventario recalculada ({len(frame)} productos, "
+                    f"versión {self._version}) en {time.perf_counter() - started:.2f}s.")
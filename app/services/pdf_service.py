@@ -4,26 +4,78 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from io import BytesIO
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from datetime import datetime
+from itertools import groupby
+import functools
+import tempfile
 import locale
 import logging
 
+from app.utils.settings import get_setting
+
 logger = logging.getLogger(__name__)
 
-# Establecer el locale en español para el nombre del mes
-try:
-    locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-except locale.Error:
+
+@functools.lru_cache(maxsize=None)
+def _use_spanish_locale():
+    """
+    Establece el locale en español para el nombre del mes. Se hace una sola vez, al
+    generar el primer PDF: setlocale afecta a todo el proceso y no debe ejecutarse
+    al importar.
+    """
     try:
-        locale.setlocale(locale.LC_TIME, 'Spanish_Spain.1252')
+        locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
     except locale.Error:
-        logger.warning("No se pudo establecer el locale en español para las fechas del PDF.")
+        try:
+            locale.setlocale(locale.LC_TIME, 'Spanish_Spain.1252')
+        except locale.Error:
+            logger.warning("No se pudo establecer el locale en español para las fechas del PDF.")
+
+
+TABLE_HEADER = ["Producto", "Stock Actual", "Ventas (30d)", "Estado"]
+COL_WIDTHS = [3.5 * inch, 1.2 * inch, 1.2 * inch, 1.6 * inch]
+
+# Mapeo de colores de estado (coincidiendo con el dashboard)
+STATUS_COLORS = {
+    'Sin Stock': colors.HexColor("#FECACA"),  # bg-red-100
+    'Riesgo de Quiebre': colors.HexColor("#FEE2E2"),
+    'Inventario Estancado': colors.HexColor("#E5E7EB"),  # bg-gray-200
+    'Lenta Rotación': colors.HexColor("#FDE68A"),  # bg-yellow-100
+    'Alta Rotación': colors.HexColor("#BFDBFE"),  # bg-blue-100
+    'Rotación Saludable': colors.HexColor("#A7F3D0")  # bg-green-100
+}
+
+# Estilo base de la tabla
+BASE_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#005f6b")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor("#00b8d4")),
+    ('LEFTPADDING', (0, 0), (0, -1), 10),
+    ('RIGHTPADDING', (-1, 0), (-1, -1), 10),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+]
 
 
 class PDFService:
-    def create_inventory_list_pdf(self, data, title="Informe de Inventario"):
-        buffer = BytesIO()
+    def create_inventory_list_pdf(self, data, title="Informe de Inventario", chunked: bool = None):
+        """
+        Genera el PDF de inventario y devuelve un fichero posicionado al inicio.
+
+        Con muchas filas (`PDF_CHUNKED_THRESHOLD` o `chunked=True`) se usa el modo
+        por bloques: tablas de tamaño fijo con cabecera repetida, colores aplicados
+        por tramos de filas consecutivas con el mismo estado y nombres como texto
+        plano cuando caben sin ajuste de línea. El PDF se escribe en un fichero temporal
+        que solo pasa a disco si supera `PDF_SPOOL_MAX_MEMORY` bytes.
+        """
+        if chunked is None:
+            chunked = len(data) >= get_setting('PDF_CHUNKED_THRESHOLD', 2000)
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=get_setting('PDF_SPOOL_MAX_MEMORY', 8 * 1024 * 1024))
         doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=inch / 2, leftMargin=inch / 2, topMargin=inch / 2,
                                 bottomMargin=inch / 2)
 
@@ -34,13 +86,25 @@ class PDFService:
         main_title = Paragraph(title, styles['h1'])
         story.append(main_title)
 
+        _use_spanish_locale()
         date_str = datetime.now().strftime("%d de %B de %Y")
         date_para = Paragraph(f"Generado el: {date_str.capitalize()}", styles['Normal'])
         story.append(date_para)
         story.append(Spacer(1, 0.25 * inch))
 
+        if chunked:
+            story.extend(self._build_chunked_tables(data, styles))
+        else:
+            story.append(self._build_single_table(data, styles))
+
+        doc.build(story)
+
+        buffer.seek(0)
+        return buffer
+
+    def _build_single_table(self, data, styles):
         # Preparar datos para la tabla
-        table_data = [["Producto", "Stock Actual", "Ventas (30d)", "Estado"]]
+        table_data = [TABLE_HEADER]
 
         for item in data:
             # CORRECCIÓN: Convertir stock a entero para eliminar el ".0"
@@ -54,43 +118,65 @@ class PDFService:
             ])
 
         # Crear y estilizar la tabla
-        table = Table(table_data, colWidths=[3.5 * inch, 1.2 * inch, 1.2 * inch, 1.6 * inch])
-
-        # Estilo base de la tabla
-        style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#005f6b")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor("#00b8d4")),
-            ('LEFTPADDING', (0, 0), (0, -1), 10),
-            ('RIGHTPADDING', (-1, 0), (-1, -1), 10),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ])
-
-        # Mapeo de colores de estado (coincidiendo con el dashboard)
-        status_colors = {
-            'Sin Stock': colors.HexColor("#FECACA"),  # bg-red-100
-            'Riesgo de Quiebre': colors.HexColor("#FEE2E2"),
-            'Inventario Estancado': colors.HexColor("#E5E7EB"),  # bg-gray-200
-            'Lenta Rotación': colors.HexColor("#FDE68A"),  # bg-yellow-100
-            'Alta Rotación': colors.HexColor("#BFDBFE"),  # bg-blue-100
-            'Rotación Saludable': colors.HexColor("#A7F3D0")  # bg-green-100
-        }
+        table = Table(table_data, colWidths=COL_WIDTHS)
+        style = TableStyle(BASE_TABLE_STYLE)
 
         # Colorear filas según el estado
         for i, row in enumerate(data):
             status = row['estado']
-            color = status_colors.get(status)
+            color = STATUS_COLORS.get(status)
             if color:
                 style.add('BACKGROUND', (0, i + 1), (-1, i + 1), color)
 
         table.setStyle(style)
-
-        story.append(table)
-        doc.build(story)
-
-        buffer.seek(0)
-        return buffer
+        return table
+
+    def _build_chunked_tables(self, data, styles):
+        """
+        Divide los datos en tablas de `PDF_ROWS_PER_TABLE` filas con la cabecera repetida.
+        Las filas conservan el orden recibido (el que eligió quien exporta); las filas
+        consecutivas con el mismo estado se colorean con un único comando por tramo.
+        """
+        rows_per_table = get_setting('PDF_ROWS_PER_TABLE', 40)
+
+        body_style = styles['BodyText']
+        # Ancho útil de la columna de producto descontando los márgenes interiores de la celda.
+        name_width = COL_WIDTHS[0] - 10 - 6
+
+        tables = []
+        for start in range(0, len(data), rows_per_table):
+            chunk = data[start:start + rows_per_table]
+            table_data = [TABLE_HEADER]
+            for item in chunk:
+                name = item.get('nombre_del_producto', '') or ''
+                if stringWidth(name, body_style.fontName, body_style.fontSize) > name_width:
+                    name = Paragraph(name, body_style)
+                table_data.append([
+                    name,
+                    int(item.get('stock_actual', 0)),
+                    item.get('unidades_vendidas_30d', 0),
+                    item.get('estado', 'N/A'),
+                ])
+
+            commands = list(BASE_TABLE_STYLE)
+            row = 1
+            for status, run in groupby(chunk, key=lambda item: item.get('estado')):
+                run_length = sum(1 for _ in run)
+                color = STATUS_COLORS.get(status)
+                if color:
+                    commands.append(('BACKGROUND', (0, row), (-1, row + run_length - 1), color))
+                row += run_length
+
+            table = Table(table_data, colWidths=COL_WIDTHS, repeatRows=1)
+            table.setStyle(TableStyle(commands))
+            tables.append(table)
+        return tables
+
+
+def render_inventory_pdf(data, title="Informe de Inventario") -> bytes:
+    """
+    Genera el PDF de inventario y devuelve sus bytes. Es una función de módulo
+    para poder ejecutarse en un proceso aparte (ProcessPoolExecutor).
+    """
+    with PDFService().create_inventory_list_pdf(data, title) as pdf_file:
+        return pdf_file.read()
@@ -0,0 +1,174 @@
+# app/services/product_dimension.py
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.result_cache import fresh_results
+from app.utils.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+SERVICE_CATEGORY = 'servicio tecnico'
+
+
+def product_code_keys(codes) -> pd.Index:
+    """
+    Códigos de producto como texto, para unir tablas aunque un lado los traiga como
+    enteros y el otro como texto. Los enteros que llegan como float (por un nulo)
+    pierden el '.0'.
+    """
+    codes = pd.Series(codes)
+    if pd.api.types.is_float_dtype(codes):
+        try:
+            codes = codes.astype('Int64')
+        except (TypeError, ValueError):
+            pass
+    return pd.Index(codes.astype(str), name='codigo_producto')
+
+
+class ProductDimension:
+    """
+    Vista inmutable de dim_products indexada por `codigo_producto` (como texto, ver
+    `product_code_keys`) y por categoría.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        keys = product_code_keys(frame['codigo_producto'])
+        unique = ~keys.duplicated(keep='first')
+        codes = frame['codigo_producto'].to_numpy()[unique]
+        self.frame = frame.loc[unique, ['nombre_del_producto', 'categoria']].set_axis(keys[unique], axis=0)
+
+        categories = self.frame['categoria']
+        is_service = (categories.str.lower() == SERVICE_CATEGORY).fillna(False).to_numpy(dtype=bool)
+        self._is_service = is_service
+        # Productos que pueden aparecer en inventario: con categoría y fuera de 'Servicio Tecnico'.
+        self._is_listed = categories.notna().to_numpy(dtype=bool) & ~is_service
+        # Con el tipo original: se envían como parámetros al warehouse.
+        self.service_codes = codes[is_service].tolist()
+
+        # Posiciones de los productos de cada categoría (sin 'Servicio Tecnico').
+        positions = pd.Series(np.arange(len(self.frame)), index=self.frame.index)[~is_service]
+        self._positions_by_category = {
+            str(category): group.to_numpy()
+            for category, group in positions.groupby(categories[~is_service].astype(object), sort=True)
+        }
+        self.categories = sorted(self._positions_by_category)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def products(self, category: str = None) -> pd.DataFrame:
+        """
+        Productos fuera de 'Servicio Tecnico', opcionalmente de una sola categoría.
+        """
+        if category:
+            positions = self._positions_by_category.get(category, np.empty(0, dtype='int64'))
+            return self.frame.iloc[positions]
+        return self.frame[~self._is_service]
+
+    def attach(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Añade nombre y categoría a `df` por `codigo_producto` y conserva solo los productos
+        con categoría distinta de 'Servicio Tecnico' (lo que hacía el JOIN en el warehouse).
+        La clave se compara como texto; la columna `codigo_producto` de `df` conserva su tipo.
+        """
+        listed = self.frame[self._is_listed]
+        positions = listed.index.get_indexer(product_code_keys(df['codigo_producto']))
+        matched = positions >= 0
+        result = df[matched].copy()
+        for column in listed.columns:
+            result[column] = listed[column].to_numpy()[positions[matched]]
+        return result
+
+
+class ProductDimensionCache:
+    """
+    Dimensión de productos en memoria, compartida por todo el proceso.
+
+    dim_products cambia rara vez: se carga una vez con `loader` y, como mucho cada
+    `PRODUCT_DIMENSION_PROBE_INTERVAL` segundos, se comprueba con `probe` (número de
+    filas y huella del contenido) si ha cambiado; solo entonces se vuelve a cargar.
+    """
+
+    def __init__(self, loader, probe, probe_interval: float = None):
+        self._loader = loader
+        self._probe = probe
+        self._probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._dimension = None
+        self._signature = None
+        self._checked_at = 0.0
+
+    @property
+    def probe_interval(self) -> float:
+        if self._probe_interval is not None:
+            return self._probe_interval
+        return get_setting('PRODUCT_DIMENSION_PROBE_INTERVAL', 300)
+
+    @property
+    def signature(self):
+        return self._signature
+
+    def is_fresh(self) -> bool:
+        return self._dimension is not None and (time.time() - self._checked_at) < self.probe_interval
+
+    def get(self):
+        """
+        Devuelve la dimensión vigente (None si nunca se ha podido cargar). Solo un hilo
+        sondea o recarga; el resto sigue usando la versión anterior si existe.
+        """
+        if self.is_fresh():
+            return self._dimension
+
+        if not self._lock.acquire(blocking=self._dimension is None):
+            return self._dimension
+        try:
+            if not self.is_fresh():
+                self._refresh()
+            return self._dimension
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = 0.0
+            self._signature = None
+
+    def _refresh(self):
+        try:
+            signature = self._probe()
+        except Exception as e:
+            logger.warning(f"Error al sondear dim_products: {e}")
+            signature = None
+        if signature is None:
+            logger.warning("No se pudo sondear dim_products; se conserva la dimensión en memoria.")
+            if self._dimension is not None:
+                self._checked_at = time.time()
+                return
+        elif self._dimension is not None and signature == self._signature:
+            self._checked_at = time.time()
+            return
+
+        started = time.perf_counter()
+        # Sin la caché de resultados: la firma es la actual y las filas deben serlo también.
+        try:
+            with fresh_results():
+                frame = self._loader()
+        except Exception as e:
+            # Sin dimensión previa el error llega a quien la pide; con ella, se sigue usando.
+            if self._dimension is None:
+                raise
+            logger.warning(f"Error al recargar dim_products; se conserva la dimensión en memoria: {e}")
+            self._checked_at = time.time()
+            return
+        if frame is None or frame.empty:
+            logger.warning("La carga de dim_products no devolvió datos.")
+            return
+        self._dimension = ProductDimension(frame)
+        self._signature = signature
+        self._checked_at = time.time()
+        logger.info(f"Dimensión de productos cargada ({len(self._dimension)} productos, "
+                    f"{len(self._dimension.categories)} categorías) en {time.perf_counter() - started:.2f}s.")
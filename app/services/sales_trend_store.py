@@ -0,0 +1,129 @@
+# app/services/sales_trend_store.py
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.result_cache import fresh_results
+from app.utils.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Columna que agrupa las ventas de productos sin categoría en la tabla diaria.
+UNCATEGORIZED = '__sin_categoria__'
+
+
+class SalesTrendStore:
+    """
+    Agregado local de unidades vendidas por día y categoría.
+
+    La primera vez se carga el histórico completo; a partir de ahí solo se piden
+    al warehouse los días posteriores a la marca de agua (el último día cargado
+    se vuelve a pedir porque puede estar incompleto). Cualquier rango de fechas
+    se responde recortando este agregado en memoria.
+    """
+
+    def __init__(self, loader, refresh_interval: float = None):
+        self._loader = loader
+        self._refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._daily = None  # índice: fecha; columnas: categorías
+        self._totals = None  # unidades por día de todas las categorías
+        self._high_water_mark = None
+        self._checked_at = 0.0
+
+    @property
+    def refresh_interval(self) -> float:
+        if self._refresh_interval is not None:
+            return self._refresh_interval
+        return get_setting('SALES_TREND_REFRESH_INTERVAL', 300)
+
+    @property
+    def high_water_mark(self):
+        return self._high_water_mark
+
+    def ensure_fresh(self) -> bool:
+        """
+        Carga o actualiza el agregado si toca. Devuelve False si no hay datos disponibles.
+        """
+        if self._daily is not None and time.time() - self._checked_at < self.refresh_interval:
+            return True
+
+        with self._lock:
+            if self._daily is not None and time.time() - self._checked_at < self.refresh_interval:
+                return True
+            if self._daily is None:
+                self._load_full()
+            else:
+                self._load_delta()
+        return self._daily is not None
+
+    def get_range(self, start_date: str, end_date: str, category: str = None) -> pd.DataFrame:
+        """
+        Unidades por día entre `start_date` y `end_date` (inclusive), con los días sin
+        ventas a cero. Devuelve las columnas `fecha` y `unidades` (int64).
+        """
+        date_range_index = pd.date_range(start=start_date, end=end_date, freq='D')
+        if category:
+            daily = self._daily
+            series = daily[category] if category in daily.columns else pd.Series(dtype='int64')
+        else:
+            series = self._totals
+
+        units = series.loc[start_date:end_date].reindex(date_range_index, fill_value=0)
+        # La suma puede llegar como decimal (o pasar a float al rellenar): las unidades son enteras.
+        return pd.DataFrame({'fecha': date_range_index,
+                             'unidades': units.fillna(0).round().to_numpy(dtype='int64')})
+
+    def _load_full(self):
+        started = time.perf_counter()
+        df = self._loader()
+        if df.empty:
+            logger.warning("La carga inicial del agregado de ventas diarias no devolvió datos.")
+            return
+        self._daily = self._pivot(df)
+        self._totals = self._daily.sum(axis=1)
+        self._high_water_mark = self._daily.index.max()
+        self._checked_at = time.time()
+        logger.info(f"Agregado de ventas diarias cargado ({len(self._daily)} días) "
+                    f"en {time.perf_counter() - started:.2f}s.")
+
+    def _load_delta(self):
+        since = self._high_water_mark.strftime('%Y-%m-%d')
+        # Se marca antes de consultar: si falla, no se reintenta hasta el siguiente intervalo.
+        self._checked_at = time.time()
+        try:
+            with fresh_results():
+                df = self._loader(since)
+        except Exception as e:
+            logger.warning(f"Error al actualizar el agregado de ventas diarias desde {since}; "
+                           f"se conservan los días ya cargados: {e}")
+            return
+        if df.empty:
+            return
+
+        delta = self._pivot(df)
+        kept = self._daily[self._daily.index < self._high_water_mark]
+        # Las categorías que faltan en una de las partes quedan a NaN: se rellenan y se
+        # conserva el tipo entero original cuando ambas partes lo son.
+        value_dtype = np.result_type(*kept.dtypes, *delta.dtypes)
+        self._daily = pd.concat([kept, delta]).fillna(0).astype(value_dtype).sort_index()
+        self._totals = self._daily.sum(axis=1)
+        self._high_water_mark = self._daily.index.max()
+        logger.info(f"Agregado de ventas diarias actualizado desde {since} ({len(delta)} días).")
+
+    @staticmethod
+    def _pivot(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.assign(
+            fecha_venta=pd.to_datetime(df['fecha_venta']),
+            # Como texto: una categórica no admite rellenar con un valor fuera de sus categorías.
+            categoria=df['categoria'].astype(object).fillna(UNCATEGORIZED),
+            total_unidades=pd.to_numeric(df['total_unidades'], errors='coerce').fillna(0),
+        )
+        daily = df.pivot_table(index='fecha_venta', columns='categoria', values='total_unidades',
+                               aggfunc='sum', fill_value=0)
+        daily.columns.name = None
+        daily.index.name = None
+        return daily
@@ -0,0 +1,146 @@
+# app/services/summary_refresher.py
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+
+from app import extensions
+from app.utils.summary_tables import (
+    get_full_refresh_statements,
+    get_incremental_refresh_statements,
+    get_high_water_mark_query,
+)
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = "summary-tables/status"
+LOCK_KEY = "lock/summary-tables"
+
+summary_cli = AppGroup('summary-tables', help="Mantenimiento de las tablas resumen de la capa gold.")
+
+
+@summary_cli.command('refresh')
+@click.option('--full', is_flag=True, help="Reconstruye las tablas desde cero en lugar de actualizar los últimos días.")
+def refresh_command(full):
+    """Construye o actualiza las tablas resumen."""
+    status = extensions.summary_refresher.refresh(full=full or None)
+    click.echo(f"Tablas resumen actualizadas ({status['mode']}) en {status['duration_ms']} ms.")
+
+
+class SummaryTableRefresher:
+    """
+    Mantiene las tablas resumen (último stock, unidades diarias por producto y
+    categoría, y rango de fechas) de las que leen las consultas calientes.
+
+    Cada ciclo recalcula solo los días desde la marca de agua; la reconstrucción
+    completa se hace la primera vez y cada `SUMMARY_FULL_REFRESH_INTERVAL`
+    segundos para recoger cambios en dim_products. Con varios workers, solo el que
+    obtiene el candado compartido ejecuta el ciclo. También se puede lanzar con
+    `flask summary-tables refresh [--full]`.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 900
+        self.full_refresh_interval = 86400
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('SUMMARY_REFRESH_INTERVAL', self.interval)
+        self.full_refresh_interval = app.config.get('SUMMARY_FULL_REFRESH_INTERVAL', self.full_refresh_interval)
+        app.cli.add_command(summary_cli)
+        if app.config.get('SUMMARY_REFRESH_ENABLED') and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="summary-tables", daemon=True)
+        self._thread.start()
+        logger.info(f"Mantenimiento de tablas resumen iniciado (cada {self.interval}s).")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error al actualizar las tablas resumen: {e}", exc_info=True)
+            self._stop.wait(self.interval)
+
+    def run_once(self) -> bool:
+        """
+        Ejecuta un ciclo programado. Devuelve False si otro worker ya lo está ejecutando.
+        """
+        with self.app.app_context():
+            if not extensions.cache.add(LOCK_KEY, uuid.uuid4().hex, timeout=max(int(self.interval) - 1, 1)):
+                logger.debug("Otro worker ya está actualizando las tablas resumen.")
+                return False
+            self.refresh()
+            return True
+
+    def refresh(self, full: bool = None) -> dict:
+        """
+        Actualiza las tablas resumen. Con `full=None` la reconstrucción completa se
+        decide por la marca de agua y la antigüedad de la última reconstrucción.
+        Los errores del warehouse se propagan.
+        """
+        from app.services.dashboard_service import get_dashboard_service
+
+        connector = get_dashboard_service().connector
+        previous = self.status()
+        high_water_mark = None
+        if not full:
+            high_water_mark = self._high_water_mark(connector)
+            last_full = previous.get('last_full_refresh_ts') or 0
+            if full is None and time.time() - last_full >= self.full_refresh_interval:
+                high_water_mark = None
+
+        started = time.perf_counter()
+        if high_water_mark is None:
+            mode = 'full'
+            statements = get_full_refresh_statements()
+        else:
+            mode = 'incremental'
+            statements = get_incremental_refresh_statements(high_water_mark)
+
+        for statement, params in statements:
+            connector.execute_statement(statement, params, label=f"summary_{mode}_refresh")
+        connector.reset_summary_probe()
+
+        now = time.time()
+        status = {
+            "mode": mode,
+            "since": high_water_mark,
+            "last_refresh_at": datetime.now().isoformat(timespec='seconds'),
+            "last_full_refresh_ts": now if mode == 'full' else previous.get('last_full_refresh_ts'),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        extensions.cache.set(STATUS_KEY, status, timeout=0)
+        logger.info(f"Tablas resumen actualizadas ({mode}) en {status['duration_ms']} ms.")
+        return status
+
+    @staticmethod
+    def _high_water_mark(connector):
+        connector.reset_summary_probe()
+        if not connector.summary_tables_available():
+            return None
+        df = connector.execute_query(get_high_water_mark_query(), label='get_high_water_mark_query', cache=False)
+        if df.empty or df['high_water_mark'].isna().all():
+            return None
+        return str(df['high_water_mark'].iloc[0])[:10]
+
+    @staticmethod
+    def status() -> dict:
+        return extensions.cache.get(STATUS_KEY) or {"last_refresh_at": None}
@@ -0,0 +1,23 @@
+# app/utils/cache_backends.py
+from flask_caching.backends.rediscache import RedisCache
+
+
+class FakeRedisCache(RedisCache):
+    """
+    Backend Redis en memoria basado en fakeredis, pensado para pruebas y
+    desarrollo local sin un servidor Redis. Se activa con
+    CACHE_TYPE = 'app.utils.cache_backends.FakeRedisCache'.
+    """
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        try:
+            import fakeredis
+        except ImportError as e:
+            raise RuntimeError("El backend FakeRedisCache requiere el paquete 'fakeredis'.") from e
+
+        kwargs.update(dict(
+            host=fakeredis.FakeStrictRedis(),
+            key_prefix=config.get("CACHE_KEY_PREFIX"),
+        ))
+        return cls(*args, **kwargs)
@@ -0,0 +1,155 @@
+# app/utils/circuit_breaker.py
+import contextlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Se lanza sin llamar al servicio mientras el circuito está abierto."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Cortocircuito alrededor de un servicio remoto (el warehouse), seguro entre hilos.
+
+    - Cerrado: las llamadas pasan; tras `failure_threshold` fallos seguidos (el servicio
+      no responde) se abre.
+    - Abierto: las llamadas fallan al instante con CircuitOpenError, sin ocupar
+      hilos ni conexiones, durante `reset_timeout` segundos.
+    - Semiabierto: pasado ese tiempo se deja pasar una única llamada de prueba; si
+      termina bien el circuito se cierra y si falla vuelve a abrirse.
+
+    El estado es por proceso: cada worker descubre por su cuenta que el servicio ha caído.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str = 'warehouse', failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 enabled: bool = True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._opens = 0
+        self._rejected = 0
+
+    def init_app(self, app):
+        """
+        Lee la configuración del cortocircuito desde la aplicación Flask.
+        """
+        config = app.config
+        self.enabled = config.get('WAREHOUSE_BREAKER_ENABLED', self.enabled)
+        self.failure_threshold = config.get('WAREHOUSE_BREAKER_FAILURES', self.failure_threshold)
+        self.reset_timeout = config.get('WAREHOUSE_BREAKER_RESET_TIMEOUT', self.reset_timeout)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @contextlib.contextmanager
+    def guard(self, failures: tuple = (Exception,), ignore: tuple = ()):
+        """
+        Envuelve una llamada al servicio: la rechaza si el circuito está abierto y
+        registra su resultado. Solo las excepciones de `failures` (el servicio no
+        responde: plazos, red, pool agotado) cuentan como fallo; cualquier otra
+        significa que el servicio respondió, aunque fuera con un error de la propia
+        llamada (SQL inválido, tabla inexistente), y cuenta como éxito. Las de
+        `ignore` (p. ej. cancelaciones propias) no cuentan ni como éxito ni como fallo.
+        """
+        if not self.enabled:
+            yield
+            return
+        trial = self._before_call()
+        try:
+            yield
+        except ignore:
+            self._release(trial)
+            raise
+        except failures:
+            self._record_failure(trial)
+            raise
+        except Exception:
+            self._record_success()
+            raise
+        except BaseException:
+            self._release(trial)
+            raise
+        self._record_success()
+
+    def _before_call(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            waited = time.monotonic() - self._opened_at
+            if self._state == self.OPEN and waited >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            retry_after = max(self.reset_timeout - waited, 0.0)
+        raise CircuitOpenError(f"Circuito de {self.name} abierto; se reintentará en {retry_after:.0f}s.",
+                               retry_after=retry_after)
+
+    def _release(self, trial: bool):
+        if trial:
+            with self._lock:
+                self._trial_in_flight = False
+
+    def _record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuito de {self.name} cerrado: el servicio responde de nuevo.")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def _record_failure(self, trial: bool):
+        with self._lock:
+            self._failures += 1
+            if trial:
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED
+                                                 and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._opens += 1
+                logger.warning(f"Circuito de {self.name} abierto tras {self._failures} fallos seguidos; "
+                               f"las llamadas se rechazan durante {self.reset_timeout:.0f}s.")
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def metrics(self) -> dict:
+        """
+        Estado actual y contadores del proceso.
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opened_seconds_ago": round(time.monotonic() - self._opened_at, 1)
+                if self._state != self.CLOSED else None,
+                "opens": self._opens,
+                "rejected": self._rejected,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+            }
@@ -0,0 +1,67 @@
+# app/utils/columnar.py
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response
+
+from app.utils.profiling import profile_stage
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+_FORMAT_BY_MIMETYPE = {
+    ARROW_STREAM_MIMETYPE: 'arrow',
+    PARQUET_MIMETYPE: 'parquet',
+}
+_FORMAT_BY_ARG = {
+    'arrow': 'arrow',
+    'parquet': 'parquet',
+}
+
+
+def negotiate_columnar_format(request):
+    """
+    Devuelve 'arrow' o 'parquet' si el cliente pide expresamente un formato columnar
+    (cabecera Accept o `?format=`); None para la respuesta JSON por defecto.
+    """
+    fmt = _FORMAT_BY_ARG.get(request.args.get('format', '').lower())
+    if fmt:
+        return fmt
+    # Solo mimetypes listados de forma explícita: un navegador envía */* y recibe JSON.
+    listed = list(request.accept_mimetypes.values())
+    for mimetype in listed:
+        if mimetype in _FORMAT_BY_MIMETYPE:
+            return _FORMAT_BY_MIMETYPE[mimetype]
+    return None
+
+
+def columnar_cache_variant(request) -> str:
+    """
+    Variante de la clave de caché según el formato negociado.
+    """
+    return negotiate_columnar_format(request) or 'json'
+
+
+def frame_to_table(df: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def columnar_response(data, fmt: str) -> Response:
+    """
+    Serializa un DataFrame o una tabla Arrow como flujo IPC de Arrow o como Parquet,
+    columna a columna y sin crear objetos Python por fila.
+    """
+    with profile_stage('serialize'):
+        table = data if isinstance(data, pa.Table) else frame_to_table(data)
+        sink = pa.BufferOutputStream()
+        if fmt == 'parquet':
+            pq.write_table(table, sink)
+            mimetype = PARQUET_MIMETYPE
+        else:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            mimetype = ARROW_STREAM_MIMETYPE
+        body = sink.getvalue().to_pybytes()
+    response = Response(body, mimetype=mimetype)
+    response.headers['Vary'] = 'Accept'
+    return response
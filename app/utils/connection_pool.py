@@ -0,0 +1,218 @@
+# app/utils/connection_pool.py
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no se obtiene una conexión libre dentro del tiempo de espera."""
+
+
+class PoolConnectError(Exception):
+    """Se lanza cuando no se puede abrir una conexión nueva tras los reintentos con espera."""
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones, seguro entre hilos.
+
+    - Las conexiones se crean de forma perezosa en el primer uso, por lo que el
+      arranque de la aplicación no depende de que el warehouse esté disponible.
+    - Cada hilo obtiene su propia conexión; los préstamos anidados dentro del
+      mismo hilo reutilizan la conexión ya prestada.
+    - Al prestar una conexión se comprueba su salud y, si falla, se descarta
+      y se reconecta con reintentos y espera exponencial.
+    """
+
+    def __init__(self, connect_factory=None, max_size: int = 4, timeout: float = 30.0,
+                 connect_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 ping_after: float = 300.0):
+        self.connect_factory = connect_factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.connect_retries = connect_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.ping_after = ping_after
+
+        self._lock = threading.Lock()
+        self._idle = deque()  # (conexión, instante de devolución)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._local = threading.local()
+
+        self._in_use = 0
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def init_app(self, app):
+        """
+        Lee la configuración del pool desde la aplicación Flask.
+        """
+        config = app.config
+        self.configure(
+            max_size=config.get('DATABRICKS_POOL_MAX_SIZE', self.max_size),
+            timeout=config.get('DATABRICKS_POOL_TIMEOUT', self.timeout),
+            connect_retries=config.get('DATABRICKS_CONNECT_RETRIES', self.connect_retries),
+            backoff_base=config.get('DATABRICKS_CONNECT_BACKOFF', self.backoff_base),
+            backoff_max=config.get('DATABRICKS_CONNECT_BACKOFF_MAX', self.backoff_max),
+            ping_after=config.get('DATABRICKS_POOL_PING_AFTER', self.ping_after),
+        )
+
+    def configure(self, max_size: int = None, **settings):
+        with self._lock:
+            if max_size is not None and max_size != self.max_size:
+                if self._in_use:
+                    logger.warning("No se puede redimensionar el pool con conexiones en uso.")
+                else:
+                    self.max_size = max_size
+                    self._slots = threading.BoundedSemaphore(max_size)
+            for name, value in settings.items():
+                setattr(self, name, value)
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexión al hilo actual. Si el bloque lanza una excepción,
+        la conexión se descarta para que el siguiente préstamo reconecte.
+        """
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            # Préstamo anidado en el mismo hilo: se reutiliza la conexión.
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.held = conn
+        self._local.depth = 1
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            discard = True
+            raise
+        finally:
+            self._local.held = None
+            self._local.depth = 0
+            self._release(conn, discard=discard)
+
+    def _acquire(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeoutError(
+                f"No hay conexiones libres tras {self.timeout}s (máximo {self.max_size}).")
+        waited = time.monotonic() - started
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.popleft() if self._idle else None
+                if entry is None:
+                    return self._create_connection()
+                conn, returned_at = entry
+                if self._is_healthy(conn, returned_at):
+                    return conn
+                self._close_quietly(conn)
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+            raise
+
+    def _release(self, conn, discard: bool = False):
+        try:
+            if discard:
+                self._close_quietly(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def _create_connection(self):
+        if self.connect_factory is None:
+            raise RuntimeError("El pool no tiene una función de conexión configurada.")
+
+        attempts = max(1, self.connect_retries)
+        for attempt in range(attempts):
+            try:
+                conn = self.connect_factory()
+                with self._lock:
+                    self._created += 1
+                logger.info("Nueva conexión creada en el pool.")
+                return conn
+            except Exception as e:
+                if attempt == attempts - 1:
+                    logger.error(f"No se pudo conectar tras {attempts} intentos: {e}")
+                    raise PoolConnectError(f"No se pudo conectar tras {attempts} intentos: {e}") from e
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay += random.uniform(0, delay / 2)
+                logger.warning(f"Fallo al conectar (intento {attempt + 1}/{attempts}): {e}. "
+                               f"Reintentando en {delay:.2f}s.")
+                time.sleep(delay)
+
+    def _is_healthy(self, conn, returned_at: float) -> bool:
+        if not getattr(conn, 'open', True):
+            return False
+        if time.monotonic() - returned_at < self.ping_after:
+            return True
+        # Conexión inactiva durante mucho tiempo: se verifica con una consulta trivial.
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception as e:
+            logger.warning(f"Conexión del pool descartada por fallo en la comprobación de salud: {e}")
+            return False
+
+    def _close_quietly(self, conn):
+        with self._lock:
+            self._discarded += 1
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error al cerrar una conexión descartada: {e}")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "wait_time_total_seconds": round(self._wait_time_total, 6),
+                "wait_time_max_seconds": round(self._wait_time_max, 6),
+            }
+
+    def close_all(self):
+        """
+        Cierra las conexiones inactivas del pool.
+        """
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+        logger.info("Conexiones inactivas del pool cerradas.")
@@ -0,0 +1,98 @@
+# app/utils/dtypes.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.utils.settings import get_setting
+
+# Columnas de texto con pocos valores distintos: se cargan como categóricas.
+CATEGORICAL_COLUMNS = frozenset({'categoria', 'estado'})
+
+_STRING_DTYPE = pd.StringDtype('pyarrow')
+_STRING_TYPES = {pa.string(): _STRING_DTYPE, pa.large_string(): _STRING_DTYPE}
+_NARROW_INTEGER_TYPES = [pa.int8(), pa.int16(), pa.int32()]
+
+
+def _narrow_integers(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Reduce una columna de enteros con signo al menor ancho que admite su rango.
+    Se hace en Arrow, antes de pasar a pandas, para no materializar la columna ancha.
+    """
+    bounds = pc.min_max(column)
+    low, high = bounds['min'].as_py(), bounds['max'].as_py()
+    if low is None:
+        return column
+    for candidate in _NARROW_INTEGER_TYPES:
+        if candidate.bit_width >= column.type.bit_width:
+            break
+        limits = np.iinfo(candidate.to_pandas_dtype())
+        if limits.min <= low and high <= limits.max:
+            return column.cast(candidate)
+    return column
+
+
+def table_to_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    Convierte el resultado Arrow de una consulta en DataFrame aplicando la política de tipos:
+    - texto de `CATEGORICAL_COLUMNS` como categórica, con las categorías en orden
+      alfabético para que ordenar por la columna siga siendo alfabético;
+    - resto de texto respaldado por Arrow, sin un objeto Python por celda;
+    - enteros con signo reducidos al menor ancho que admiten sus valores.
+    Con `COMPACT_DTYPES` desactivado se usa la conversión por defecto de pyarrow.
+    """
+    if not get_setting('COMPACT_DTYPES', True):
+        return table.to_pandas()
+
+    for i, field in enumerate(table.schema):
+        is_text = pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+        if field.name in CATEGORICAL_COLUMNS and is_text:
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+        elif pa.types.is_signed_integer(field.type) and table.num_rows:
+            table = table.set_column(i, field.name, _narrow_integers(table.column(i)))
+
+    # split_blocks: cada columna en su propio bloque, sin la copia de consolidación de pandas.
+    df = table.to_pandas(types_mapper=_STRING_TYPES.get, split_blocks=True)
+    for column in df.columns:
+        categories = df[column].cat.categories if isinstance(df[column].dtype, pd.CategoricalDtype) else None
+        if categories is not None and not categories.is_monotonic_increasing:
+            df[column] = df[column].cat.reorder_categories(categories.sort_values())
+    return df
+
+
+def json_null_columns(df: pd.DataFrame) -> list:
+    """
+    Columnas con valores que no son JSON válido: nulos de texto, categóricas y
+    decimales (NaN o pd.NA según el tipo y la versión de pandas) e infinitos.
+    """
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if series.dtype.kind == 'f':
+            if not np.isfinite(series.to_numpy()).all():
+                columns.append(column)
+        elif isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype)) and series.hasnans:
+            columns.append(column)
+    return columns
+
+
+def to_json_value(value):
+    """
+    None para los nulos y los decimales no finitos; el propio valor en otro caso.
+    """
+    if isinstance(value, float):
+        return value if np.isfinite(value) else None
+    return None if pd.isna(value) else value
+
+
+def frame_to_records(df: pd.DataFrame) -> list:
+    """
+    `to_dict(orient='records')` con los valores de `json_null_columns` como None
+    (NaN e Infinity no son JSON válido).
+    """
+    records = df.to_dict(orient='records')
+    nullable = json_null_columns(df)
+    for record in records:
+        for column in nullable:
+            record[column] = to_json_value(record[column])
+    return records
@@ -0,0 +1,110 @@
+# app/utils/duckdb_backend.py
+import logging
+import os
+import threading
+
+import duckdb
+import pyarrow as pa
+
+from app.utils.settings import get_setting
+from app.utils.summary_tables import GOLD_SCHEMA
+from app.utils.warehouse_backend import WarehouseBackend
+
+logger = logging.getLogger(__name__)
+
+CATALOG, SCHEMA = GOLD_SCHEMA.split('.')
+
+# Funciones de Databricks SQL que usan las consultas y que DuckDB no tiene con la misma firma.
+_COMPATIBILITY_MACROS = (
+    "CREATE OR REPLACE MACRO date_sub(d, n) AS CAST(d AS DATE) - CAST(n AS INTEGER)",
+    "CREATE OR REPLACE MACRO datediff(end_date, start_date) AS CAST(end_date AS DATE) - CAST(start_date AS DATE)",
+)
+
+
+class DuckDBBackend(WarehouseBackend):
+    """
+    Backend local que ejecuta las mismas consultas sobre ficheros Parquet.
+
+    Cada `<tabla>.parquet` (o carpeta `<tabla>/` con ficheros Parquet) de
+    `DATA_FOLDER` se expone como la vista `workspace.tecnomundo_data_gold.<tabla>`,
+    de modo que el SQL de `app/utils/queries.py` funciona sin cambios. Sirve para
+    pruebas de carga, reproducir rutas calientes y como réplica local de solo
+    lectura. Con `DUCKDB_DATABASE` apuntando a un fichero, las tablas resumen
+    persisten entre reinicios.
+    """
+
+    name = 'duckdb'
+    RETRYABLE_ERRORS = ()
+
+    def __init__(self, data_folder: str = None, database: str = None, connection=None):
+        super().__init__()
+        self.data_folder = data_folder or get_setting('DATA_FOLDER', 'archive_categorized')
+        self.database = database or get_setting('DUCKDB_DATABASE', ':memory:')
+        self._connection = connection
+        self._lock = threading.Lock()
+        self.tables = []
+
+    @property
+    def connection(self):
+        # La base se abre en la primera consulta, como el pool de Databricks.
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    self._connection = self._open()
+        return self._connection
+
+    def _open(self):
+        connection = duckdb.connect()
+        connection.execute(f"ATTACH '{self.database}' AS {CATALOG}")
+        connection.execute(f"CREATE SCHEMA IF NOT EXISTS {GOLD_SCHEMA}")
+        for macro in _COMPATIBILITY_MACROS:
+            connection.execute(macro)
+        self.tables = self._register_views(connection)
+        logger.info(f"Backend DuckDB listo sobre '{self.data_folder}': {', '.join(self.tables) or 'sin tablas'}.")
+        return connection
+
+    @property
+    def cache_namespace(self) -> str:
+        # Dos carpetas de datos distintas no comparten resultados en caché.
+        return f"{self.name}:{os.path.abspath(self.data_folder)}"
+
+    def _register_views(self, connection) -> list:
+        if not os.path.isdir(self.data_folder):
+            logger.warning(f"La carpeta de datos '{self.data_folder}' no existe; el backend DuckDB no tiene tablas.")
+            return []
+
+        tables = []
+        for entry in sorted(os.scandir(self.data_folder), key=lambda e: e.name):
+            if entry.is_file() and entry.name.endswith('.parquet'):
+                table, source = entry.name[:-len('.parquet')], entry.path
+            elif entry.is_dir():
+                table, source = entry.name, os.path.join(entry.path, '**', '*.parquet')
+            else:
+                continue
+            source = source.replace("'", "''")
+            connection.execute(f"CREATE OR REPLACE VIEW {GOLD_SCHEMA}.{table} AS "
+                               f"SELECT * FROM read_parquet('{source}')")
+            tables.append(table)
+
+        for required in ('fact_sales', 'dim_products'):
+            if required not in tables:
+                logger.warning(f"Falta la tabla '{required}' en '{self.data_folder}'.")
+        return tables
+
+    def _fetch_arrow(self, query: str, params: list) -> pa.Table:
+        # Cada consulta usa su propio cursor: DuckDB no admite una conexión compartida entre hilos.
+        with self.connection.cursor() as cursor, self.query_timeout(cursor.interrupt):
+            result = cursor.execute(query, params)
+            fetch = getattr(result, 'to_arrow_table', None) or result.fetch_arrow_table
+            return fetch()
+
+    def _execute(self, statement: str, params: list):
+        with self.connection.cursor() as cursor:
+            cursor.execute(statement, params)
+
+    def close_connection(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        logger.info("Conexión a DuckDB cerrada.")
@@ -0,0 +1,129 @@
+# app/utils/http_caching.py
+import gzip
+import hashlib
+
+from flask import request
+
+from app.utils.settings import get_setting
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él se comprime solo con gzip.
+    brotli = None
+
+# Tipos de contenido que merece la pena comprimir (Arrow y Parquet van tal cual).
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json',
+    'application/x-ndjson',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'application/javascript',
+})
+
+
+def supported_encodings() -> tuple:
+    """
+    Codificaciones disponibles, de mayor a menor preferencia.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Huella del cuerpo de la respuesta: igual mientras no cambien los datos, aunque
+    la entrada de caché se recalcule.
+    """
+    return hashlib.sha1(body).hexdigest()[:20]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=get_setting('HTTP_BROTLI_QUALITY', 5))
+    # mtime=0: la misma entrada produce siempre los mismos bytes.
+    return gzip.compress(body, compresslevel=get_setting('HTTP_GZIP_LEVEL', 6), mtime=0)
+
+
+def should_compress(body: bytes, mimetype: str) -> bool:
+    return (get_setting('HTTP_COMPRESSION_ENABLED', True)
+            and mimetype in COMPRESSIBLE_MIMETYPES
+            and len(body) >= get_setting('HTTP_COMPRESSION_MIN_SIZE', 1024))
+
+
+def encode_variants(body: bytes, mimetype: str) -> dict:
+    """
+    Versiones comprimidas del cuerpo ({codificación: bytes}), vacío si no procede comprimir.
+    """
+    if not should_compress(body, mimetype):
+        return {}
+    return {encoding: compress(body, encoding) for encoding in supported_encodings()}
+
+
+def negotiate_encoding(available) -> str:
+    """
+    Codificación de `available` que prefiere el cliente según Accept-Encoding; None
+    para enviar el cuerpo sin comprimir. A igual calidad se prefiere brotli.
+    """
+    best, best_quality = None, 0
+    for encoding in supported_encodings():
+        if encoding not in available:
+            continue
+        quality = request.accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def etag_matches(etag: str) -> bool:
+    """
+    True si la petición condicional (If-None-Match) ya tiene esta versión.
+    Comparación débil: la misma ETag vale para todas las codificaciones.
+    """
+    return bool(etag) and request.if_none_match.contains_weak(etag)
+
+
+def cache_control(max_age: float) -> str:
+    return f"public, max-age={max(int(max_age), 0)}"
+
+
+def add_vary(response, header: str):
+    values = [v.strip() for v in response.headers.get('Vary', '').split(',') if v.strip()]
+    if header not in values:
+        values.append(header)
+    response.headers['Vary'] = ', '.join(values)
+
+
+class HttpCompression:
+    """
+    Comprime con brotli o gzip las respuestas grandes que no pasan por `cached_view`
+    (las cacheadas guardan ya sus versiones comprimidas) y les añade una ETag para
+    responder 304 a las peticiones condicionales.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self._finish)
+
+    @staticmethod
+    def _finish(response):
+        if (request.method != 'GET' or response.status_code != 200 or response.is_streamed
+                or response.direct_passthrough or 'Content-Encoding' in response.headers):
+            return response
+
+        body = response.get_data()
+        if 'ETag' not in response.headers:
+            response.set_etag(compute_etag(body), weak=True)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if should_compress(body, response.mimetype):
+            encoding = negotiate_encoding(supported_encodings())
+            add_vary(response, 'Accept-Encoding')
+            if encoding:
+                response.set_data(compress(body, encoding))
+                response.headers['Content-Encoding'] = encoding
+        return response
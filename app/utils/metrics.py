@@ -0,0 +1,187 @@
+# app/utils/metrics.py
+import math
+import threading
+import time
+
+from flask import g, request
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values) -> str:
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series = {}  # etiquetas -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total_sum, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels + ('le',), key + (_format_value(bound),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    Métrica instantánea calculada al exportar mediante `callback`, que devuelve
+    un número o un diccionario {valores de etiquetas: número}.
+    """
+
+    def __init__(self, name: str, help_text: str, callback, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.callback = callback
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro mínimo de métricas en formato de texto de Prometheus.
+
+    Con `init_app` registra la latencia de cada ruta. Las métricas son por
+    proceso: con varios workers, Prometheus debe consultar cada uno.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self.query_duration = self.histogram(
+            'warehouse_query_duration_seconds',
+            'Tiempo de ejecución y descarga (Arrow) de cada consulta, por constructor de consulta.',
+            labels=('builder',))
+        self.query_to_pandas = self.histogram(
+            'warehouse_query_to_pandas_seconds',
+            'Tiempo de conversión del resultado Arrow a pandas, por constructor de consulta.',
+            labels=('builder',))
+        self.query_rows = self.counter(
+            'warehouse_query_rows_total', 'Filas devueltas por el warehouse.', labels=('builder',))
+        self.query_bytes = self.counter(
+            'warehouse_query_arrow_bytes_total', 'Bytes Arrow devueltos por el warehouse.', labels=('builder',))
+        self.query_errors = self.counter(
+            'warehouse_query_errors_total', 'Consultas fallidas.', labels=('builder',))
+        self.query_timeouts = self.counter(
+            'warehouse_query_timeouts_total', 'Consultas canceladas por superar WAREHOUSE_QUERY_TIMEOUT.',
+            labels=('builder',))
+        self.degraded_results = self.counter(
+            'warehouse_degraded_results_total',
+            'Consultas fallidas servidas con el último resultado correcto (modo degradado).', labels=('builder',))
+        self.slow_queries = self.counter(
+            'warehouse_slow_queries_total', 'Consultas por encima del umbral de consulta lenta.', labels=('builder',))
+        self.request_duration = self.histogram(
+            'http_request_duration_seconds', 'Latencia de las peticiones HTTP por ruta.',
+            labels=('endpoint', 'method', 'status'))
+        self.cache_requests = self.counter(
+            'view_cache_requests_total', 'Resultado de la caché de vistas (hit, stale, miss, refresh, bypass).',
+            labels=('endpoint', 'result'))
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, help_text, callback, labels=()) -> Gauge:
+        metric = Gauge(name, help_text, callback, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def init_app(self, app):
+        app.before_request(self._start_timer)
+        app.after_request(self._record_request)
+
+    @staticmethod
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    def _record_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule else 'desconocido'
+            self.request_duration.observe(time.perf_counter() - started, endpoint=endpoint,
+                                          method=request.method, status=str(response.status_code))
+        return response
+
+    def record_cache(self, result: str):
+        endpoint = request.url_rule.rule if request.url_rule else request.path
+        self.cache_requests.inc(endpoint=endpoint, result=result)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
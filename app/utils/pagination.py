@@ -0,0 +1,141 @@
+# app/utils/pagination.py
+import base64
+import binascii
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.utils.dtypes import json_null_columns, to_json_value
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class PaginationError(ValueError):
+    """Parámetros de paginación, orden o proyección no válidos."""
+
+
+def parse_list_arg(args, name: str) -> list:
+    """
+    Lee un parámetro de lista, admitiendo tanto `?x=a&x=b` como `?x=a,b`.
+    """
+    values = []
+    for raw in args.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))["o"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise PaginationError("El cursor no es válido.")
+    if not isinstance(offset, int) or offset < 0:
+        raise PaginationError("El cursor no es válido.")
+    return offset
+
+
+def parse_pagination(args, max_limit: int = 5000):
+    """
+    Devuelve (offset, limit) si la petición pide paginación mediante `limit`,
+    `offset` o `cursor`; None si se solicita la lista completa.
+    """
+    if not any(name in args for name in ('limit', 'offset', 'cursor')):
+        return None
+
+    limit = args.get('limit', 100, type=int)
+    if limit is None or limit <= 0:
+        raise PaginationError("'limit' debe ser un entero positivo.")
+    limit = min(limit, max_limit)
+
+    if 'cursor' in args:
+        offset = decode_cursor(args['cursor'])
+    else:
+        offset = args.get('offset', 0, type=int)
+        if offset is None or offset < 0:
+            raise PaginationError("'offset' debe ser un entero no negativo.")
+    return offset, limit
+
+
+def parse_fields(args, allowed: list) -> list:
+    """
+    Proyección de columnas solicitada con `fields=`; por defecto, todas las permitidas.
+    """
+    fields = parse_list_arg(args, 'fields')
+    if not fields:
+        return list(allowed)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise PaginationError(f"Campos desconocidos: {', '.join(unknown)}. Permitidos: {', '.join(allowed)}.")
+    return fields
+
+
+def parse_sort(args, allowed: list):
+    """
+    Devuelve (columna, descendente) a partir de `sort` y `order`, o (None, True) si no se pide orden.
+    """
+    sort_by = args.get('sort')
+    if not sort_by:
+        return None, True
+    if sort_by not in allowed:
+        raise PaginationError(f"No se puede ordenar por '{sort_by}'. Permitidos: {', '.join(allowed)}.")
+    order = args.get('order', 'desc').lower()
+    if order not in ('asc', 'desc'):
+        raise PaginationError("'order' debe ser 'asc' o 'desc'.")
+    return sort_by, order == 'desc'
+
+
+def paginate_frame(df: pd.DataFrame, offset: int, limit: int):
+    """
+    Corta una página del DataFrame. Devuelve (página, metadatos de paginación).
+    """
+    total = len(df)
+    page = df.iloc[offset:offset + limit]
+    next_offset = offset + limit
+    meta = {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": encode_cursor(next_offset) if next_offset < total else None,
+    }
+    return page, meta
+
+
+def wants_ndjson(request) -> bool:
+    if request.args.get('format', '').lower() == 'ndjson':
+        return True
+    # Solo si el cliente lo pide expresamente: un navegador envía */* y debe recibir JSON.
+    return NDJSON_MIMETYPE in request.accept_mimetypes.values()
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is pd.NA:
+        return None
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def iter_ndjson(df: pd.DataFrame, batch_size: int = 500):
+    """
+    Genera el DataFrame como NDJSON, una línea por fila, en lotes de `batch_size`
+    filas, sin construir la lista completa de registros en memoria. Los nulos y
+    los decimales no finitos se escriben como null, igual que `frame_to_records`.
+    """
+    columns = list(df.columns)
+    nullable = [columns.index(column) for column in json_null_columns(df)]
+    for start in range(0, len(df), batch_size):
+        chunk = df.iloc[start:start + batch_size]
+        lines = []
+        for row in chunk.itertuples(index=False, name=None):
+            if nullable:
+                row = list(row)
+                for position in nullable:
+                    row[position] = to_json_value(row[position])
+            lines.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False, allow_nan=False,
+                                    default=_json_default))
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,169 @@
+# app/utils/profiling.py
+import contextlib
+import contextvars
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+
+from flask import g, request, url_for
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+_PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+# Tiempos acumulados por etapa de la petición en curso; None si no se está perfilando.
+_stages = contextvars.ContextVar('profiling_stages', default=None)
+
+
+@contextlib.contextmanager
+def profile_stage(name: str):
+    """
+    Acumula el tiempo del bloque en la etapa `name` de la petición perfilada.
+    Fuera del modo de perfilado solo cuesta una lectura de ContextVar.
+    """
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+
+@contextlib.contextmanager
+def stages_suspended():
+    """
+    No acumula etapas dentro del bloque. Lo usan los hilos de un fan-out: sus tiempos
+    se solapan y sumarlos superaría el tiempo real; quien espera al fan-out ya mide
+    su duración de reloj.
+    """
+    token = _stages.set(None)
+    try:
+        yield
+    finally:
+        _stages.reset(token)
+
+
+class ProfilingJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON que cuenta la serialización de `jsonify` como etapa 'serialize'.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with profile_stage('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+class RequestProfiler:
+    """
+    Modo de perfilado por petición.
+
+    Solo se activa con `PROFILING_ENABLED`; en ese caso, las peticiones con la
+    cabecera `X-Profile: 1` o el parámetro `?profile=1` se ejecutan bajo cProfile
+    y devuelven en `Server-Timing` el desglose warehouse / transform / serialize.
+    El perfil completo se guarda en `PROFILE_DIR` y se descarga desde la URL de
+    la cabecera `X-Profile-Url`. Con el modo desactivado no se registra ningún hook.
+    """
+
+    def __init__(self, app=None):
+        self.profile_dir = None
+        self.max_files = 50
+        # cProfile no admite dos perfiles activos a la vez en el mismo proceso.
+        self._cprofile_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PROFILING_ENABLED'):
+            return
+        self.profile_dir = app.config['PROFILE_DIR']
+        self.max_files = app.config.get('PROFILE_MAX_FILES', self.max_files)
+        os.makedirs(self.profile_dir, exist_ok=True)
+        app.json = ProfilingJSONProvider(app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        logger.warning(f"Modo de perfilado activo: los perfiles se guardan en {self.profile_dir}.")
+
+    @staticmethod
+    def is_requested() -> bool:
+        flag = request.headers.get(PROFILE_HEADER) or request.args.get('profile')
+        return flag is not None and flag.lower() in ('1', 'true', 'yes')
+
+    def _start(self):
+        if not self.is_requested():
+            return
+        g.profiling_token = _stages.set({})
+        # El perfil debe medir el trabajo real, no una respuesta servida desde caché.
+        g.cache_force_refresh = True
+        if self._cprofile_lock.acquire(blocking=False):
+            g.cprofile = cProfile.Profile()
+            g.cprofile.enable()
+        g.profiling_started = time.perf_counter()
+
+    def _finish(self, response):
+        token = g.pop('profiling_token', None)
+        if token is None:
+            return response
+
+        total = time.perf_counter() - g.pop('profiling_started')
+        profile = g.pop('cprofile', None)
+        if profile is not None:
+            profile.disable()
+            self._cprofile_lock.release()
+
+        stages = _stages.get()
+        _stages.reset(token)
+        warehouse = stages.get('warehouse', 0.0)
+        serialize = stages.get('serialize', 0.0)
+        transform = max(total - warehouse - serialize, 0.0)
+        response.headers['Server-Timing'] = ', '.join(
+            f"{name};dur={seconds * 1000:.1f}"
+            for name, seconds in (('warehouse', warehouse), ('transform', transform),
+                                  ('serialize', serialize), ('total', total))
+        )
+
+        if profile is not None:
+            profile_id = uuid.uuid4().hex
+            profile.dump_stats(self.path_for(profile_id))
+            self._prune()
+            response.headers['X-Profile-Id'] = profile_id
+            response.headers['X-Profile-Url'] = url_for('api.get_profile', profile_id=profile_id)
+        return response
+
+    def path_for(self, profile_id: str):
+        """
+        Ruta del fichero .prof de un perfil, o None si el identificador no es válido.
+        """
+        if self.profile_dir is None or not _PROFILE_ID.match(profile_id):
+            return None
+        return os.path.join(self.profile_dir, f"{profile_id}.prof")
+
+    def render_text(self, profile_id: str, limit: int = 50) -> str:
+        """
+        Resumen legible del perfil ordenado por tiempo acumulado.
+        """
+        output = io.StringIO()
+        stats = pstats.Stats(self.path_for(profile_id), stream=output)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+    def _prune(self):
+        try:
+            files = sorted(
+                (entry for entry in os.scandir(self.profile_dir) if entry.name.endswith('.prof')),
+                key=lambda entry: entry.stat().st_mtime,
+            )
+            for entry in files[:-self.max_files]:
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"No se pudieron limpiar los perfiles antiguos: {e}")
@@ -1,6 +1,13 @@
 # app/utils/queries.py
 from typing import Tuple, List, Any
 
+from app.utils.summary_tables import (
+    LATEST_STOCK_TABLE,
+    DAILY_BY_PRODUCT_TABLE,
+    DAILY_BY_CATEGORY_TABLE,
+    DATE_BOUNDS_TABLE,
+)
+
 def get_sales_query(category: str = None) -> Tuple[str, List[Any]]:
     """
     Construye la consulta SQL para ventas, uniendo con la tabla de productos
@@ -28,6 +35,38 @@ def get_sales_query(category: str = None) -> Tuple[str, List[Any]]:
     return base_query, params
 
 
+def get_top_products_query(category: str = None, top_n: int = 10) -> Tuple[str, List[Any]]:
+    """
+    Construye la consulta SQL del top N de productos por unidades vendidas.
+    La unión con productos, el filtro de categoría, la exclusión de 'Servicio Tecnico'
+    y el GROUP BY/ORDER BY/LIMIT se resuelven en el warehouse, de modo que solo
+    se devuelven `top_n` filas.
+    """
+    query = """
+    SELECT
+        s.codigo_producto,
+        p.nombre_del_producto,
+        COALESCE(SUM(s.cantidad), 0) as total_unidades
+    FROM workspace.tecnomundo_data_gold.fact_sales s
+    JOIN workspace.tecnomundo_data_gold.dim_products p ON s.codigo_producto = p.codigo_producto
+    WHERE p.nombre_del_producto IS NOT NULL
+    """
+    params = []
+    if category and category.lower() != 'all':
+        query += " AND p.categoria = ? AND LOWER(p.categoria) != 'servicio tecnico'"
+        params.append(category)
+    else:
+        query += " AND (LOWER(p.categoria) != 'servicio tecnico' OR p.categoria IS NULL)"
+
+    # El LIMIT se interpola como entero validado: no todos los motores aceptan parámetros en LIMIT.
+    query += f"""
+    GROUP BY s.codigo_producto, p.nombre_del_producto
+    ORDER BY total_unidades DESC, CAST(s.codigo_producto AS STRING) ASC
+    LIMIT {max(int(top_n), 0)}
+    """
+    return query, params
+
+
 def get_categories_query() -> str:
     """
     Construye la consulta SQL para obtener la lista de categorías únicas,
@@ -36,13 +75,52 @@ def get_categories_query() -> str:
     return "SELECT DISTINCT categoria FROM workspace.tecnomundo_data_gold.dim_products WHERE categoria IS NOT NULL AND LOWER(categoria) != 'servicio tecnico' ORDER BY categoria"
 
 
-def get_inventory_query(category: str = None) -> Tuple[str, List[Any]]:
+def get_product_dimension_query() -> str:
     """
-    Construye la consulta SQL para el análisis de inventario,
-    excluyendo siempre la categoría 'Servicio Tecnico' de forma case-insensitive.
+    Construye la consulta SQL de la dimensión de productos completa (código, nombre y categoría).
     """
-    params = []
-    query = """
+    return "SELECT codigo_producto, nombre_del_producto, categoria FROM workspace.tecnomundo_data_gold.dim_products"
+
+
+def get_product_dimension_probe_query() -> str:
+    """
+    Sondeo barato de cambios en dim_products: número de filas y suma de un hash de
+    cada fila, que cambia al añadir, borrar o modificar cualquier producto.
+    """
+    return """
+    SELECT
+        COUNT(*) as filas,
+        SUM(CAST(hash(codigo_producto, nombre_del_producto, categoria) AS DOUBLE)) as huella
+    FROM workspace.tecnomundo_data_gold.dim_products
+    """
+
+
+def _excluded_codes_filter(excluded_codes: list) -> Tuple[str, List[Any]]:
+    """
+    Condición que excluye de fact_sales los códigos indicados (los de 'Servicio Tecnico',
+    resueltos con la dimensión de productos en memoria) sin unir con dim_products.
+    Las ventas sin código se conservan, como con el LEFT JOIN.
+    """
+    if not excluded_codes:
+        return "1 = 1", []
+    placeholders = ', '.join('?' for _ in excluded_codes)
+    return f"(s.codigo_producto IS NULL OR s.codigo_producto NOT IN ({placeholders}))", list(excluded_codes)
+
+
+def get_inventory_query(window_days: int = 30, use_summary: bool = False) -> Tuple[str, List[Any]]:
+    """
+    Construye la consulta SQL para el análisis de inventario: último stock y unidades
+    vendidas en la ventana reciente de cada producto, sin unir con dim_products.
+    El nombre, la categoría y la exclusión de 'Servicio Tecnico' se resuelven con la
+    dimensión de productos en memoria.
+    `window_days` fija la ventana de ventas recientes (la columna conserva el nombre
+    `unidades_vendidas_30d` por compatibilidad con la API).
+    Con `use_summary` se lee de las tablas resumen en lugar de agregar fact_sales.
+    """
+    if use_summary:
+        return _get_inventory_summary_query(window_days)
+
+    query = f"""
     WITH ProductMaxDate AS (
         SELECT
             codigo_producto,
@@ -53,12 +131,9 @@ def get_inventory_query(category: str = None) -> Tuple[str, List[Any]]:
     LatestStock AS (
         SELECT
             s.codigo_producto,
-            p.nombre_del_producto,
-            p.categoria,
             s.stock_actual,
             ROW_NUMBER() OVER(PARTITION BY s.codigo_producto ORDER BY s.fecha DESC) as rn
         FROM workspace.tecnomundo_data_gold.fact_sales s
-        JOIN workspace.tecnomundo_data_gold.dim_products p ON s.codigo_producto = p.codigo_producto
     ),
     SalesLast30Days AS (
         SELECT
@@ -66,32 +141,53 @@ def get_inventory_query(category: str = None) -> Tuple[str, List[Any]]:
             SUM(s.cantidad) as unidades_vendidas_30d
         FROM workspace.tecnomundo_data_gold.fact_sales s
         JOIN ProductMaxDate pmd ON s.codigo_producto = pmd.codigo_producto
-        WHERE CAST(s.fecha AS DATE) >= date_sub(pmd.max_fecha_producto, 30)
+        WHERE CAST(s.fecha AS DATE) >= date_sub(pmd.max_fecha_producto, {int(window_days)})
         GROUP BY s.codigo_producto
     )
     SELECT
         ls.codigo_producto,
-        ls.nombre_del_producto,
-        ls.categoria,
         ls.stock_actual,
         COALESCE(s30.unidades_vendidas_30d, 0) as unidades_vendidas_30d
     FROM LatestStock ls
     LEFT JOIN SalesLast30Days s30 ON ls.codigo_producto = s30.codigo_producto
-    WHERE ls.rn = 1 AND LOWER(ls.categoria) != 'servicio tecnico'
+    WHERE ls.rn = 1
     """
+    return query, []
 
-    if category:
-        query += " AND ls.categoria = ?"
-        params.append(category)
 
-    return query, params
+def _get_inventory_summary_query(window_days: int = 30) -> Tuple[str, List[Any]]:
+    query = f"""
+    SELECT
+        ls.codigo_producto,
+        ls.stock_actual,
+        COALESCE(SUM(d.total_unidades), 0) as unidades_vendidas_30d
+    FROM {LATEST_STOCK_TABLE} ls
+    LEFT JOIN {DAILY_BY_PRODUCT_TABLE} d
+        ON d.codigo_producto = ls.codigo_producto
+        AND d.fecha_venta >= ls.max_fecha_producto - INTERVAL {int(window_days)} DAY
+    GROUP BY ls.codigo_producto, ls.stock_actual
+    """
+    return query, []
 
 
-def get_sales_date_range_query() -> str:
+def get_sales_date_range_query(use_summary: bool = False, excluded_codes: list = None) -> Tuple[str, List[Any]]:
     """
     Obtiene la fecha mínima y máxima de todas las ventas de productos,
     excluyendo la categoría 'Servicio Tecnico' de forma case-insensitive.
+    Con `excluded_codes` (códigos de 'Servicio Tecnico' de la dimensión en memoria)
+    se excluyen por código sin unir con dim_products; con None se une como antes.
     """
+    if use_summary:
+        return f"SELECT min_date, max_date FROM {DATE_BOUNDS_TABLE}", []
+    if excluded_codes is not None:
+        condition, params = _excluded_codes_filter(excluded_codes)
+        return f"""
+    SELECT
+        MIN(CAST(s.fecha AS DATE)) as min_date,
+        MAX(CAST(s.fecha AS DATE)) as max_date
+    FROM workspace.tecnomundo_data_gold.fact_sales s
+    WHERE {condition}
+    """, params
     return """
     SELECT
         MIN(CAST(s.fecha AS DATE)) as min_date,
@@ -99,14 +195,40 @@ def get_sales_date_range_query() -> str:
     FROM workspace.tecnomundo_data_gold.fact_sales s
     LEFT JOIN workspace.tecnomundo_data_gold.dim_products p ON s.codigo_producto = p.codigo_producto
     WHERE LOWER(p.categoria) != 'servicio tecnico' OR p.categoria IS NULL
-    """
+    """, []
 
 
-def get_sales_trend_query(start_date: str, end_date: str) -> Tuple[str, List[Any]]:
+def get_sales_trend_query(start_date: str, end_date: str, use_summary: bool = False,
+                          excluded_codes: list = None) -> Tuple[str, List[Any]]:
     """
     Obtiene la tendencia de ventas agregada por día para un rango de fechas,
     excluyendo la categoría 'Servicio Tecnico' de forma case-insensitive.
+    `excluded_codes` funciona como en `get_sales_date_range_query`.
     """
+    if use_summary:
+        query = f"""
+        SELECT fecha_venta, SUM(total_unidades) as total_unidades
+        FROM {DAILY_BY_CATEGORY_TABLE}
+        WHERE fecha_venta BETWEEN ? AND ?
+        GROUP BY fecha_venta
+        ORDER BY fecha_venta ASC
+        """
+        return query, [start_date, end_date]
+
+    if excluded_codes is not None:
+        condition, excluded_params = _excluded_codes_filter(excluded_codes)
+        query = f"""
+        SELECT
+            CAST(s.fecha AS DATE) as fecha_venta,
+            SUM(s.cantidad) as total_unidades
+        FROM workspace.tecnomundo_data_gold.fact_sales s
+        WHERE (CAST(s.fecha AS DATE) BETWEEN ? AND ?)
+        AND {condition}
+        GROUP BY CAST(s.fecha AS DATE)
+        ORDER BY fecha_venta ASC
+        """
+        return query, [start_date, end_date] + excluded_params
+
     query = """
     SELECT
         CAST(s.fecha AS DATE) as fecha_venta,
@@ -120,3 +242,88 @@ def get_sales_trend_query(start_date: str, end_date: str) -> Tuple[str, List[Any
     """
     params = [start_date, end_date]
     return query, params
+
+
+def get_daily_sales_by_product_query(history_days: int = 90, use_summary: bool = False) -> Tuple[str, List[Any]]:
+    """
+    Unidades vendidas por producto y día en los últimos `history_days` días, contados
+    hacia atrás desde la última fecha con ventas. El día viaja como `dias_atras`
+    (0 = última fecha) y las unidades como DOUBLE, para montar la matriz producto × día
+    de la previsión sin convertir fechas ni decimales fila a fila. Solo viajan los días
+    con ventas.
+    """
+    if use_summary:
+        query = f"""
+        SELECT
+            d.codigo_producto,
+            datediff(b.max_fecha, d.fecha_venta) as dias_atras,
+            CAST(d.total_unidades AS DOUBLE) as total_unidades
+        FROM {DAILY_BY_PRODUCT_TABLE} d
+        CROSS JOIN (SELECT MAX(fecha_venta) as max_fecha FROM {DAILY_BY_PRODUCT_TABLE}) b
+        WHERE d.fecha_venta > b.max_fecha - INTERVAL {int(history_days)} DAY
+        """
+        return query, []
+
+    query = f"""
+    WITH SalesBounds AS (
+        SELECT MAX(CAST(fecha AS DATE)) as max_fecha
+        FROM workspace.tecnomundo_data_gold.fact_sales
+    )
+    SELECT
+        s.codigo_producto,
+        datediff(b.max_fecha, CAST(s.fecha AS DATE)) as dias_atras,
+        CAST(SUM(s.cantidad) AS DOUBLE) as total_unidades
+    FROM workspace.tecnomundo_data_gold.fact_sales s
+    CROSS JOIN SalesBounds b
+    WHERE CAST(s.fecha AS DATE) > b.max_fecha - INTERVAL {int(history_days)} DAY
+    GROUP BY s.codigo_producto, datediff(b.max_fecha, CAST(s.fecha AS DATE))
+    """
+    return query, []
+
+
+def get_last_sales_date_query(use_summary: bool = False) -> Tuple[str, List[Any]]:
+    """
+    Última fecha con ventas: la referencia (`dias_atras` = 0) de
+    `get_daily_sales_by_product_query`.
+    """
+    if use_summary:
+        return f"SELECT MAX(fecha_venta) as max_fecha FROM {DAILY_BY_PRODUCT_TABLE}", []
+    return """
+    SELECT MAX(CAST(fecha AS DATE)) as max_fecha
+    FROM workspace.tecnomundo_data_gold.fact_sales
+    """, []
+
+
+def get_daily_sales_by_category_query(since_date: str = None, use_summary: bool = False) -> Tuple[str, List[Any]]:
+    """
+    Unidades vendidas por día y categoría, excluyendo 'Servicio Tecnico' de forma
+    case-insensitive. Con `since_date` solo se agregan los días desde esa fecha
+    (inclusive), para cargas incrementales.
+    """
+    if use_summary:
+        query = f"SELECT fecha_venta, categoria, total_unidades FROM {DAILY_BY_CATEGORY_TABLE}"
+        params = []
+        if since_date:
+            query += " WHERE fecha_venta >= ?"
+            params.append(since_date)
+        query += " ORDER BY fecha_venta ASC"
+        return query, params
+
+    query = """
+    SELECT
+        CAST(s.fecha AS DATE) as fecha_venta,
+        p.categoria,
+        SUM(s.cantidad) as total_unidades
+    FROM workspace.tecnomundo_data_gold.fact_sales s
+    LEFT JOIN workspace.tecnomundo_data_gold.dim_products p ON s.codigo_producto = p.codigo_producto
+    WHERE (LOWER(p.categoria) != 'servicio tecnico' OR p.categoria IS NULL)
+    """
+    params = []
+    if since_date:
+        query += " AND CAST(s.fecha AS DATE) >= ?"
+        params.append(since_date)
+    query += """
+    GROUP BY CAST(s.fecha AS DATE), p.categoria
+    ORDER BY fecha_venta ASC
+    """
+    return query, params
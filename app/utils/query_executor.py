@@ -0,0 +1,154 @@
+# app/utils/query_executor.py
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from app.utils.profiling import profile_stage, stages_suspended
+
+logger = logging.getLogger(__name__)
+
+# Evento de cancelación del fan-out en curso (None fuera de un fan-out).
+_cancel_event = contextvars.ContextVar('query_cancel_event', default=None)
+# True dentro de un hilo del ejecutor: los fan-out anidados se ejecutan en línea.
+_inside_executor = contextvars.ContextVar('query_inside_executor', default=False)
+
+
+class QueryCancelledError(Exception):
+    """La llamada se canceló porque su fan-out superó el plazo."""
+
+
+class QueryDeadlineExceeded(QueryCancelledError):
+    """La llamada no terminó antes del plazo del fan-out."""
+
+
+def raise_if_cancelled():
+    """
+    Punto de cancelación cooperativa: los backends lo llaman antes de cada consulta
+    para no lanzar trabajo nuevo de un fan-out que ya superó su plazo.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise QueryCancelledError("Fan-out cancelado por plazo.")
+
+
+class FanOutResult:
+    """
+    Resultado de un fan-out: valores por nombre, errores por nombre y las llamadas
+    que no terminaron a tiempo.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+        self.timed_out = []
+        self.duration_ms = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class QueryExecutor:
+    """
+    Ejecuta en paralelo llamadas independientes al warehouse dentro de una petición.
+
+    Cada llamada corre en un pool de hilos acotado (`QUERY_EXECUTOR_WORKERS`, por
+    defecto el tamaño del pool de conexiones) con una copia del contexto de la
+    petición, de modo que `current_app` y la configuración siguen disponibles. En
+    el perfilado, el fan-out suma a la etapa warehouse su tiempo de reloj y no el
+    de cada llamada, que se solapan. Al vencer el plazo se cancelan las llamadas pendientes y las que
+    están en curso no lanzan consultas nuevas; sus resultados se descartan.
+    """
+
+    def __init__(self, app=None):
+        self.max_workers = 4
+        self.default_deadline = 25.0
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_workers = app.config.get('QUERY_EXECUTOR_WORKERS') or app.config.get(
+            'DATABRICKS_POOL_MAX_SIZE', self.max_workers)
+        self.default_deadline = app.config.get('QUERY_FANOUT_DEADLINE', self.default_deadline)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="query-fanout")
+            return self._executor
+
+    def run_all(self, calls: dict, deadline: float = None) -> FanOutResult:
+        """
+        Ejecuta `calls` ({nombre: callable sin argumentos}) en paralelo y espera como
+        máximo `deadline` segundos. Las excepciones se recogen en `errors`.
+        """
+        deadline = self.default_deadline if deadline is None else deadline
+        outcome = FanOutResult()
+        started = time.perf_counter()
+
+        if _inside_executor.get():
+            # Dentro de otro fan-out: en línea, para no bloquear hilos del pool esperando al propio pool.
+            for name, call in calls.items():
+                self._run_inline(name, call, outcome)
+            outcome.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            return outcome
+
+        cancel_event = threading.Event()
+        futures = {}
+        # En el perfilado, el fan-out cuenta como warehouse por su tiempo de reloj.
+        with profile_stage('warehouse'):
+            for name, call in calls.items():
+                context = contextvars.copy_context()
+                futures[name] = self.executor.submit(context.run, self._run_task, call, cancel_event)
+
+            done, pending = wait(futures.values(), timeout=deadline)
+        if pending:
+            cancel_event.set()
+            for future in pending:
+                future.cancel()
+
+        for name, future in futures.items():
+            if future not in done:
+                outcome.timed_out.append(name)
+                outcome.errors[name] = QueryDeadlineExceeded(f"'{name}' no terminó en {deadline}s.")
+                continue
+            error = future.exception()
+            if error is not None:
+                outcome.errors[name] = error
+            else:
+                outcome.results[name] = future.result()
+
+        outcome.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if outcome.timed_out:
+            logger.warning(f"Fan-out con plazo superado ({deadline}s): {', '.join(outcome.timed_out)}.")
+        for name, error in outcome.errors.items():
+            if name not in outcome.timed_out:
+                logger.error(f"Error en la llamada '{name}' del fan-out: {error}")
+        return outcome
+
+    @staticmethod
+    def _run_task(call, cancel_event):
+        _inside_executor.set(True)
+        _cancel_event.set(cancel_event)
+        raise_if_cancelled()
+        with stages_suspended():
+            return call()
+
+    @staticmethod
+    def _run_inline(name, call, outcome):
+        try:
+            raise_if_cancelled()
+            outcome.results[name] = call()
+        except Exception as e:
+            outcome.errors[name] = e
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
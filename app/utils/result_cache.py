@@ -0,0 +1,377 @@
+# app/utils/result_cache.py
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = '.arrow'
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_WHITESPACE = re.compile(r"\s+")
+
+# True dentro de `fresh_results()`; los hilos del fan-out lo heredan al copiar el contexto.
+_bypass = contextvars.ContextVar('result_cache_bypass', default=False)
+
+
+@contextlib.contextmanager
+def fresh_results():
+    """
+    Dentro del bloque las consultas no leen de la caché de resultados, aunque sí
+    guardan lo que devuelve el warehouse. Para las recargas que se lanzan porque el
+    dato ha cambiado (o puede haberlo hecho): leer de la caché devolvería el
+    resultado de hasta `RESULT_CACHE_TTL` segundos antes.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def bypassing_results() -> bool:
+    return _bypass.get()
+
+
+def normalize_query(query: str) -> str:
+    """
+    SQL con los espacios colapsados fuera de los literales de texto, para que el
+    mismo constructor de `app/utils/queries.py` dé la misma clave aunque cambie el
+    sangrado. Los literales se conservan tal cual.
+    """
+    parts = _STRING_LITERAL.split(query)
+    # split con grupo: las posiciones impares son los literales.
+    return ''.join(part if i % 2 else _WHITESPACE.sub(' ', part) for i, part in enumerate(parts)).strip()
+
+
+def result_cache_key(namespace: str, query: str, params: list = None) -> str:
+    """
+    Clave de un resultado: backend, SQL normalizado y parámetros.
+    """
+    payload = json.dumps([namespace, normalize_query(query), list(params or [])], default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class QueryResultCache:
+    """
+    Caché persistente de resultados de consultas en disco local.
+
+    Cada resultado se guarda como fichero Arrow IPC sin comprimir en `RESULT_CACHE_DIR`
+    y se lee con memory-mapping: los workers de la misma máquina comparten las páginas
+    del sistema de ficheros sin copiarlas y la caché sobrevive a los reinicios.
+
+    - Caducidad: un fichero con más de `RESULT_CACHE_TTL` segundos (por su mtime) es un fallo.
+    - Tamaño: la ocupación (bytes y ficheros) se lleva en memoria, contada una vez al
+      primer uso y ajustada en cada escritura y borrado. El directorio solo se recorre
+      cuando se supera `RESULT_CACHE_MAX_BYTES` (se borran los ficheros usados hace más
+      tiempo: LRU por atime, que se actualiza explícitamente en cada acierto para no
+      depender de las opciones de montaje) o, como mucho una vez por TTL, para borrar
+      los caducados. Cada recorrido resincroniza la cuenta con lo que hayan escrito
+      los demás procesos.
+    - Las escrituras van a un temporal y se publican con os.replace, de modo que otro
+      proceso nunca lee un fichero a medias.
+    - `put_later` escribe desde un hilo propio, fuera de la petición; si el resultado
+      ya está en disco (en otra caché del mismo sistema de ficheros) se enlaza con un
+      hardlink en lugar de volver a escribirlo.
+
+    Las estadísticas (aciertos, fallos, caducados, escrituras, desalojos, errores) son por
+    proceso. Sin `init_app` o con `RESULT_CACHE_ENABLED` desactivado, la caché no hace nada.
+    """
+
+    def __init__(self, directory: str = None, ttl: float = 300, max_bytes: int = 512 * 1024 * 1024,
+                 enabled: bool = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = directory is not None if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('hits', 'misses', 'expired', 'writes', 'evictions', 'errors', 'dropped'), 0)
+        # Escrituras diferidas (clave, tabla, fichero a enlazar) y el hilo que las atiende.
+        self._pending = queue.Queue(maxsize=64)
+        self._writer = None
+        # Ocupación del directorio (None hasta el primer recuento) y último recorrido.
+        self._bytes = None
+        self._files = 0
+        self._swept_at = 0.0
+        self._sweep_lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def init_app(self, app, prefix: str = 'RESULT_CACHE', default_dir: str = 'tecnomundo_results'):
+        """
+        Lee la configuración desde la aplicación Flask: `<prefix>_ENABLED`, `_DIR`,
+        `_TTL` y `_MAX_BYTES`.
+        """
+        config = app.config
+        self.directory = config.get(f'{prefix}_DIR') or os.path.join(tempfile.gettempdir(), default_dir)
+        self.ttl = config.get(f'{prefix}_TTL', self.ttl)
+        self.max_bytes = config.get(f'{prefix}_MAX_BYTES', self.max_bytes)
+        self.enabled = bool(config.get(f'{prefix}_ENABLED', False))
+        self._bytes = None
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            logger.info(f"Caché de resultados en {self.directory} (TTL {self.ttl}s, "
+                        f"máximo {self.max_bytes / (1024 * 1024):.0f} MB).")
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str):
+        """
+        Tabla Arrow (respaldada por el fichero mapeado en memoria) o None si no está o ha caducado.
+        """
+        table, _ = self.lookup(key)
+        return table
+
+    def lookup(self, key: str):
+        """
+        Como `get`, pero devuelve (tabla, antigüedad en segundos); (None, None) si no está.
+        """
+        if not self.enabled:
+            return None, None
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._count('misses')
+            return None, None
+
+        age = time.time() - stat.st_mtime
+        if age > self.ttl:
+            self._discard(path, stat.st_size)
+            self._count('expired')
+            self._count('misses')
+            return None, None
+
+        try:
+            table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except FileNotFoundError:
+            # Otro proceso lo ha desalojado entre el stat y la apertura.
+            self._count('misses')
+            return None, None
+        except Exception as e:
+            logger.warning(f"Resultado en caché ilegible {os.path.basename(path)}, se descarta: {e}")
+            self._discard(path, stat.st_size)
+            self._count('errors')
+            self._count('misses')
+            return None, None
+        self._count('hits')
+        return table, age
+
+    def put(self, key: str, table: pa.Table):
+        """
+        Guarda `table` para `key` y devuelve la ruta del fichero (None si no se guardó).
+        Un error de disco solo se registra: la consulta ya tiene su resultado.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with pa.OSFile(temporary, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                size = sink.tell()
+            previous = self._size_of(path)
+            os.replace(temporary, path)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el resultado en caché: {e}")
+            self._remove(temporary)
+            self._count('errors')
+            return None
+        self._stored(size, previous)
+        return path
+
+    def put_later(self, key: str, table: pa.Table, source: str = None):
+        """
+        Encola el guardado de `table` para `key` en el hilo de escritura. Con `source`
+        (el mismo resultado ya escrito en disco) se enlaza ese fichero y la tabla solo
+        se escribe si el enlace falla. Si la cola está llena el guardado se descarta.
+        """
+        if not self.enabled:
+            return
+        self._ensure_writer()
+        try:
+            self._pending.put_nowait((key, table, source))
+        except queue.Full:
+            self._count('dropped')
+
+    def flush(self):
+        """
+        Espera a que terminen las escrituras encoladas.
+        """
+        if self._writer is not None:
+            self._pending.join()
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_pending, name="result-cache-writer", daemon=True)
+                self._writer.start()
+
+    def _write_pending(self):
+        while True:
+            key, table, source = self._pending.get()
+            try:
+                if source is None or not self._link(key, source):
+                    self.put(key, table)
+            except Exception as e:
+                logger.error(f"Error en la escritura diferida de la caché de resultados: {e}")
+            finally:
+                self._pending.task_done()
+
+    def _link(self, key: str, source: str) -> bool:
+        path = self._path(key)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(source, temporary)
+            size = os.stat(temporary).st_size
+            previous = self._size_of(path)
+            os.replace(temporary, path)
+        except OSError:
+            # Otro sistema de ficheros, o el origen ya se ha desalojado: se escribe la tabla.
+            self._remove(temporary)
+            return False
+        self._stored(size, previous)
+        return True
+
+    @staticmethod
+    def _size_of(path: str):
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return None
+
+    def _adjust(self, size: int, files: int):
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes = max(self._bytes + size, 0)
+                self._files = max(self._files + files, 0)
+
+    def _stored(self, size: int, previous: int = None):
+        """
+        Contabiliza un fichero publicado (que sustituye a otro de `previous` bytes, si
+        existía) y recorre el directorio solo si hace falta desalojar o barrer caducados.
+        """
+        self._count('writes')
+        if previous is None:
+            self._adjust(size, 1)
+        else:
+            self._adjust(size - previous, 0)
+        if self._bytes is None or self._bytes > self.max_bytes or time.time() - self._swept_at > self.ttl:
+            self._sweep()
+
+    def _discard(self, path: str, size: int):
+        if self._remove(path):
+            self._adjust(-size, -1)
+
+    def _entries(self) -> list:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat))
+        return entries
+
+    def _sweep(self):
+        """
+        Recorre el directorio: borra los caducados y, si aún se supera `max_bytes`, los de
+        acceso más antiguo; después resincroniza la ocupación en memoria. Si otro hilo ya
+        está recorriéndolo, no hace nada.
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                entries = self._entries()
+            except OSError as e:
+                logger.warning(f"No se pudo recorrer la caché de resultados: {e}")
+                return
+            now = time.time()
+            live, removed = [], 0
+            for path, stat in entries:
+                if now - stat.st_mtime > self.ttl:
+                    removed += self._remove(path)
+                else:
+                    live.append((path, stat))
+            total, files = sum(stat.st_size for _, stat in live), len(live)
+            if total > self.max_bytes:
+                for path, stat in sorted(live, key=lambda item: item[1].st_atime):
+                    if total <= self.max_bytes:
+                        break
+                    if self._remove(path):
+                        removed += 1
+                        total -= stat.st_size
+                        files -= 1
+            with self._lock:
+                self._bytes, self._files, self._swept_at = total, files, now
+            if removed:
+                self._count('evictions', removed)
+        finally:
+            self._sweep_lock.release()
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        # En Windows no se puede borrar un fichero mapeado por otro proceso; se reintentará.
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def clear(self) -> int:
+        """
+        Borra todos los resultados (p. ej. tras escribir en el warehouse). Devuelve cuántos.
+        """
+        if not self.enabled:
+            return 0
+        try:
+            removed = sum(self._remove(path) for path, _ in self._entries())
+        except OSError as e:
+            logger.warning(f"No se pudo vaciar la caché de resultados: {e}")
+            return 0
+        with self._lock:
+            self._bytes, self._files, self._swept_at = 0, 0, time.time()
+        if removed:
+            logger.info(f"Caché de resultados vaciada ({removed} ficheros).")
+        return removed
+
+    def stats(self) -> dict:
+        """
+        Contadores del proceso y ocupación del directorio según la cuenta en memoria
+        (sin recorrerlo, salvo el recuento inicial).
+        """
+        if self.enabled and self._bytes is None:
+            self._sweep()
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = self._files if self.enabled else 0
+            stats['bytes'] = (self._bytes or 0) if self.enabled else 0
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['enabled'] = self.enabled
+        stats['max_bytes'] = self.max_bytes
+        stats['ttl'] = self.ttl
+        return stats
@@ -0,0 +1,13 @@
+# app/utils/settings.py
+from flask import current_app, has_app_context
+from config import Config
+
+
+def get_setting(name: str, default=None):
+    """
+    Devuelve un valor de configuración de la aplicación activa o, fuera de un
+    contexto de aplicación, el valor de la configuración base.
+    """
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return getattr(Config, name, default)
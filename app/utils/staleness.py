@@ -0,0 +1,94 @@
+# app/utils/staleness.py
+import contextlib
+import contextvars
+import logging
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+# Cabeceras con las que una respuesta declara que incluye resultados antiguos.
+STALE_HEADER = 'X-Data-Stale'
+AGE_HEADER = 'X-Data-Age'
+
+# Resultados antiguos (consulta, antigüedad en segundos) usados en la petición en curso;
+# None fuera de una petición. Los hilos del fan-out comparten la lista al copiar el contexto.
+_stale_results = contextvars.ContextVar('stale_results', default=None)
+
+
+def mark_stale(label: str, age_seconds: float):
+    """
+    Registra que la petición en curso usa un resultado de `label` de hace `age_seconds`.
+    """
+    records = _stale_results.get()
+    if records is not None:
+        records.append((label, age_seconds))
+
+
+@contextlib.contextmanager
+def collect_stale():
+    """
+    Recoge en una lista los resultados antiguos usados dentro del bloque, para
+    guardarlos junto a lo que se calcula con ellos (una entrada de caché, una
+    instantánea). Al salir se propagan al colector exterior, si lo hay.
+    """
+    outer = _stale_results.get()
+    records = []
+    token = _stale_results.set(records)
+    try:
+        yield records
+    finally:
+        _stale_results.reset(token)
+        if outer is not None:
+            outer.extend(records)
+
+
+def stale_headers(records: list) -> list:
+    """
+    Cabeceras de una respuesta construida con `records`: las consultas afectadas y la
+    antigüedad del resultado más viejo, más el aviso estándar 110 de HTTP.
+    """
+    if not records:
+        return []
+    labels = ', '.join(sorted({label for label, _ in records}))
+    age = max(age for _, age in records)
+    return [
+        (STALE_HEADER, labels),
+        (AGE_HEADER, str(int(age))),
+        ('Warning', '110 - "Response is Stale"'),
+    ]
+
+
+class StaleResponseMarker:
+    """
+    Marca las respuestas que se han servido con resultados antiguos del warehouse
+    (modo degradado): cada petición recoge los resultados antiguos que usa y, si
+    hay alguno, la respuesta lleva `X-Data-Stale`, `X-Data-Age` y `Warning: 110`.
+    Las respuestas que salen de la caché de vistas ya guardan estas cabeceras.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    @staticmethod
+    def _start():
+        g.stale_results_token = _stale_results.set([])
+
+    @staticmethod
+    def _finish(response):
+        token = g.pop('stale_results_token', None)
+        if token is None:
+            return response
+        records = _stale_results.get()
+        _stale_results.reset(token)
+        if records and STALE_HEADER not in response.headers:
+            for name, value in stale_headers(records):
+                response.headers[name] = value
+            logger.warning(f"Respuesta de {request.path} servida con datos antiguos "
+                           f"({response.headers[STALE_HEADER]}, {response.headers[AGE_HEADER]}s).")
+        return response
@@ -0,0 +1,157 @@
+# app/utils/summary_tables.py
+"""
+Sentencias de construcción y mantenimiento de las tablas resumen de la capa gold.
+
+Las tablas resumen sustituyen a los agregados completos sobre fact_sales en las
+consultas calientes del dashboard:
+
+- agg_latest_stock: último stock, nombre y categoría de cada producto, con la
+  fecha de su última venta.
+- agg_daily_units_by_product: unidades por día y producto (de aquí sale la
+  ventana de ventas recientes para cualquier número de días).
+- agg_daily_units_by_category: unidades por día y categoría, sin 'Servicio Tecnico'.
+- agg_sales_date_bounds: fecha mínima y máxima de ventas. Se escribe la última,
+  por lo que su existencia indica que el resto de tablas está construido.
+
+El SQL es portable entre Databricks y DuckDB (CREATE OR REPLACE TABLE ... AS,
+MERGE INTO, INTERVAL) para poder probarlo contra un warehouse local.
+"""
+from typing import Tuple, List, Any
+
+GOLD_SCHEMA = 'workspace.tecnomundo_data_gold'
+
+LATEST_STOCK_TABLE = f'{GOLD_SCHEMA}.agg_latest_stock'
+DAILY_BY_PRODUCT_TABLE = f'{GOLD_SCHEMA}.agg_daily_units_by_product'
+DAILY_BY_CATEGORY_TABLE = f'{GOLD_SCHEMA}.agg_daily_units_by_category'
+DATE_BOUNDS_TABLE = f'{GOLD_SCHEMA}.agg_sales_date_bounds'
+
+# Orden de construcción: la tabla de fechas depende de la diaria por categoría.
+SUMMARY_TABLES = (LATEST_STOCK_TABLE, DAILY_BY_PRODUCT_TABLE, DAILY_BY_CATEGORY_TABLE, DATE_BOUNDS_TABLE)
+
+
+def _latest_stock_select(products_filter: str = '') -> str:
+    return f"""
+    SELECT codigo_producto, nombre_del_producto, categoria, stock_actual, max_fecha_producto
+    FROM (
+        SELECT
+            s.codigo_producto,
+            p.nombre_del_producto,
+            p.categoria,
+            s.stock_actual,
+            MAX(CAST(s.fecha AS DATE)) OVER(PARTITION BY s.codigo_producto) as max_fecha_producto,
+            ROW_NUMBER() OVER(PARTITION BY s.codigo_producto ORDER BY s.fecha DESC) as rn
+        FROM {GOLD_SCHEMA}.fact_sales s
+        JOIN {GOLD_SCHEMA}.dim_products p ON s.codigo_producto = p.codigo_producto
+        {products_filter}
+    ) ranked
+    WHERE rn = 1
+    """
+
+
+def _daily_by_product_select(since_filter: str = '') -> str:
+    return f"""
+    SELECT
+        CAST(s.fecha AS DATE) as fecha_venta,
+        s.codigo_producto,
+        SUM(s.cantidad) as total_unidades
+    FROM {GOLD_SCHEMA}.fact_sales s
+    {since_filter}
+    GROUP BY CAST(s.fecha AS DATE), s.codigo_producto
+    """
+
+
+def _daily_by_category_select(since_filter: str = '') -> str:
+    return f"""
+    SELECT
+        CAST(s.fecha AS DATE) as fecha_venta,
+        p.categoria,
+        SUM(s.cantidad) as total_unidades
+    FROM {GOLD_SCHEMA}.fact_sales s
+    LEFT JOIN {GOLD_SCHEMA}.dim_products p ON s.codigo_producto = p.codigo_producto
+    WHERE (LOWER(p.categoria) != 'servicio tecnico' OR p.categoria IS NULL)
+    {since_filter}
+    GROUP BY CAST(s.fecha AS DATE), p.categoria
+    """
+
+
+def get_date_bounds_statement() -> str:
+    return f"""
+    CREATE OR REPLACE TABLE {DATE_BOUNDS_TABLE} AS
+    SELECT
+        MIN(fecha_venta) as min_date,
+        MAX(fecha_venta) as max_date,
+        current_timestamp as refreshed_at
+    FROM {DAILY_BY_CATEGORY_TABLE}
+    """
+
+
+def get_full_refresh_statements() -> List[Tuple[str, List[Any]]]:
+    """
+    Reconstruye todas las tablas resumen desde fact_sales y dim_products.
+    """
+    return [
+        (f"CREATE OR REPLACE TABLE {LATEST_STOCK_TABLE} AS {_latest_stock_select()}", []),
+        (f"CREATE OR REPLACE TABLE {DAILY_BY_PRODUCT_TABLE} AS {_daily_by_product_select()}", []),
+        (f"CREATE OR REPLACE TABLE {DAILY_BY_CATEGORY_TABLE} AS {_daily_by_category_select()}", []),
+        (get_date_bounds_statement(), []),
+    ]
+
+
+def _merge_statement(table: str, source: str, keys: tuple, values: tuple, delete_since: bool) -> str:
+    """
+    MERGE de `source` en `table` por `keys`: actualiza `values` de las filas que
+    existen e inserta las nuevas. Con `delete_since`, borra también las filas de
+    `table` desde la fecha del último parámetro que ya no están en `source`.
+    Cada MERGE es atómico: quien lee la tabla nunca ve un día o un producto a medias.
+    """
+    # IS NOT DISTINCT FROM: la categoría puede ser NULL (productos sin categoría).
+    condition = ' AND '.join(f"t.{key} IS NOT DISTINCT FROM s.{key}" for key in keys)
+    columns = keys + values
+    statement = f"""
+    MERGE INTO {table} t
+    USING ({source}) s
+    ON {condition}
+    WHEN MATCHED THEN UPDATE SET {', '.join(f"{column} = s.{column}" for column in values)}
+    WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join(f"s.{column}" for column in columns)})
+    """
+    if delete_since:
+        statement += "WHEN NOT MATCHED BY SOURCE AND t.fecha_venta >= ? THEN DELETE\n"
+    return statement
+
+
+def get_incremental_refresh_statements(since_date: str) -> List[Tuple[str, List[Any]]]:
+    """
+    Recalcula solo los días desde `since_date` (inclusive, porque ese día puede
+    estar incompleto) y el último stock de los productos vendidos desde entonces,
+    con un MERGE por tabla en lugar de DELETE + INSERT.
+    Los cambios en dim_products no se propagan aquí: los recoge la reconstrucción completa.
+    """
+    recent_products = (f"SELECT DISTINCT codigo_producto FROM {GOLD_SCHEMA}.fact_sales "
+                       f"WHERE CAST(fecha AS DATE) >= ?")
+    latest_stock = _latest_stock_select(f'WHERE s.codigo_producto IN ({recent_products})')
+    daily_by_product = _daily_by_product_select('WHERE CAST(s.fecha AS DATE) >= ?')
+    daily_by_category = _daily_by_category_select('AND CAST(s.fecha AS DATE) >= ?')
+    return [
+        (_merge_statement(LATEST_STOCK_TABLE, latest_stock, ('codigo_producto',),
+                          ('nombre_del_producto', 'categoria', 'stock_actual', 'max_fecha_producto'),
+                          delete_since=False), [since_date]),
+        (_merge_statement(DAILY_BY_PRODUCT_TABLE, daily_by_product, ('fecha_venta', 'codigo_producto'),
+                          ('total_unidades',), delete_since=True), [since_date, since_date]),
+        (_merge_statement(DAILY_BY_CATEGORY_TABLE, daily_by_category, ('fecha_venta', 'categoria'),
+                          ('total_unidades',), delete_since=True), [since_date, since_date]),
+        (get_date_bounds_statement(), []),
+    ]
+
+
+def get_high_water_mark_query() -> str:
+    """
+    Último día cargado en las tablas resumen (incluye todas las categorías).
+    """
+    return f"SELECT MAX(fecha_venta) as high_water_mark FROM {DAILY_BY_PRODUCT_TABLE}"
+
+
+def get_summary_probe_query() -> str:
+    """
+    Devuelve una fila si las tablas resumen están construidas; error o vacío si no.
+    """
+    return f"SELECT max_date, refreshed_at FROM {DATE_BOUNDS_TABLE}"
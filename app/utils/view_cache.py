@@ -0,0 +1,222 @@
+# app/utils/view_cache.py
+import functools
+import hashlib
+import logging
+import threading
+import time
+import uuid
+
+from flask import Response, copy_current_request_context, g, make_response, request
+
+from app.extensions import cache, metrics
+from app.utils.settings import get_setting
+from app.utils.staleness import collect_stale, stale_headers
+from app.utils.http_caching import (
+    compute_etag,
+    encode_variants,
+    negotiate_encoding,
+    etag_matches,
+    cache_control,
+    add_vary,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cabeceras de la respuesta original que se guardan junto al cuerpo cacheado.
+_PRESERVED_HEADERS = ('Vary', 'Content-Disposition')
+# Parámetros que no cambian la respuesta y no forman parte de la clave.
+_IGNORED_ARGS = ('profile',)
+# Resultado de una operación de caché que ha fallado en el backend.
+_UNAVAILABLE = object()
+
+
+def cached_view(timeout: int = 300, query_string: bool = False, unless=None, vary=None):
+    """
+    Cachea la respuesta de una vista en el backend compartido (Redis o sistema de archivos).
+
+    - Single-flight: cuando una clave falta o caduca, solo un proceso la recalcula;
+      el resto espera al resultado en lugar de lanzar la misma consulta.
+    - Stale-while-revalidate: durante `CACHE_STALE_TTL` segundos tras caducar se
+      sigue sirviendo el valor anterior mientras un hilo lo refresca en segundo plano.
+    - Las respuestas hechas con datos antiguos del warehouse (modo degradado) se guardan
+      solo `DEGRADED_CACHE_TIMEOUT` segundos y conservan sus cabeceras X-Data-Stale.
+
+    Solo se cachean respuestas 200 que no sean streaming. Si `unless()` devuelve
+    True, la vista se ejecuta sin pasar por la caché. `vary()` devuelve un sufijo
+    para la clave cuando la respuesta depende de algo más que la URL (p. ej. Accept).
+
+    Cada entrada guarda su ETag (huella del cuerpo) y sus versiones comprimidas con
+    brotli/gzip: una petición con If-None-Match vigente recibe un 304 sin leer ni
+    serializar el cuerpo, y `Cache-Control: max-age` es el tiempo que le queda a la entrada.
+
+    Si el backend de caché falla (p. ej. Redis caído), el error se registra y la vista
+    se ejecuta directamente: la caché nunca convierte una petición en un 500.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if unless is not None and unless():
+                metrics.record_cache('bypass')
+                return view(*args, **kwargs)
+
+            key = _make_cache_key(query_string, vary)
+
+            if g.get('cache_force_refresh'):
+                metrics.record_cache('refresh')
+                return _compute_and_store(view, args, kwargs, key, timeout)
+
+            entry = _cache_call('get', key)
+            if entry is _UNAVAILABLE:
+                return view(*args, **kwargs)
+            if entry is not None:
+                if entry['expires_at'] > time.time():
+                    metrics.record_cache('hit')
+                    return _build_response(entry)
+                metrics.record_cache('stale')
+                lock = _acquire_lock(key)
+                if lock:
+                    _refresh_in_background(view, args, kwargs, key, timeout, lock)
+                return _build_response(entry)
+
+            metrics.record_cache('miss')
+            lock = _acquire_lock(key)
+            if not lock:
+                entry = _wait_for_entry(key)
+                if entry is not None:
+                    return _build_response(entry)
+            try:
+                return _compute_and_store(view, args, kwargs, key, timeout)
+            finally:
+                if lock:
+                    _release_lock(key, lock)
+
+        return wrapper
+    return decorator
+
+
+def _make_cache_key(query_string: bool, vary=None) -> str:
+    key = f"view/{request.path}"
+    if query_string:
+        args = sorted((k, v) for k in request.args if k not in _IGNORED_ARGS for v in request.args.getlist(k))
+        digest = hashlib.md5(repr(args).encode('utf-8')).hexdigest()
+        key = f"{key}?{digest}"
+    if vary is not None:
+        key = f"{key}#{vary()}"
+    return key
+
+
+def _compute_and_store(view, args, kwargs, key: str, timeout: int) -> Response:
+    with collect_stale() as stale:
+        response = make_response(view(*args, **kwargs))
+    if response.status_code == 200 and not response.is_streamed:
+        now = time.time()
+        body = response.get_data()
+        if stale:
+            # Hecha con datos antiguos (modo degradado): se guarda poco tiempo para volver a intentarlo pronto.
+            timeout = min(timeout, get_setting('DEGRADED_CACHE_TIMEOUT', 30))
+        entry = {
+            "body": body,
+            "status": response.status_code,
+            "content_type": response.content_type,
+            "headers": [(k, v) for k, v in response.headers.items() if k in _PRESERVED_HEADERS]
+                       + stale_headers(stale),
+            "etag": compute_etag(body),
+            "encoded": encode_variants(body, response.mimetype),
+            "created_at": now,
+            "expires_at": now + timeout,
+        }
+        stale_ttl = get_setting('CACHE_STALE_TTL', 0)
+        _cache_call('set', key, entry, timeout=timeout + stale_ttl)
+        return _build_response(entry)
+    return response
+
+
+def _build_response(entry: dict) -> Response:
+    """
+    Respuesta a partir de una entrada de caché: 304 si el cliente ya tiene esta
+    versión y, si no, el cuerpo en la codificación que acepta.
+    """
+    etag = entry.get("etag")
+    encoded = entry.get("encoded") or {}
+    if etag_matches(etag):
+        response = Response(status=304, headers=entry.get("headers"))
+    else:
+        encoding = negotiate_encoding(encoded)
+        body = encoded[encoding] if encoding else entry["body"]
+        response = Response(body, status=entry["status"], content_type=entry["content_type"],
+                            headers=entry.get("headers"))
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    if encoded:
+        add_vary(response, 'Accept-Encoding')
+    # La caché del navegador no debe durar más que la entrada del servidor.
+    response.headers['Cache-Control'] = cache_control(entry["expires_at"] - time.time())
+    return response
+
+
+def _refresh_in_background(view, args, kwargs, key: str, timeout: int, lock: str):
+    @copy_current_request_context
+    def refresh():
+        try:
+            _compute_and_store(view, args, kwargs, key, timeout)
+        except Exception as e:
+            logger.error(f"Error al refrescar en segundo plano la clave de caché {key}: {e}")
+        finally:
+            _release_lock(key, lock)
+
+    threading.Thread(target=refresh, name=f"cache-refresh:{key}", daemon=True).start()
+
+
+def _cache_call(method: str, key: str, *args, **kwargs):
+    """
+    Llama a `cache.<method>(key, ...)`; si el backend falla registra el error y
+    devuelve `_UNAVAILABLE`, que ninguna operación real devuelve.
+    """
+    try:
+        return getattr(cache, method)(key, *args, **kwargs)
+    except Exception as e:
+        logger.warning(f"Backend de caché no disponible ({method} {key}): {e}")
+        metrics.record_cache('error')
+        return _UNAVAILABLE
+
+
+def _acquire_lock(key: str):
+    """
+    Intenta tomar el candado de recálculo de una clave. `cache.add` solo escribe
+    si la clave no existe, por lo que un único proceso lo obtiene. Si el backend
+    no responde no hay nadie con quien coordinarse: se calcula sin esperar.
+    """
+    token = uuid.uuid4().hex
+    lock_timeout = get_setting('CACHE_LOCK_TIMEOUT', 60)
+    acquired = _cache_call('add', f"lock/{key}", token, timeout=lock_timeout)
+    if acquired is _UNAVAILABLE or acquired:
+        return token
+    return None
+
+
+def _release_lock(key: str, token: str):
+    lock_key = f"lock/{key}"
+    if _cache_call('get', lock_key) == token:
+        _cache_call('delete', lock_key)
+
+
+def _wait_for_entry(key: str):
+    """
+    Espera a que otro proceso termine de calcular la clave.
+    Devuelve None si el candado expira sin que aparezca el valor.
+    """
+    deadline = time.monotonic() + get_setting('CACHE_LOCK_TIMEOUT', 60)
+    poll_interval = get_setting('CACHE_LOCK_POLL_INTERVAL', 0.1)
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        entry = _cache_call('get', key)
+        if entry is _UNAVAILABLE:
+            return None
+        if entry is not None:
+            return entry
+        if _cache_call('get', f"lock/{key}") in (None, _UNAVAILABLE):
+            break
+    entry = _cache_call('get', key)
+    return None if entry is _UNAVAILABLE else entry
@@ -0,0 +1,421 @@
+# app/utils/warehouse_backend.py
+import contextlib
+import hashlib
+import logging
+import re
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from app.extensions import metrics, result_cache, last_known_good, warehouse_breaker
+from app.utils.settings import get_setting
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.connection_pool import PoolConnectError, PoolTimeoutError
+from app.utils.dtypes import table_to_frame
+from app.utils.profiling import profile_stage
+from app.utils.query_executor import QueryCancelledError, raise_if_cancelled
+from app.utils.result_cache import result_cache_key, bypassing_results
+from app.utils.staleness import mark_stale
+from app.utils.queries import (
+    get_inventory_query,
+    get_sales_query,
+    get_top_products_query,
+    get_categories_query,
+    get_product_dimension_query,
+    get_product_dimension_probe_query,
+    get_sales_date_range_query,
+    get_sales_trend_query,
+    get_daily_sales_by_category_query,
+    get_daily_sales_by_product_query,
+    get_last_sales_date_query,
+)
+from app.utils.summary_tables import get_summary_probe_query
+
+logger = logging.getLogger(__name__)
+# Log dedicado a las consultas lentas, para poder enviarlo a su propio destino.
+slow_query_logger = logging.getLogger('app.slow_queries')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMERIC_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryTimeoutError(Exception):
+    """La consulta superó `WAREHOUSE_QUERY_TIMEOUT` y se canceló en el warehouse."""
+
+
+class WarehouseUnavailable(Exception):
+    """
+    El warehouse no responde (plazo, circuito abierto, red o pool agotado) y no hay
+    último resultado correcto con que servir la consulta. Las vistas responden 503.
+    """
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def query_fingerprint(query: str) -> str:
+    """
+    Huella corta de una consulta normalizada (sin literales ni espacios
+    redundantes), para agrupar en los logs las ejecuciones de una misma consulta.
+    """
+    normalized = _STRING_LITERAL.sub('?', query)
+    normalized = _NUMERIC_LITERAL.sub('?', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip().lower()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+def create_warehouse_backend(name: str = None):
+    """
+    Crea el backend configurado en `WAREHOUSE_BACKEND`: 'databricks' (por defecto)
+    o 'duckdb' (ficheros Parquet locales de `DATA_FOLDER`).
+    """
+    name = (name or get_setting('WAREHOUSE_BACKEND', 'databricks')).lower()
+    if name == 'duckdb':
+        from app.utils.duckdb_backend import DuckDBBackend
+        return DuckDBBackend()
+    if name == 'databricks':
+        from app.utils.databricks_connector import DatabricksConnector
+        return DatabricksConnector()
+    raise ValueError(f"Backend de warehouse desconocido: {name}")
+
+
+class WarehouseBackend:
+    """
+    Interfaz común de los motores que ejecutan las consultas de `app/utils/queries.py`.
+
+    Las subclases solo implementan `_fetch_arrow` (consulta con resultado como
+    tabla Arrow, dentro de `query_timeout` con la cancelación de su driver),
+    `_execute` (sentencia sin resultado) y `close_connection`; la instrumentación,
+    los reintentos, el cortocircuito, el modo degradado y las consultas de negocio
+    son comunes.
+    """
+
+    name = 'warehouse'
+    # Errores tras los que merece la pena reintentar la consulta una vez.
+    RETRYABLE_ERRORS = ()
+
+    def __init__(self):
+        self._summary_available = False
+        self._summary_checked_at = None
+
+    @property
+    def outage_errors(self) -> tuple:
+        """
+        Errores que indican que el warehouse no responde (abren el cortocircuito y no
+        cambian lo que se sabe de las tablas resumen). Un error de la consulta en sí
+        (sintaxis, tabla inexistente, parámetros) no está aquí.
+        """
+        return (QueryTimeoutError, PoolTimeoutError, PoolConnectError) + tuple(self.RETRYABLE_ERRORS)
+
+    @property
+    def cache_namespace(self) -> str:
+        """
+        Parte de la clave de la caché de resultados que distingue el origen de los datos.
+        """
+        return self.name
+
+    def _fetch_arrow(self, query: str, params: list) -> pa.Table:
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def query_timeout(self, cancel):
+        """
+        Limita el bloque a `WAREHOUSE_QUERY_TIMEOUT` segundos: al vencer el plazo, un
+        temporizador llama a `cancel` (p. ej. `cursor.cancel`) desde otro hilo, lo que
+        interrumpe la consulta en el warehouse, y el error del driver se convierte en
+        QueryTimeoutError. Con el plazo a 0 no se limita.
+        """
+        timeout = get_setting('WAREHOUSE_QUERY_TIMEOUT', 20)
+        if not timeout:
+            yield
+            return
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            try:
+                cancel()
+            except Exception as e:
+                logger.warning(f"No se pudo cancelar la consulta en {self.name}: {e}")
+
+        timer = threading.Timer(timeout, expire)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        except Exception as e:
+            if expired.is_set():
+                raise QueryTimeoutError(f"La consulta superó el plazo de {timeout}s y se canceló.") from e
+            raise
+        finally:
+            timer.cancel()
+
+    def _execute(self, statement: str, params: list):
+        raise NotImplementedError
+
+    def close_connection(self):
+        raise NotImplementedError
+
+    def execute_query(self, query: str, params: list = None, label: str = 'adhoc',
+                      cache: bool = True) -> pd.DataFrame:
+        """
+        Ejecuta una consulta SQL de forma segura, utilizando parámetros.
+        Ante un error de `RETRYABLE_ERRORS` se reintenta una vez; un plazo superado
+        o el circuito abierto no se reintentan.
+
+        Si la consulta falla, se devuelve el último resultado correcto de la misma
+        consulta (modo degradado) y la petición queda marcada como servida con datos
+        antiguos. Sin él, un fallo del warehouse (ver `outage_errors`) lanza
+        WarehouseUnavailable y cualquier otro error se propaga: nunca se devuelve un
+        resultado vacío que parezca «sin datos».
+
+        `label` identifica el constructor de la consulta en las métricas y en el
+        log de consultas lentas. Con `cache=False` no se usan la caché de resultados
+        ni el último resultado correcto (sondeos que deben ver siempre el estado
+        actual del warehouse): un error de la consulta devuelve un DataFrame vacío,
+        pero si el warehouse no responde (agotado el reintento, pool lleno o sin
+        poder conectar) también se lanza WarehouseUnavailable.
+        """
+        error = None
+        for attempt in range(2):
+            try:
+                return self._fetch_dataframe(query, params, label, cache)
+            except QueryCancelledError:
+                raise
+            except CircuitOpenError as e:
+                logger.warning(f"Consulta {label} [{query_fingerprint(query)}] no enviada: {e}")
+                error = e
+                break
+            except QueryTimeoutError as e:
+                metrics.query_errors.inc(builder=label)
+                metrics.query_timeouts.inc(builder=label)
+                logger.error(f"Error al ejecutar la consulta {label} [{query_fingerprint(query)}]: {e}")
+                error = e
+                break
+            except self.RETRYABLE_ERRORS as e:
+                error = e
+                if attempt == 0:
+                    logger.warning(f"Conexión a {self.name} interrumpida, reintentando: {e}")
+                    continue
+                metrics.query_errors.inc(builder=label)
+                logger.error(f"Error al ejecutar la consulta {label} [{query_fingerprint(query)}]: {e}")
+            except Exception as e:
+                metrics.query_errors.inc(builder=label)
+                logger.error(f"Error al ejecutar la consulta {label} [{query_fingerprint(query)}]: {e}")
+                error = e
+                break
+        if cache:
+            df = self._last_known_good(query, params, label)
+            if df is not None:
+                return df
+        elif not isinstance(error, (CircuitOpenError,) + self.outage_errors):
+            return pd.DataFrame()
+        raise self._unavailable(error, label)
+
+    def _unavailable(self, error: Exception, label: str) -> Exception:
+        """
+        Error que se lanza cuando `label` ha fallado sin último resultado correcto:
+        WarehouseUnavailable si el warehouse no responde, el propio error si no.
+        """
+        if not isinstance(error, (CircuitOpenError,) + self.outage_errors):
+            return error
+        retry_after = error.retry_after if isinstance(error, CircuitOpenError) else None
+        unavailable = WarehouseUnavailable(f"{self.name} no disponible para {label}: {error}", retry_after=retry_after)
+        unavailable.__cause__ = error
+        return unavailable
+
+    def _last_known_good(self, query: str, params: list, label: str):
+        """
+        Último resultado correcto de la consulta como DataFrame, o None si no hay.
+        """
+        if not last_known_good.enabled:
+            return None
+        table, age = last_known_good.lookup(result_cache_key(self.cache_namespace, query, params))
+        if table is None:
+            return None
+        metrics.degraded_results.inc(builder=label)
+        mark_stale(label, age)
+        logger.warning(f"Modo degradado: {label} [{query_fingerprint(query)}] servida con el último "
+                       f"resultado correcto, de hace {age:.0f}s.")
+        return table_to_frame(table)
+
+    def _fetch_dataframe(self, query: str, params: list, label: str, cache: bool = True) -> pd.DataFrame:
+        """
+        Ejecuta la consulta y registra el tiempo de ejecución y descarga, el de
+        conversión a pandas, las filas y los bytes Arrow devueltos. La conversión
+        aplica la política de tipos compactos de `app/utils/dtypes.py`.
+
+        Si la caché de resultados está activa, la tabla Arrow se busca antes en
+        disco (ver `app/utils/result_cache.py`; no dentro de `fresh_results()`) y,
+        si no está, se guarda tras la consulta. Las métricas de ejecución solo cuentan las consultas que llegan
+        al warehouse, que pasan por el cortocircuito `warehouse_breaker`; cada
+        resultado obtenido se guarda también, en segundo plano, como último
+        resultado correcto.
+        """
+        raise_if_cancelled()
+        key = None
+        if cache and (result_cache.enabled or last_known_good.enabled):
+            key = result_cache_key(self.cache_namespace, query, params)
+        table = result_cache.get(key) if key and not bypassing_results() else None
+        started = time.perf_counter()
+        if table is None:
+            logger.debug(f"Ejecutando consulta: {query} con parámetros: {params}")
+            with profile_stage('warehouse'), warehouse_breaker.guard(failures=self.outage_errors,
+                                                                     ignore=(QueryCancelledError,)):
+                table = self._fetch_arrow(query, params or [])
+            fetch_seconds = time.perf_counter() - started
+            metrics.query_duration.observe(fetch_seconds, builder=label)
+            metrics.query_rows.inc(table.num_rows, builder=label)
+            metrics.query_bytes.inc(table.nbytes, builder=label)
+            if key:
+                # El último resultado correcto se guarda fuera de la petición, enlazando el
+                # fichero de la caché de resultados si se acaba de escribir.
+                last_known_good.put_later(key, table, source=result_cache.put(key, table))
+        else:
+            fetch_seconds = time.perf_counter() - started
+            logger.debug(f"Resultado de {label} [{query_fingerprint(query)}] servido desde la caché de resultados.")
+
+        started = time.perf_counter()
+        df = table_to_frame(table)
+        to_pandas_seconds = time.perf_counter() - started
+        metrics.query_to_pandas.observe(to_pandas_seconds, builder=label)
+
+        total_ms = (fetch_seconds + to_pandas_seconds) * 1000
+        if total_ms >= get_setting('SLOW_QUERY_THRESHOLD_MS', 2000):
+            metrics.slow_queries.inc(builder=label)
+            slow_query_logger.warning(
+                f"Consulta lenta {label} [{query_fingerprint(query)}]: {total_ms:.0f} ms "
+                f"(ejecución {fetch_seconds * 1000:.0f} ms, to_pandas {to_pandas_seconds * 1000:.0f} ms), "
+                f"{table.num_rows} filas, {table.nbytes} bytes"
+            )
+        return df
+
+    def execute_statement(self, statement: str, params: list = None, label: str = 'statement'):
+        """
+        Ejecuta una sentencia sin resultado (DDL o DML). A diferencia de
+        `execute_query`, los errores se propagan al llamador.
+        """
+        logger.debug(f"Ejecutando sentencia: {statement} con parámetros: {params}")
+        started = time.perf_counter()
+        with profile_stage('warehouse'):
+            self._execute(statement, params or [])
+        metrics.query_duration.observe(time.perf_counter() - started, builder=label)
+        # Lo escrito puede cambiar cualquier resultado guardado.
+        result_cache.clear()
+
+    def summary_tables_available(self) -> bool:
+        """
+        Indica si las tablas resumen están construidas. El resultado se reutiliza
+        durante `SUMMARY_PROBE_TTL` segundos para no sondear en cada consulta.
+        """
+        if not get_setting('SUMMARY_TABLES_ENABLED', True):
+            return False
+        checked_at = self._summary_checked_at
+        if checked_at is not None and time.time() - checked_at < get_setting('SUMMARY_PROBE_TTL', 300):
+            return self._summary_available
+        try:
+            available = not self._fetch_dataframe(get_summary_probe_query(), None, 'get_summary_probe_query',
+                                                 cache=False).empty
+        except QueryCancelledError:
+            raise
+        except (CircuitOpenError,) + self.outage_errors as e:
+            # El warehouse no responde, lo que no dice nada de las tablas: se mantiene
+            # lo último que se supo (y con ello las claves del último resultado correcto).
+            logger.debug(f"Sondeo de tablas resumen sin respuesta: {e}")
+            return self._summary_available
+        except Exception as e:
+            logger.debug(f"Tablas resumen no disponibles: {e}")
+            available = False
+        if available != self._summary_available:
+            logger.info(f"Tablas resumen {'disponibles' if available else 'no disponibles'}.")
+        self._summary_available = available
+        self._summary_checked_at = time.time()
+        return available
+
+    def reset_summary_probe(self):
+        self._summary_checked_at = None
+
+    def get_inventory_data(self, window_days: int = 30) -> pd.DataFrame:
+        """
+        Último stock y ventas de la ventana reciente por código de producto (sin nombre ni categoría).
+        """
+        query, params = get_inventory_query(window_days, use_summary=self.summary_tables_available())
+        return self.execute_query(query, params, label='get_inventory_query')
+
+    def get_sales_data(self, category: str = None) -> pd.DataFrame:
+        query, params = get_sales_query(category)
+        return self.execute_query(query, params, label='get_sales_query')
+
+    def get_top_products(self, category: str = None, top_n: int = 10) -> pd.DataFrame:
+        """
+        Obtiene el top N de productos por unidades vendidas, agregado en el warehouse.
+        """
+        query, params = get_top_products_query(category, top_n)
+        return self.execute_query(query, params, label='get_top_products_query')
+
+    def get_categories(self) -> list:
+        query = get_categories_query()
+        df = self.execute_query(query, label='get_categories_query')
+        if not df.empty:
+            return df['categoria'].tolist()
+        return []
+
+    def get_product_dimension(self) -> pd.DataFrame:
+        return self.execute_query(get_product_dimension_query(), label='get_product_dimension_query')
+
+    def get_product_dimension_signature(self):
+        """
+        Firma (filas, huella) de dim_products para detectar cambios; None si el sondeo falla.
+        """
+        df = self.execute_query(get_product_dimension_probe_query(), label='get_product_dimension_probe_query',
+                                cache=False)
+        if df.empty:
+            return None
+        row = df.iloc[0]
+        return int(row['filas']), None if pd.isna(row['huella']) else float(row['huella'])
+
+    def get_sales_date_range(self, excluded_codes: list = None) -> pd.DataFrame:
+        """
+        Obtiene el rango de fechas de ventas. Con `excluded_codes` se excluye
+        'Servicio Tecnico' por código, sin unir con dim_products.
+        """
+        query, params = get_sales_date_range_query(use_summary=self.summary_tables_available(),
+                                                   excluded_codes=excluded_codes)
+        return self.execute_query(query, params, label='get_sales_date_range_query')
+
+    def get_sales_trend_data(self, start_date: str, end_date: str, excluded_codes: list = None) -> pd.DataFrame:
+        """
+        Obtiene los datos de tendencia de ventas para un rango.
+        """
+        query, params = get_sales_trend_query(start_date, end_date, use_summary=self.summary_tables_available(),
+                                              excluded_codes=excluded_codes)
+        return self.execute_query(query, params, label='get_sales_trend_query')
+
+    def get_daily_sales_by_product(self, history_days: int = 90) -> pd.DataFrame:
+        """
+        Unidades vendidas por producto y día en el histórico reciente (solo días con ventas),
+        con el día como `dias_atras` desde `get_last_sales_date`.
+        """
+        query, params = get_daily_sales_by_product_query(history_days, use_summary=self.summary_tables_available())
+        return self.execute_query(query, params, label='get_daily_sales_by_product_query')
+
+    def get_last_sales_date(self):
+        """
+        Última fecha con ventas (Timestamp), o None si no hay ventas.
+        """
+        query, params = get_last_sales_date_query(use_summary=self.summary_tables_available())
+        df = self.execute_query(query, params, label='get_last_sales_date_query')
+        if df.empty or pd.isna(df['max_fecha'].iloc[0]):
+            return None
+        return pd.Timestamp(df['max_fecha'].iloc[0])
+
+    def get_daily_sales_by_category(self, since_date: str = None) -> pd.DataFrame:
+        """
+        Obtiene las unidades vendidas por día y categoría, opcionalmente desde una fecha.
+        """
+        query, params = get_daily_sales_by_category_query(since_date, use_summary=self.summary_tables_available())
+        return self.execute_query(query, params, label='get_daily_sales_by_category_query')
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Scripts de medición de rendimiento. Se ejecutan desde la raíz del proyecto,
+# por ejemplo: python -m benchmarks.bench_inventory_status
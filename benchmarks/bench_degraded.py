@@ -0,0 +1,104 @@
+# benchmarks/bench_degraded.py
+"""
+Latencia del análisis de inventario con el warehouse lento, sobre el backend DuckDB
+y datos sintéticos (benchmarks.datagen).
+
+Cada consulta que llega al motor espera `--delay` segundos antes de ejecutarse; la
+espera se interrumpe con la cancelación del plazo, como `cursor.cancel` en Databricks.
+
+Casos (instantánea de inventario vaciada antes de cada medición):
+- sano: el warehouse responde con normalidad y se guarda el último resultado correcto.
+- lento sin protección: sin plazo por consulta ni cortocircuito; cada petición espera al warehouse.
+- lento con plazo: plazo de `--timeout` segundos, cortocircuito y último resultado correcto.
+  Las primeras peticiones esperan el plazo; con el circuito abierto responden al instante.
+
+Falla si el p95 del caso protegido supera `--timeout` más `--max-overhead-ms`.
+
+Uso: python -m benchmarks.bench_degraded [--rows 1000000] [--delay 3] [--timeout 0.5] [--repeat 10]
+                                         [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+
+from benchmarks import datagen
+from benchmarks.harness import measure, summarize, add_baseline_arguments, report
+
+
+def slow_warehouse(backend, delay: float):
+    """
+    Sustituye `_fetch_arrow` por una versión que espera `delay` segundos antes de la
+    consulta real; la espera termina en cuanto el plazo de la consulta la cancela.
+    """
+    fetch = backend._fetch_arrow
+
+    def fetch_slowly(query, params):
+        cancelled = threading.Event()
+        with backend.query_timeout(cancelled.set):
+            if cancelled.wait(delay):
+                raise RuntimeError("Consulta cancelada.")
+            return fetch(query, params)
+
+    backend._fetch_arrow = fetch_slowly
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--data-dir', default='/tmp/tecnomundo_bench')
+    parser.add_argument('--delay', type=float, default=3.0, help="Segundos que tarda el warehouse lento.")
+    parser.add_argument('--timeout', type=float, default=0.5, help="WAREHOUSE_QUERY_TIMEOUT del caso protegido.")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--max-overhead-ms', type=float, default=250)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.extensions import last_known_good, warehouse_breaker
+    from app.services.dashboard_service import DashboardService
+    from app.utils.duckdb_backend import DuckDBBackend
+
+    summary = datagen.ensure_dataset(args.data_dir, args.rows)
+    print(f"Datos: {summary}")
+    app = create_app('testing')
+    app.config['SUMMARY_TABLES_ENABLED'] = False
+    lkg_dir = tempfile.mkdtemp(prefix='tecnomundo_lkg_bench_')
+    last_known_good.directory, last_known_good.enabled = lkg_dir, True
+
+    service = DashboardService(connector=DuckDBBackend(data_folder=args.data_dir))
+    reset = service.inventory_snapshot.invalidate
+    run = service.get_inventory_analysis_data
+    results = {}
+    try:
+        with app.app_context():
+            results["sano"] = summarize(measure(run, args.repeat, setup=reset))
+            last_known_good.flush()
+            slow_warehouse(service.connector, args.delay)
+
+            app.config['WAREHOUSE_QUERY_TIMEOUT'] = 0
+            warehouse_breaker.enabled = False
+            results["lento sin protección"] = summarize(measure(run, max(args.repeat // 5, 2), warmup=0, setup=reset))
+
+            app.config['WAREHOUSE_QUERY_TIMEOUT'] = args.timeout
+            warehouse_breaker.enabled = True
+            warehouse_breaker.reset()
+            results["lento con plazo"] = summarize(measure(run, args.repeat, warmup=0, setup=reset))
+            breaker = warehouse_breaker.metrics()
+    finally:
+        shutil.rmtree(lkg_dir, ignore_errors=True)
+
+    print(f"Cortocircuito: {breaker['state']}, {breaker['rejected']} consultas rechazadas")
+    params = {"rows": args.rows, "delay": args.delay, "timeout": args.timeout, "repeat": args.repeat}
+    exit_code = report(args, 'degraded', results, params)
+    limit_ms = args.timeout * 1000 + args.max_overhead_ms
+    if results["lento con plazo"]['p95_ms'] > limit_ms:
+        print(f"Latencia con el warehouse lento fuera de límite: p95 "
+              f"{results['lento con plazo']['p95_ms']:.0f} ms > {limit_ms:.0f} ms")
+        exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
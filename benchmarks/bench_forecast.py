@@ -0,0 +1,108 @@
+# benchmarks/bench_forecast.py
+"""
+Previsión de quiebre y reposición (app/services/demand_forecast.py) sobre un
+catálogo sintético de productos × días, con un presupuesto de tiempo fijo.
+
+Mide por separado la construcción de la matriz producto × día a partir de las
+filas (producto, día, unidades) que devuelve el warehouse y la pasada
+vectorizada de previsión, y compara con un ajuste por producto en un bucle de
+Python (np.polyfit por fila) sobre una muestra, extrapolado al catálogo completo.
+Termina con error si el total supera `--budget`.
+
+Uso: python -m benchmarks.bench_forecast [--products 100000] [--days 365] [--budget 5]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.demand_forecast import build_demand_matrix, forecast_demand, stockout_dates
+
+REFERENCE_DATE = pd.Timestamp('2024-12-30')
+
+
+def build_daily_sales(products: int, days: int, seed: int = 42, chunk: int = 10_000) -> pd.DataFrame:
+    """
+    Filas (codigo_producto, dias_atras, total_unidades) solo de los días con ventas,
+    con demanda Poisson de media y tendencia distintas por producto.
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(mean=-1.0, sigma=1.2, size=products)
+    slope = rng.normal(0, 0.002, size=products)
+    t = np.arange(days)
+    frames = []
+    for start in range(0, products, chunk):
+        stop = min(start + chunk, products)
+        expected = np.clip(base[start:stop, None] * (1 + slope[start:stop, None] * t), 0, None)
+        units = rng.poisson(expected).astype('int32')
+        rows, cols = np.nonzero(units)
+        frames.append(pd.DataFrame({
+            'codigo_producto': (rows + start).astype('int64'),
+            'dias_atras': (days - 1 - cols).astype('int32'),
+            'total_unidades': units[rows, cols].astype('float64'),
+        }))
+    daily = pd.concat(frames, ignore_index=True)
+    daily['codigo_producto'] = ('P' + daily['codigo_producto'].astype(str).str.zfill(6)).astype(pd.StringDtype('pyarrow'))
+    return daily
+
+
+def loop_forecast(matrix: np.ndarray, rate_window_days: int) -> np.ndarray:
+    # Alternativa por producto: un ajuste lineal y dos estadísticos por fila.
+    out = np.empty((len(matrix), 3))
+    t = np.arange(matrix.shape[1])
+    for i, row in enumerate(matrix.astype('float64')):
+        out[i, 0] = row[-rate_window_days:].mean()
+        out[i, 1] = np.polyfit(t, row, 1)[0]
+        out[i, 2] = row.std()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--budget', type=float, default=5.0, help="Segundos máximos (matriz + previsión).")
+    parser.add_argument('--loop-sample', type=int, default=2_000)
+    parser.add_argument('--rate-window', type=int, default=28)
+    args = parser.parse_args()
+
+    daily = build_daily_sales(args.products, args.days)
+    codes = np.array([f"P{i:06d}" for i in range(args.products)], dtype=object)
+    stock = np.random.default_rng(7).integers(0, 200, args.products).astype('float64')
+    print(f"Productos: {args.products}  días: {args.days}  filas con ventas: {len(daily)}")
+
+    started = time.perf_counter()
+    matrix = build_demand_matrix(daily, codes, args.days)
+    matrix_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    forecast = forecast_demand(matrix, stock, rate_window_days=args.rate_window, horizon_days=365)
+    stockout_dates(REFERENCE_DATE, forecast['dias_hasta_quiebre'])
+    forecast_time = time.perf_counter() - started
+
+    sample = min(args.loop_sample, args.products)
+    started = time.perf_counter()
+    reference = loop_forecast(matrix[:sample], args.rate_window)
+    loop_time = (time.perf_counter() - started) * args.products / sample
+
+    vectorized = np.column_stack([forecast['demanda_diaria'], forecast['tendencia_diaria'],
+                                  forecast['desviacion_diaria']])[:sample]
+    if not np.allclose(vectorized, reference, rtol=1e-4, atol=1e-6):
+        raise SystemExit("La previsión vectorizada no coincide con el ajuste por producto.")
+
+    total = matrix_time + forecast_time
+    print(f"Matriz producto × día:        {matrix_time:8.2f} s  ({matrix.nbytes / (1024 * 1024):.0f} MB)")
+    print(f"Previsión vectorizada:        {forecast_time:8.2f} s")
+    print(f"Total:                        {total:8.2f} s  (presupuesto {args.budget:.1f} s)")
+    print(f"Bucle por producto (estim.):  {loop_time:8.2f} s  ({loop_time / forecast_time:.0f}x la pasada vectorizada)")
+    print(f"Productos a reponer: {int((forecast['cantidad_reorden'] > 0).sum())}  "
+          f"con quiebre en el horizonte: {int(np.isfinite(forecast['dias_hasta_quiebre']).sum())}")
+    if total > args.budget:
+        print("Fuera de presupuesto.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
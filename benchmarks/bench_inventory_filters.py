@@ -0,0 +1,104 @@
+# benchmarks/bench_inventory_filters.py
+"""
+Compara el filtrado de inventario con máscaras de pandas sobre el DataFrame
+(isin, comparaciones y str.contains en cada petición) con el índice de
+app.services.inventory_index sobre un catálogo sintético.
+
+Uso: python -m benchmarks.bench_inventory_filters [--rows 200000] [--repeat 20]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.inventory_index import InventoryIndex, normalize_inventory_filters
+from app.services.inventory_rules import INVENTORY_STATUS_DTYPE
+
+CATEGORIES = [f"Categoría {i:02d}" for i in range(40)]
+WORDS = ['cable', 'cargador', 'funda', 'auricular', 'teclado', 'mouse', 'monitor', 'parlante', 'memoria', 'adaptador']
+
+QUERIES = {
+    'estado': {'statuses': ['Riesgo de Quiebre', 'Sin Stock']},
+    'estado+categoría': {'statuses': ['Alta Rotación'], 'categories': CATEGORIES[:5]},
+    'rangos': {'stock_min': 10, 'stock_max': 50, 'sales_min': 5},
+    'nombre': {'name': 'Cargador'},
+    'todos': {'statuses': ['Rotación Saludable', 'Lenta Rotación'], 'categories': CATEGORIES[:20],
+              'stock_min': 20, 'sales_max': 60, 'name': 'usb'},
+}
+
+
+def build_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS, dtype=object)
+    names = (pd.Series(words[rng.integers(0, len(WORDS), rows)]).str.title()
+             + np.where(rng.random(rows) < 0.3, ' USB', '')
+             + ' ' + pd.Series(np.arange(rows)).astype(str))
+    return pd.DataFrame({
+        'nombre_del_producto': names.astype(pd.StringDtype('pyarrow')),
+        'stock_actual': rng.integers(-5, 500, rows).astype('int16'),
+        'unidades_vendidas_30d': rng.integers(0, 120, rows).astype('int16'),
+        'estado': pd.Categorical.from_codes(rng.integers(0, len(INVENTORY_STATUS_DTYPE.categories), rows),
+                                            dtype=INVENTORY_STATUS_DTYPE),
+        'categoria': pd.Categorical(np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), rows)],
+                                    categories=CATEGORIES),
+    })
+
+
+def pandas_filter(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    # Máscaras recalculadas sobre todo el DataFrame en cada petición.
+    mask = pd.Series(True, index=df.index)
+    if filters.get('statuses'):
+        mask &= df['estado'].isin(filters['statuses'])
+    if filters.get('categories'):
+        mask &= df['categoria'].isin(filters['categories'])
+    if filters.get('stock_min') is not None:
+        mask &= df['stock_actual'] >= filters['stock_min']
+    if filters.get('stock_max') is not None:
+        mask &= df['stock_actual'] <= filters['stock_max']
+    if filters.get('sales_min') is not None:
+        mask &= df['unidades_vendidas_30d'] >= filters['sales_min']
+    if filters.get('sales_max') is not None:
+        mask &= df['unidades_vendidas_30d'] <= filters['sales_max']
+    if filters.get('name'):
+        mask &= df['nombre_del_producto'].str.contains(filters['name'], case=False, regex=False).fillna(False)
+    return df[mask]
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    df = build_frame(args.rows)
+    started = time.perf_counter()
+    index = InventoryIndex(df)
+    build_time = time.perf_counter() - started
+
+    print(f"Filas: {args.rows}  (construcción del índice: {build_time * 1000:.1f} ms, una vez por instantánea)")
+    print(f"{'consulta':<18}{'filas':>9}{'pandas ms':>12}{'índice ms':>12}{'aceleración':>13}")
+    for label, raw in QUERIES.items():
+        filters = normalize_inventory_filters(raw)
+        expected = pandas_filter(df, filters)
+        result = index.select(filters)
+        if not result.index.equals(expected.index):
+            raise SystemExit(f"'{label}': el índice no devuelve las mismas filas que pandas.")
+
+        pandas_time = best_of(lambda: pandas_filter(df, filters), args.repeat)
+        index_time = best_of(lambda: index.select(filters), args.repeat)
+        print(f"{label:<18}{len(result):>9}{pandas_time * 1000:>12.2f}{index_time * 1000:>12.2f}"
+              f"{pandas_time / index_time:>12.1f}x")
+
+
+if __name__ == '__main__':
+    main()
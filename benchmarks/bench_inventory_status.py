@@ -0,0 +1,79 @@
+# benchmarks/bench_inventory_status.py
+"""
+Compara la clasificación de estado de inventario fila a fila (df.apply) con la
+versión vectorizada de app.services.inventory_rules sobre un DataFrame sintético.
+
+Uso: python -m benchmarks.bench_inventory_status [--rows 100000] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.inventory_rules import compute_days_of_inventory, classify_inventory_status
+
+
+def legacy_assign_status_doi(row):
+    # Copia de la implementación anterior, basada en df.apply(axis=1).
+    stock = row['stock_actual']
+    ventas_30d = row['unidades_vendidas_30d']
+    doi = row['dias_inventario']
+
+    if stock <= 0:
+        return 'Sin Stock'
+    if ventas_30d == 0:
+        return 'Inventario Estancado'
+    if doi <= 7:
+        return 'Riesgo de Quiebre'
+    if doi <= 30:
+        return 'Alta Rotación'
+    if doi > 90:
+        return 'Lenta Rotación'
+    return 'Rotación Saludable'
+
+
+def build_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'stock_actual': rng.integers(-5, 500, rows).astype('float64'),
+        'unidades_vendidas_30d': rng.integers(0, 120, rows).astype('float64'),
+    })
+    df['dias_inventario'] = compute_days_of_inventory(df['stock_actual'], df['unidades_vendidas_30d'], 30)
+    return df
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = build_frame(args.rows)
+
+    legacy = df.apply(legacy_assign_status_doi, axis=1)
+    vectorized = classify_inventory_status(df['stock_actual'], df['unidades_vendidas_30d'], df['dias_inventario'])
+    if not (legacy.to_numpy() == np.asarray(vectorized).astype(object)).all():
+        raise SystemExit("Las dos implementaciones no producen la misma clasificación.")
+
+    legacy_time = best_of(lambda: df.apply(legacy_assign_status_doi, axis=1), max(1, args.repeat // 2))
+    vectorized_time = best_of(lambda: classify_inventory_status(
+        df['stock_actual'], df['unidades_vendidas_30d'], df['dias_inventario']), args.repeat)
+
+    print(f"Filas: {args.rows}")
+    print(f"df.apply (fila a fila): {legacy_time * 1000:10.2f} ms")
+    print(f"np.select vectorizado:  {vectorized_time * 1000:10.2f} ms")
+    print(f"Aceleración:            {legacy_time / vectorized_time:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/bench_memory.py
+"""
+Memoria por fallo de caché con y sin la política de tipos compactos
+(`COMPACT_DTYPES`, app/utils/dtypes.py) sobre un catálogo grande.
+
+Para aislar el trayecto conector → servicio de la memoria de ejecución del
+motor, cada caso se ejecuta primero sobre DuckDB guardando las tablas Arrow que
+devuelve el warehouse, y después se reproduce en un proceso nuevo por política
+con esas tablas ya cargadas en memoria (como si acabaran de llegar de la red).
+Antes de medir, el caso se ejecuta sobre una muestra de las tablas para cargar
+el código de las librerías; después se mide el incremento de RSS pico de la
+llamada sobre la RSS previa y el tamaño en memoria de los DataFrames que
+entrega `execute_query`.
+
+Casos:
+- inventory: carga de la instantánea de inventario y serialización a registros
+  (fallo de caché de /api/data/inventory_analysis).
+- top_pandas: top N en modo pandas, que descarga ventas y productos completos.
+
+Uso: python -m benchmarks.bench_memory [--rows 10000000] [--cases inventory,top_pandas]
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pyarrow as pa
+
+from benchmarks import datagen
+from benchmarks.harness import peak_rss_mb, current_rss_mb
+
+CASES = ['inventory', 'top_pandas']
+WARMUP_ROWS = 100
+
+
+def _table_key(query: str, params: list) -> str:
+    return hashlib.sha1(json.dumps([query, params], default=str).encode('utf-8')).hexdigest()
+
+
+def build_service(connector, compact: bool):
+    from app import create_app
+    from app.services.dashboard_service import DashboardService
+
+    app = create_app('testing')
+    app.config['SUMMARY_TABLES_ENABLED'] = False
+    app.config['COMPACT_DTYPES'] = compact
+    return app, DashboardService(connector=connector)
+
+
+def cache_miss(service, case: str) -> list:
+    if case == 'inventory':
+        service.inventory_snapshot.invalidate()
+        return service.get_inventory_analysis_data()
+    return service.get_sales_analysis_data(None, 10, mode='pandas')['top_products_by_quantity']
+
+
+def record_case(case: str, data_dir: str, tables_dir: str):
+    """
+    Ejecuta el caso sobre DuckDB y guarda cada tabla Arrow devuelta como fichero IPC.
+    """
+    from app.utils.duckdb_backend import DuckDBBackend
+
+    connector = DuckDBBackend(data_folder=data_dir)
+    fetch_arrow = connector._fetch_arrow
+
+    def recording_fetch_arrow(query, params):
+        table = fetch_arrow(query, params)
+        with pa.OSFile(os.path.join(tables_dir, _table_key(query, params) + '.arrow'), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return table
+
+    connector._fetch_arrow = recording_fetch_arrow
+    app, service = build_service(connector, compact=True)
+    with app.app_context():
+        cache_miss(service, case)
+
+
+def replay_case(case: str, tables_dir: str, compact: bool) -> dict:
+    """
+    Reproduce el caso con las tablas grabadas y devuelve sus medidas.
+    """
+    from app.utils.warehouse_backend import WarehouseBackend
+
+    class ReplayBackend(WarehouseBackend):
+        name = 'replay'
+
+        def __init__(self):
+            super().__init__()
+            self.warming_up = False
+            self.tables = {}
+            for filename in os.listdir(tables_dir):
+                with pa.OSFile(os.path.join(tables_dir, filename), 'rb') as source:
+                    self.tables[filename[:-len('.arrow')]] = pa.ipc.open_file(source).read_all()
+
+        def _fetch_arrow(self, query, params):
+            table = self.tables[_table_key(query, params)]
+            return table.slice(0, WARMUP_ROWS) if self.warming_up else table
+
+        def close_connection(self):
+            pass
+
+    connector = ReplayBackend()
+    app, service = build_service(connector, compact)
+
+    frames = []
+    execute_query = connector.execute_query
+
+    def recording_execute_query(*args, **kwargs):
+        df = execute_query(*args, **kwargs)
+        frames.append(int(df.memory_usage(deep=True).sum()))
+        return df
+
+    connector.execute_query = recording_execute_query
+
+    with app.app_context():
+        # Calentamiento con una muestra: el código de las librerías que se carga en
+        # el primer uso no depende del tamaño de los datos ni se repite en cada fallo.
+        connector.warming_up = True
+        cache_miss(service, case)
+        connector.warming_up = False
+        frames.clear()
+        gc.collect()
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        records = cache_miss(service, case)
+        seconds = time.perf_counter() - started
+
+    return {
+        "rows_out": len(records),
+        "seconds": round(seconds, 3),
+        "arrow_mb": round(sum(t.nbytes for t in connector.tables.values()) / (1024 * 1024), 1),
+        "peak_rss_delta_mb": round(peak_rss_mb() - rss_before, 1),
+        "frames_mb": round(sum(frames) / (1024 * 1024), 1),
+    }
+
+
+def run_child(*args) -> str:
+    return subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_memory', *args],
+        check=True, capture_output=True, text=True,
+    ).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--data-dir', default='/tmp/tecnomundo_bench')
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--record', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--replay', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--tables-dir', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--compact', default='1', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Procesos hijo: grabación y reproducción de un caso.
+    if args.record:
+        record_case(args.record, args.data_dir, args.tables_dir)
+        return
+    if args.replay:
+        print(json.dumps(replay_case(args.replay, args.tables_dir, args.compact == '1')))
+        return
+
+    summary = datagen.ensure_dataset(args.data_dir, args.rows)
+    print(f"Datos: {summary}")
+    print(f"{'caso':<14}{'tipos':<13}{'Arrow MB':>10}{'frames MB':>11}{'Δ RSS pico MB':>15}{'s':>8}")
+    for case in args.cases.split(','):
+        with tempfile.TemporaryDirectory(prefix='bench_memory_') as tables_dir:
+            run_child('--record', case, '--data-dir', args.data_dir, '--tables-dir', tables_dir)
+            results = {}
+            for compact in (False, True):
+                output = run_child('--replay', case, '--tables-dir', tables_dir, '--compact', '1' if compact else '0')
+                stats = results[compact] = json.loads(output.strip().splitlines()[-1])
+                print(f"{case:<14}{'compactos' if compact else 'por defecto':<13}{stats['arrow_mb']:>10.1f}"
+                      f"{stats['frames_mb']:>11.1f}{stats['peak_rss_delta_mb']:>15.1f}{stats['seconds']:>8.2f}")
+        before, after = results[False]['peak_rss_delta_mb'], results[True]['peak_rss_delta_mb']
+        if before > 0:
+            print(f"{case:<14}{'variación':<13}{'':>21}{(after - before) / before:>+15.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_pdf_render.py
+"""
+Tiempo y tamaño del PDF de inventario para 1k, 10k y 50k filas, comparando la
+tabla única original con el modo por bloques de PDFService.
+
+Uso: python -m benchmarks.bench_pdf_render [--rows 1000 10000 50000] [--legacy-max 10000] [--trace-memory]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.inventory_rules import INVENTORY_STATUSES
+from app.services.pdf_service import PDFService
+
+
+def build_rows(count: int, seed: int = 3) -> list:
+    rng = np.random.default_rng(seed)
+    statuses = rng.choice(INVENTORY_STATUSES, count)
+    long_names = rng.random(count) < 0.1
+    return [
+        {
+            'nombre_del_producto': (f"Producto de prueba {i} con una descripción comercial bastante más larga de lo normal"
+                                    if long_names[i] else f"Producto {i}"),
+            'stock_actual': float(rng.integers(0, 500)),
+            'unidades_vendidas_30d': int(rng.integers(0, 120)),
+            'estado': str(statuses[i]),
+        }
+        for i in range(count)
+    ]
+
+
+def measure(data, chunked: bool, trace_memory: bool):
+    # tracemalloc ralentiza mucho ReportLab: los tiempos con memoria no son comparables con los demás.
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with PDFService().create_inventory_list_pdf(data, "Benchmark", chunked=chunked) as pdf_file:
+        size = len(pdf_file.read())
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000,
+                        help="No medir la tabla única por encima de estas filas (es muy lenta).")
+    parser.add_argument('--trace-memory', action='store_true', help="Medir también el pico de memoria Python.")
+    args = parser.parse_args()
+
+    print(f"{'filas':>8} {'modo':<12} {'tiempo (s)':>11} {'PDF (KB)':>10} {'pico mem (MB)':>14}")
+    for count in args.rows:
+        data = build_rows(count)
+        modes = [('bloques', True)]
+        if count <= args.legacy_max:
+            modes.insert(0, ('tabla única', False))
+        for label, chunked in modes:
+            elapsed, size, peak = measure(data, chunked, args.trace_memory)
+            peak_str = f"{peak / 1024 / 1024:.1f}" if peak is not None else "-"
+            print(f"{count:>8} {label:<12} {elapsed:>11.2f} {size / 1024:>10.0f} {peak_str:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_result_cache.py
+"""
+Caché de resultados de consultas (app/utils/result_cache.py) sobre el backend DuckDB
+y datos sintéticos (benchmarks.datagen).
+
+Para cada consulta de negocio mide:
+- warehouse: la consulta llega siempre al motor (caché desactivada).
+- caché: acierto en disco, leyendo el fichero Arrow con memory-mapping.
+Ambos incluyen la conversión a pandas, como `execute_query`.
+
+Después comprueba en un proceso nuevo, como un worker recién arrancado, que todas
+las consultas se sirven desde los ficheros que dejó este proceso sin ir al motor.
+
+Uso: python -m benchmarks.bench_result_cache [--rows 1000000] [--repeat 10]
+                                             [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import datagen
+from benchmarks.harness import measure, summarize, add_baseline_arguments, report
+
+_CHILD = """
+import json, sys, time
+from benchmarks.bench_result_cache import build_backend, build_queries
+from app.extensions import result_cache
+result_cache.directory, result_cache.enabled = {cache_dir!r}, True
+backend = build_backend({data_dir!r})
+backend._fetch_arrow = None  # Cualquier consulta que llegue al motor falla.
+started = time.perf_counter()
+for name, query in build_queries(backend).items():
+    query()
+print(json.dumps({{"seconds": time.perf_counter() - started, "stats": result_cache.stats()}}))
+"""
+
+
+def build_backend(data_dir: str):
+    from app.utils.duckdb_backend import DuckDBBackend
+
+    backend = DuckDBBackend(data_folder=data_dir)
+    # Sin tablas resumen: las consultas leen la tabla de hechos, el caso más caro.
+    backend._summary_checked_at = float('inf')
+    return backend
+
+
+def build_queries(backend) -> dict:
+    return {
+        "get_inventory_data": backend.get_inventory_data,
+        "get_top_products": lambda: backend.get_top_products(None, 10),
+        "get_sales_date_range": backend.get_sales_date_range,
+        "get_daily_sales_by_category": backend.get_daily_sales_by_category,
+        "get_daily_sales_by_product": lambda: backend.get_daily_sales_by_product(90),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--data-dir', default='/tmp/tecnomundo_bench')
+    parser.add_argument('--repeat', type=int, default=10)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    from app.extensions import result_cache
+
+    summary = datagen.ensure_dataset(args.data_dir, args.rows)
+    print(f"Datos: {summary}")
+    cache_dir = tempfile.mkdtemp(prefix='tecnomundo_results_bench_')
+    result_cache.directory, result_cache.ttl = cache_dir, 3600
+
+    backend = build_backend(args.data_dir)
+    results = {}
+    try:
+        for name, query in build_queries(backend).items():
+            result_cache.enabled = False
+            results[f"{name} warehouse"] = summarize(measure(query, args.repeat))
+            # La primera llamada (calentamiento de measure) guarda el resultado.
+            result_cache.enabled = True
+            results[f"{name} caché"] = summarize(measure(query, args.repeat))
+
+        stats = result_cache.stats()
+        print(f"Ficheros en caché: {stats['entries']}  ({stats['bytes'] / (1024 * 1024):.1f} MB)  "
+              f"aciertos {stats['hits']}  fallos {stats['misses']}")
+
+        output = subprocess.run(
+            [sys.executable, '-c', _CHILD.format(cache_dir=cache_dir, data_dir=args.data_dir)],
+            check=True, capture_output=True, text=True, env=dict(os.environ),
+        ).stdout
+        child = json.loads(output.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"Proceso nuevo: {child['stats']['hits']} aciertos, {child['stats']['misses']} fallos "
+          f"en {child['seconds'] * 1000:.1f} ms")
+    params = {"rows": args.rows, "repeat": args.repeat}
+    exit_code = report(args, 'result_cache', results, params)
+    if child['stats']['misses']:
+        print("El proceso nuevo no encontró todos los resultados en la caché.")
+        exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_sales_trend.py
+"""
+Latencia de consultas de tendencia por rango de fechas: una agregación GROUP BY
+sobre fact_sales por cada rango (comportamiento anterior) frente a recortar el
+agregado diario local de SalesTrendStore.
+
+Usa DuckDB en memoria como sustituto local del warehouse.
+
+Uso: python -m benchmarks.bench_sales_trend [--rows 2000000] [--queries 200]
+"""
+import argparse
+import statistics
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from app.services.sales_trend_store import SalesTrendStore
+from app.utils.queries import get_sales_trend_query, get_daily_sales_by_category_query
+
+
+def build_warehouse(rows: int, products: int = 5000, days: int = 730, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    con = duckdb.connect()
+    con.execute("ATTACH ':memory:' AS workspace")
+    con.execute("CREATE SCHEMA workspace.tecnomundo_data_gold")
+    dim = pd.DataFrame({
+        'codigo_producto': np.arange(products),
+        'nombre_del_producto': [f'Producto {i}' for i in range(products)],
+        'categoria': rng.choice(['Audio', 'Celulares', 'Computación', 'Servicio Tecnico'], products),
+    })
+    start = np.datetime64('2023-01-01')
+    fact = pd.DataFrame({
+        'codigo_producto': rng.integers(0, products, rows),
+        'cantidad': rng.integers(1, 6, rows),
+        'fecha': start + rng.integers(0, days, rows).astype('timedelta64[D]'),
+    })
+    con.register('dim_df', dim)
+    con.register('fact_df', fact)
+    con.execute("CREATE TABLE workspace.tecnomundo_data_gold.dim_products AS SELECT * FROM dim_df")
+    con.execute("CREATE TABLE workspace.tecnomundo_data_gold.fact_sales AS SELECT * FROM fact_df")
+    return con, str(start), days
+
+
+def random_ranges(first_day: str, days: int, count: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp(first_day)
+    ranges = []
+    for _ in range(count):
+        start = int(rng.integers(0, days - 1))
+        length = int(rng.integers(7, 120))
+        end = min(start + length, days - 1)
+        ranges.append(((base + pd.Timedelta(days=start)).strftime('%Y-%m-%d'),
+                       (base + pd.Timedelta(days=end)).strftime('%Y-%m-%d')))
+    return ranges
+
+
+def summarize(label: str, timings: list):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(f"{label:<32} media {statistics.mean(timings_ms):9.2f} ms   p95 {p95:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    con, first_day, days = build_warehouse(args.rows)
+    ranges = random_ranges(first_day, days, args.queries)
+
+    def run(query, params):
+        return con.cursor().execute(query, params).df()
+
+    before = []
+    for start_date, end_date in ranges:
+        started = time.perf_counter()
+        query, params = get_sales_trend_query(start_date, end_date)
+        df = run(query, params)
+        df['fecha_venta'] = pd.to_datetime(df['fecha_venta'])
+        df.set_index('fecha_venta').reindex(pd.date_range(start_date, end_date, freq='D'), fill_value=0)
+        before.append(time.perf_counter() - started)
+
+    store = SalesTrendStore(lambda since=None: run(*get_daily_sales_by_category_query(since)),
+                            refresh_interval=3600)
+    started = time.perf_counter()
+    store.ensure_fresh()
+    initial_load = time.perf_counter() - started
+
+    after = []
+    for start_date, end_date in ranges:
+        started = time.perf_counter()
+        store.ensure_fresh()
+        store.get_range(start_date, end_date)
+        after.append(time.perf_counter() - started)
+
+    print(f"Filas en fact_sales: {args.rows}, consultas de rango: {args.queries}")
+    summarize("GROUP BY por rango (antes)", before)
+    summarize("Recorte del agregado (después)", after)
+    print(f"Carga inicial del agregado: {initial_load * 1000:.2f} ms (una sola vez)")
+
+
+if __name__ == '__main__':
+    main()
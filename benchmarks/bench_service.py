@@ -0,0 +1,102 @@
+# benchmarks/bench_service.py
+"""
+Microbenchmarks de cada método de DashboardService y de la generación del PDF de
+inventario, sobre el backend DuckDB y datos sintéticos (benchmarks.datagen).
+
+Salvo los casos marcados como «caliente», antes de cada medición se vacían las
+cachés en memoria del servicio (instantánea de inventario y agregado de ventas
+diarias), de modo que se mide el camino completo: consulta, transformación y
+serialización a estructuras de Python. La dimensión de productos se mantiene
+cargada, como en un proceso en marcha.
+
+Uso: python -m benchmarks.bench_service [--rows 1000000] [--repeat 10] [--cases inventory]
+                                        [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import sys
+
+from benchmarks import datagen
+from benchmarks.harness import measure, summarize, add_baseline_arguments, report
+
+
+def build_service(data_dir: str):
+    from app import create_app
+    from app.services.dashboard_service import DashboardService
+    from app.utils.duckdb_backend import DuckDBBackend
+
+    app = create_app('testing')
+    app.config['SUMMARY_TABLES_ENABLED'] = False
+    service = DashboardService(connector=DuckDBBackend(data_folder=data_dir))
+    return app, service
+
+
+def build_cases(service, date_range: dict, pdf_rows: int) -> list:
+    from app.services.pdf_service import PDFService
+    from app.services.sales_trend_store import SalesTrendStore
+
+    def reset_inventory():
+        service.inventory_snapshot.invalidate()
+
+    def reset_trend_store():
+        service.sales_trend_store = SalesTrendStore(service.connector.get_daily_sales_by_category)
+
+    end_date = date_range['max_date']
+    start_date = date_range['min_date']
+    categories = service.get_all_categories()
+    category = categories[0] if categories else None
+
+    critical = service.get_critical_inventory_data()[:pdf_rows]
+    pdf_service = PDFService()
+
+    def render_pdf():
+        pdf_service.create_inventory_list_pdf(critical, "Benchmark").close()
+
+    # (nombre, función, preparación antes de cada medición)
+    return [
+        ("get_all_categories", service.get_all_categories, None),
+        ("get_sales_analysis_data warehouse", lambda: service.get_sales_analysis_data(None, 10), None),
+        ("get_sales_analysis_data warehouse cat", lambda: service.get_sales_analysis_data(category, 10), None),
+        ("get_sales_analysis_data pandas", lambda: service.get_sales_analysis_data(None, 10, mode='pandas'), None),
+        ("get_inventory_analysis_data", service.get_inventory_analysis_data, reset_inventory),
+        ("get_inventory_analysis_data caliente", service.get_inventory_analysis_data, None),
+        ("get_filtered_inventory_data", lambda: service.get_filtered_inventory_data(
+            {"statuses": ["Riesgo de Quiebre", "Sin Stock"]}), reset_inventory),
+        ("get_inventory_health_report_data", service.get_inventory_health_report_data, reset_inventory),
+        ("get_critical_inventory_data", service.get_critical_inventory_data, reset_inventory),
+        ("get_sales_date_range", service.get_sales_date_range, None),
+        ("get_sales_trend", lambda: service.get_sales_trend(start_date, end_date), reset_trend_store),
+        ("get_sales_trend caliente", lambda: service.get_sales_trend(start_date, end_date), None),
+        (f"create_inventory_list_pdf ({len(critical)} filas)", render_pdf, None),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--data-dir', default='/tmp/tecnomundo_bench')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--pdf-rows', type=int, default=500)
+    parser.add_argument('--cases', default=None, help="Solo los casos cuyo nombre contiene este texto.")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    summary = datagen.ensure_dataset(args.data_dir, args.rows)
+    print(f"Datos: {summary}")
+
+    app, service = build_service(args.data_dir)
+    results = {}
+    with app.app_context():
+        date_range = service.get_sales_date_range()
+        for name, fn, setup in build_cases(service, date_range, args.pdf_rows):
+            if args.cases and args.cases not in name:
+                continue
+            results[name] = summarize(measure(fn, args.repeat, args.warmup, setup))
+            print(f"  {name}: p50 {results[name]['p50_ms']:.2f} ms")
+
+    params = {"rows": args.rows, "repeat": args.repeat, "pdf_rows": args.pdf_rows}
+    sys.exit(report(args, 'service', results, params))
+
+
+if __name__ == '__main__':
+    main()
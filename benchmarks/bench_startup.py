@@ -0,0 +1,82 @@
+# benchmarks/bench_startup.py
+"""
+Tiempo de arranque: `import app` + `create_app()` en un proceso nuevo por medición,
+como el arranque de un worker o un cold start del autoescalado.
+
+Casos:
+- create_app: importar la aplicación y crearla (lo que paga cada worker al arrancar).
+- primer servicio: además, construir el servicio del dashboard dentro del contexto
+  de la aplicación, como en la primera petición (sin consultar el warehouse).
+
+Además de comparar con la línea base (p50/p95, `--tolerance`), falla si tras
+`create_app` están cargados módulos que solo deben importarse al usarse
+(ReportLab, el conector de Databricks) o si el p50 de create_app supera `--max-ms`.
+
+Uso: python -m benchmarks.bench_startup [--repeat 10] [--config production] [--max-ms 1500]
+                                        [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import summarize, add_baseline_arguments, report
+
+# Módulos que no deben cargarse al arrancar: solo se importan al exportar o al consultar.
+DEFERRED_MODULES = ('reportlab', 'app.services.pdf_service', 'databricks.sql')
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app({config!r})
+created = time.perf_counter()
+loaded = [m for m in {deferred!r} if m in sys.modules]
+with app.app_context():
+    from app.services.dashboard_service import get_dashboard_service
+    get_dashboard_service()
+print(json.dumps({{"create_app": created - started, "service": time.perf_counter() - started, "loaded": loaded}}))
+"""
+
+
+def run_child(config: str) -> dict:
+    # Sin tareas en segundo plano: el precalentamiento consultaría el warehouse.
+    env = dict(os.environ, CACHE_WARMER_ENABLED='false', SUMMARY_REFRESH_ENABLED='false')
+    output = subprocess.run(
+        [sys.executable, '-c', _CHILD.format(config=config, deferred=DEFERRED_MODULES)],
+        check=True, capture_output=True, text=True, env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--max-ms', type=float, default=1500, help="Límite absoluto del p50 de create_app.")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    run_child(args.config)  # Calentamiento: caché de bytecode y del sistema de ficheros.
+    runs = [run_child(args.config) for _ in range(args.repeat)]
+
+    results = {
+        "create_app": summarize([r['create_app'] for r in runs]),
+        "create_app + primer servicio": summarize([r['service'] for r in runs]),
+    }
+    params = {"repeat": args.repeat, "config": args.config}
+    exit_code = report(args, 'startup', results, params)
+
+    loaded = sorted({m for r in runs for m in r['loaded']})
+    if loaded:
+        print(f"Módulos cargados al arrancar que deberían diferirse: {', '.join(loaded)}")
+        exit_code = 1
+    if results['create_app']['p50_ms'] > args.max_ms:
+        print(f"create_app supera el límite: {results['create_app']['p50_ms']:.0f} ms > {args.max_ms:.0f} ms")
+        exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
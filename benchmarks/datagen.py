@@ -0,0 +1,108 @@
+# benchmarks/datagen.py
+"""
+Generador sintético de fact_sales y dim_products para las pruebas de rendimiento.
+
+Escribe los datos como Parquet con la estructura que espera el backend DuckDB
+(`WAREHOUSE_BACKEND=duckdb`): `dim_products.parquet` y la carpeta `fact_sales/`
+con un fichero por bloque, de modo que escalas de hasta 50M de filas se generan
+sin tener toda la tabla en memoria.
+
+Uso: python -m benchmarks.datagen --rows 1000000 --out /tmp/tecnomundo_bench [--days 730] [--seed 7]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CATEGORIES = ['Audio', 'Celulares', 'Computación', 'Consolas', 'Accesorios', 'Televisores', 'Servicio Tecnico']
+FIRST_DAY = np.datetime64('2023-01-01T00:00:00')
+CHUNK_ROWS = 2_000_000
+
+
+def products_for(rows: int) -> int:
+    # Catálogo proporcional al volumen de ventas, dentro de límites realistas.
+    return int(min(max(rows // 200, 100), 200_000))
+
+
+def generate_products(products: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    categories = rng.choice(CATEGORIES, products, p=[0.18, 0.2, 0.18, 0.1, 0.2, 0.1, 0.04])
+    # Algunos productos sin categoría, como en los datos reales.
+    categories = np.where(rng.random(products) < 0.01, None, categories)
+    return pd.DataFrame({
+        'codigo_producto': np.arange(products, dtype='int64'),
+        'nombre_del_producto': [f'Producto {i:06d}' for i in range(products)],
+        'categoria': categories,
+    })
+
+
+def generate_sales_chunk(rows: int, products: int, days: int, rng) -> pd.DataFrame:
+    # Popularidad tipo Zipf: pocos productos concentran la mayoría de las ventas.
+    popularity = rng.zipf(1.3, rows) % products
+    return pd.DataFrame({
+        'codigo_producto': popularity.astype('int64'),
+        'cantidad': rng.integers(1, 6, rows, dtype='int64'),
+        'precio_unitario': np.round(rng.uniform(5, 1500, rows), 2),
+        'stock_actual': rng.integers(0, 250, rows, dtype='int64'),
+        'fecha': FIRST_DAY + rng.integers(0, days * 86400, rows).astype('timedelta64[s]'),
+    })
+
+
+def write_dataset(out_dir: str, rows: int, days: int = 730, seed: int = 7, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    Escribe el conjunto de datos en `out_dir` y devuelve un resumen (filas, productos, ficheros).
+    """
+    products = products_for(rows)
+    fact_dir = os.path.join(out_dir, 'fact_sales')
+    os.makedirs(fact_dir, exist_ok=True)
+    for name in os.listdir(fact_dir):
+        if name.endswith('.parquet'):
+            os.remove(os.path.join(fact_dir, name))
+
+    generate_products(products, seed).to_parquet(os.path.join(out_dir, 'dim_products.parquet'), index=False)
+
+    rng = np.random.default_rng(seed + 1)
+    files = 0
+    for start in range(0, rows, chunk_rows):
+        chunk = generate_sales_chunk(min(chunk_rows, rows - start), products, days, rng)
+        pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False),
+                       os.path.join(fact_dir, f'part-{files:05d}.parquet'))
+        files += 1
+    return {"rows": rows, "products": products, "days": days, "files": files}
+
+
+def ensure_dataset(out_dir: str, rows: int, days: int = 730, seed: int = 7) -> dict:
+    """
+    Reutiliza el conjunto de datos de `out_dir` si se generó con los mismos parámetros.
+    """
+    marker = os.path.join(out_dir, f'.generated-{rows}-{days}-{seed}')
+    if os.path.exists(marker):
+        return {"rows": rows, "products": products_for(rows), "days": days, "reused": True}
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        if name.startswith('.generated-'):
+            os.remove(os.path.join(out_dir, name))
+    summary = write_dataset(out_dir, rows, days, seed)
+    open(marker, 'w').close()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--out', default='/tmp/tecnomundo_bench')
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = ensure_dataset(args.out, args.rows, args.days, args.seed)
+    print(f"{summary} en {time.perf_counter() - started:.1f}s -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# benchmarks/harness.py
+"""
+Utilidades comunes de las pruebas de rendimiento: medición, percentiles, memoria
+pico y comparación con una línea base guardada en JSON.
+"""
+import json
+import os
+import platform
+import resource
+import time
+
+import numpy as np
+
+# Regresión: el p50 o el p95 empeoran más que esta fracción respecto a la línea base.
+DEFAULT_TOLERANCE = 0.15
+
+
+def peak_rss_mb() -> float:
+    """
+    Memoria residente pico del proceso (monótona: incluye todo lo ejecutado hasta ahora).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devuelve KB; macOS, bytes.
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def current_rss_mb() -> float:
+    """
+    Memoria residente actual del proceso. Solo en Linux (/proc); en otros sistemas
+    se devuelve la pico.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return peak_rss_mb()
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def measure(fn, repeat: int = 10, warmup: int = 1, setup=None) -> list:
+    """
+    Ejecuta `fn` `warmup + repeat` veces y devuelve los tiempos (s) de las últimas `repeat`.
+    `setup` se ejecuta antes de cada llamada, fuera del tiempo medido.
+    """
+    timings = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+def summarize(timings: list, wall_seconds: float = None) -> dict:
+    """
+    Percentiles en milisegundos y rendimiento (operaciones por segundo). Si no se
+    indica `wall_seconds`, el rendimiento se calcula sobre la suma de los tiempos.
+    """
+    values = np.asarray(timings, dtype='float64') * 1000
+    wall = wall_seconds if wall_seconds is not None else values.sum() / 1000
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "throughput_per_s": round(len(values) / wall, 2) if wall > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def print_table(results: dict):
+    print(f"{'caso':<44}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'RSS MB':>9}")
+    for name, stats in results.items():
+        print(f"{name:<44}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+              f"{stats['throughput_per_s'] or 0:>10.1f}{stats['peak_rss_mb']:>9.0f}")
+
+
+def save_baseline(path: str, suite: str, results: dict, params: dict):
+    """
+    Guarda los resultados de `suite` en el fichero de línea base, conservando las demás suites.
+    """
+    baseline = load_baseline(path)
+    baseline[suite] = {"params": params, "results": results}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+    print(f"Línea base de '{suite}' guardada en {path}.")
+
+
+def load_baseline(path: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(path: str, suite: str, results: dict, params: dict,
+                        tolerance: float = DEFAULT_TOLERANCE) -> bool:
+    """
+    Imprime la variación de p50/p95 frente a la línea base y devuelve True si hay
+    alguna regresión por encima de `tolerance`.
+    """
+    stored = load_baseline(path).get(suite)
+    if stored is None:
+        print(f"No hay línea base de '{suite}' en {path}.")
+        return False
+    if stored.get('params') != params:
+        print(f"Aviso: la línea base se midió con otros parámetros: {stored.get('params')}")
+
+    regressions = []
+    print(f"\n{'caso':<44}{'Δ p50':>10}{'Δ p95':>10}")
+    for name, stats in results.items():
+        before = stored['results'].get(name)
+        if before is None:
+            print(f"{name:<44}{'nuevo':>10}")
+            continue
+        deltas = []
+        for metric in ('p50_ms', 'p95_ms'):
+            delta = (stats[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            deltas.append(delta)
+            if delta > tolerance:
+                regressions.append(f"{name} {metric}")
+        print(f"{name:<44}{deltas[0]:>+10.1%}{deltas[1]:>+10.1%}")
+
+    if regressions:
+        print(f"\nRegresiones (> {tolerance:.0%}): {', '.join(regressions)}")
+    else:
+        print(f"\nSin regresiones por encima del {tolerance:.0%}.")
+    return bool(regressions)
+
+
+def add_baseline_arguments(parser):
+    parser.add_argument('--baseline', default=os.path.join(os.path.dirname(__file__), 'baseline.json'),
+                        help="Fichero JSON de línea base.")
+    parser.add_argument('--save-baseline', action='store_true', help="Guarda los resultados como línea base.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+
+
+def report(args, suite: str, results: dict, params: dict) -> int:
+    """
+    Imprime los resultados y los compara con la línea base o la guarda.
+    Devuelve el código de salida (1 si hay regresiones).
+    """
+    print_table(results)
+    if args.save_baseline:
+        save_baseline(args.baseline, suite, results, params)
+        return 0
+    return 1 if compare_to_baseline(args.baseline, suite, results, params, args.tolerance) else 0
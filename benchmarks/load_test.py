@@ -0,0 +1,143 @@
+# benchmarks/load_test.py
+"""
+Prueba de carga HTTP que reproduce la secuencia de peticiones de dashboard.html.
+
+Levanta la aplicación Flask en un servidor local con hilos sobre el backend
+DuckDB y datos sintéticos (benchmarks.datagen). Cada usuario virtual:
+1. carga la página y las categorías,
+2. pide el top 10 de ventas de todas las categorías,
+3. abre Inteligencia de Inventario,
+4. abre Reportes: salud de inventario, rango de fechas y tendencia de los últimos 30 días,
+5. cambia de categoría y de top N en ventas, y de categoría en inventario.
+
+Con --no-cache las vistas se ejecutan sin la caché compartida, para medir el
+coste real de cada endpoint; sin la opción se mide el caso habitual con caché.
+
+Uso: python -m benchmarks.load_test [--rows 1000000] [--users 8] [--iterations 10] [--no-cache]
+                                    [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from werkzeug.serving import make_server
+
+from benchmarks import datagen
+from benchmarks.harness import summarize, add_baseline_arguments, report
+
+
+def start_server(data_dir: str, use_cache: bool):
+    # La configuración se lee al importar la aplicación: las variables van antes del import.
+    os.environ['WAREHOUSE_BACKEND'] = 'duckdb'
+    os.environ['DATA_FOLDER'] = data_dir
+
+    from app import create_app
+    from app.extensions import cache
+
+    app = create_app('testing')
+    app.config['SUMMARY_TABLES_ENABLED'] = False
+    if not use_cache:
+        cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+
+    # Sin el log de acceso por petición de werkzeug, que distorsiona las medidas.
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def fetch(base_url: str, path: str, timings: dict, errors: dict, label: str = None):
+    label = label or path.split('?')[0]
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(base_url + path, timeout=300) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body, status = b'', e.code
+    except OSError:
+        body, status = b'', None
+    timings[label].append(time.perf_counter() - started)
+    if status != 200:
+        errors[label] += 1
+    return body
+
+
+def user_session(base_url: str, categories: list, trend_window: tuple, seed: int, timings, errors):
+    """
+    Una visita completa al dashboard, en el mismo orden que el JavaScript de la página.
+    """
+    rng = random.Random(seed)
+    fetch(base_url, '/', timings, errors, label='/ (html)')
+    fetch(base_url, '/api/categories', timings, errors)
+    fetch(base_url, '/api/data/sales_analysis?' + urlencode({'top_n': 10, 'category': 'all'}), timings, errors)
+    fetch(base_url, '/api/data/inventory_analysis?' + urlencode({'category': 'all'}), timings, errors)
+    fetch(base_url, '/api/reports/inventory_health', timings, errors)
+    fetch(base_url, '/api/reports/sales_date_range', timings, errors)
+    start_date, end_date = trend_window
+    fetch(base_url, '/api/reports/sales_trend?' + urlencode({'start_date': start_date, 'end_date': end_date}),
+          timings, errors)
+    if categories:
+        fetch(base_url, '/api/data/sales_analysis?' + urlencode({
+            'top_n': rng.choice([5, 10, 15, 20]), 'category': rng.choice(categories)}), timings, errors)
+        fetch(base_url, '/api/data/inventory_analysis?' + urlencode({'category': rng.choice(categories)}),
+              timings, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--data-dir', default='/tmp/tecnomundo_bench')
+    parser.add_argument('--users', type=int, default=8, help="Usuarios virtuales concurrentes.")
+    parser.add_argument('--iterations', type=int, default=10, help="Visitas al dashboard por usuario.")
+    parser.add_argument('--no-cache', action='store_true')
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    summary = datagen.ensure_dataset(args.data_dir, args.rows)
+    print(f"Datos: {summary}")
+    server, base_url = start_server(args.data_dir, use_cache=not args.no_cache)
+
+    categories = json.loads(urllib.request.urlopen(base_url + '/api/categories').read())
+    date_range = json.loads(urllib.request.urlopen(base_url + '/api/reports/sales_date_range').read())
+    end = datetime.strptime(date_range['max_date'], '%Y-%m-%d')
+    trend_window = ((end - timedelta(days=29)).strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        futures = [
+            pool.submit(user_session, base_url, categories, trend_window, user * 1000 + i, timings, errors)
+            for user in range(args.users) for i in range(args.iterations)
+        ]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+    server.shutdown()
+
+    results = {label: summarize(values, wall) for label, values in sorted(timings.items())}
+    all_timings = [t for values in timings.values() for t in values]
+    results['TOTAL'] = summarize(all_timings, wall)
+    print(f"\n{len(all_timings)} peticiones en {wall:.1f}s ({len(all_timings) / wall:.1f} req/s), "
+          f"errores: {dict(errors) or 0}")
+
+    params = {"rows": args.rows, "users": args.users, "iterations": args.iterations, "cache": not args.no_cache}
+    suite = 'http_no_cache' if args.no_cache else 'http'
+    sys.exit(report(args, suite, results, params))
+
+
+if __name__ == '__main__':
+    main()
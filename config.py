@@ -1,5 +1,6 @@
 # config.py
 import os
+import tempfile
 
 class Config:
     """Configuración base."""
@@ -8,20 +9,170 @@ class Config:
     TESTING = False
     DATA_FOLDER = os.environ.get('DATA_FOLDER', 'archive_categorized')
 
+    # --- Backend del warehouse ---
+    # 'databricks' o 'duckdb' (ficheros Parquet de DATA_FOLDER con las mismas consultas).
+    WAREHOUSE_BACKEND = os.environ.get('WAREHOUSE_BACKEND', 'databricks')
+    # Base de DuckDB donde se guardan las tablas resumen (':memory:' para no persistirlas).
+    DUCKDB_DATABASE = os.environ.get('DUCKDB_DATABASE', ':memory:')
+
+    # --- Análisis de ventas ---
+    # 'warehouse' agrega el top N en Databricks; 'pandas' descarga las tablas y agrega en memoria.
+    SALES_ANALYSIS_MODE = os.environ.get('SALES_ANALYSIS_MODE', 'warehouse')
+
+    # --- Instantánea de inventario ---
+    # Segundos durante los que se reutiliza el inventario calculado antes de volver a consultarlo.
+    INVENTORY_SNAPSHOT_TTL = int(os.environ.get('INVENTORY_SNAPSHOT_TTL', 300))
+    # Tras una recarga fallida se sigue sirviendo la instantánea anterior y no se reintenta antes de estos segundos.
+    INVENTORY_SNAPSHOT_RETRY_INTERVAL = int(os.environ.get('INVENTORY_SNAPSHOT_RETRY_INTERVAL', 30))
+
+    # --- Clasificación del estado de inventario (días de inventario) ---
+    INVENTORY_SALES_WINDOW_DAYS = int(os.environ.get('INVENTORY_SALES_WINDOW_DAYS', 30))
+    INVENTORY_RISK_DAYS = float(os.environ.get('INVENTORY_RISK_DAYS', 7))
+    INVENTORY_HIGH_ROTATION_DAYS = float(os.environ.get('INVENTORY_HIGH_ROTATION_DAYS', 30))
+    INVENTORY_SLOW_ROTATION_DAYS = float(os.environ.get('INVENTORY_SLOW_ROTATION_DAYS', 90))
+
+    # --- Previsión de demanda y reposición (app/services/demand_forecast.py) ---
+    # Días de ventas por producto que se descargan para estimar demanda, tendencia y variabilidad.
+    FORECAST_HISTORY_DAYS = int(os.environ.get('FORECAST_HISTORY_DAYS', 90))
+    # Días recientes con los que se calcula la demanda diaria.
+    FORECAST_RATE_WINDOW_DAYS = int(os.environ.get('FORECAST_RATE_WINDOW_DAYS', 28))
+    # Los quiebres previstos más allá de este horizonte no se informan.
+    FORECAST_HORIZON_DAYS = int(os.environ.get('FORECAST_HORIZON_DAYS', 365))
+    REORDER_LEAD_TIME_DAYS = float(os.environ.get('REORDER_LEAD_TIME_DAYS', 7))
+    # Días que debe cubrir cada pedido además del plazo de entrega.
+    REORDER_REVIEW_DAYS = float(os.environ.get('REORDER_REVIEW_DAYS', 14))
+    # Nivel de servicio del stock de seguridad (probabilidad de no quebrar durante el plazo de entrega).
+    REORDER_SERVICE_LEVEL = float(os.environ.get('REORDER_SERVICE_LEVEL', 0.95))
+
+    # --- Agregado local de ventas diarias (tendencia) ---
+    # Cada cuántos segundos se piden al warehouse los días nuevos.
+    SALES_TREND_REFRESH_INTERVAL = int(os.environ.get('SALES_TREND_REFRESH_INTERVAL', 300))
+
+    # --- Exportación PDF en segundo plano ---
+    PDF_EXPORT_WORKERS = int(os.environ.get('PDF_EXPORT_WORKERS', 2))
+    PDF_EXPORT_JOB_TTL = int(os.environ.get('PDF_EXPORT_JOB_TTL', 3600))
+    PDF_EXPORT_RESULT_TTL = int(os.environ.get('PDF_EXPORT_RESULT_TTL', 3600))
+    # A partir de cuántas filas el PDF se genera por bloques de tablas.
+    PDF_CHUNKED_THRESHOLD = int(os.environ.get('PDF_CHUNKED_THRESHOLD', 2000))
+    PDF_ROWS_PER_TABLE = int(os.environ.get('PDF_ROWS_PER_TABLE', 40))
+    # Bytes que el PDF se mantiene en memoria antes de volcarse a un fichero temporal.
+    PDF_SPOOL_MAX_MEMORY = int(os.environ.get('PDF_SPOOL_MAX_MEMORY', 8 * 1024 * 1024))
+
+    # --- Pool de conexiones a Databricks ---
+    DATABRICKS_POOL_MAX_SIZE = int(os.environ.get('DATABRICKS_POOL_MAX_SIZE', 4))
+    DATABRICKS_POOL_TIMEOUT = float(os.environ.get('DATABRICKS_POOL_TIMEOUT', 30))
+    DATABRICKS_POOL_PING_AFTER = float(os.environ.get('DATABRICKS_POOL_PING_AFTER', 300))
+    DATABRICKS_CONNECT_RETRIES = int(os.environ.get('DATABRICKS_CONNECT_RETRIES', 3))
+    DATABRICKS_CONNECT_BACKOFF = float(os.environ.get('DATABRICKS_CONNECT_BACKOFF', 0.5))
+    DATABRICKS_CONNECT_BACKOFF_MAX = float(os.environ.get('DATABRICKS_CONNECT_BACKOFF_MAX', 8))
+
+    # --- Warehouse lento o caído ---
+    # Plazo de cada consulta; al vencer se cancela en el warehouse. Menor que QUERY_FANOUT_DEADLINE
+    # para que el fallo llegue a tiempo de servir el último resultado correcto (0 = sin plazo).
+    WAREHOUSE_QUERY_TIMEOUT = float(os.environ.get('WAREHOUSE_QUERY_TIMEOUT', 20))
+    WAREHOUSE_BREAKER_ENABLED = os.environ.get('WAREHOUSE_BREAKER_ENABLED', 'true').lower() == 'true'
+    # Fallos seguidos que abren el circuito y segundos que permanece abierto antes de probar de nuevo.
+    WAREHOUSE_BREAKER_FAILURES = int(os.environ.get('WAREHOUSE_BREAKER_FAILURES', 5))
+    WAREHOUSE_BREAKER_RESET_TIMEOUT = float(os.environ.get('WAREHOUSE_BREAKER_RESET_TIMEOUT', 30))
+    # Último resultado correcto de cada consulta en disco, para servirlo si el warehouse falla.
+    LAST_KNOWN_GOOD_ENABLED = os.environ.get('LAST_KNOWN_GOOD_ENABLED', 'false').lower() == 'true'
+    LAST_KNOWN_GOOD_DIR = os.environ.get('LAST_KNOWN_GOOD_DIR',
+                                         os.path.join(tempfile.gettempdir(), 'tecnomundo_last_known_good'))
+    # Antigüedad máxima de un resultado que todavía se sirve en modo degradado.
+    LAST_KNOWN_GOOD_TTL = int(os.environ.get('LAST_KNOWN_GOOD_TTL', 86400))
+    LAST_KNOWN_GOOD_MAX_BYTES = int(os.environ.get('LAST_KNOWN_GOOD_MAX_BYTES', 1024 * 1024 * 1024))
+    # Segundos que se guardan en caché las respuestas e instantáneas hechas con datos antiguos.
+    DEGRADED_CACHE_TIMEOUT = int(os.environ.get('DEGRADED_CACHE_TIMEOUT', 30))
+
+    # --- Consultas en paralelo dentro de una petición ---
+    # Hilos para las consultas independientes (por defecto, el tamaño del pool de conexiones).
+    QUERY_EXECUTOR_WORKERS = int(os.environ.get('QUERY_EXECUTOR_WORKERS', 0)) or None
+    # Plazo en segundos de un fan-out; lo que no termina a tiempo se cancela.
+    QUERY_FANOUT_DEADLINE = float(os.environ.get('QUERY_FANOUT_DEADLINE', 25))
+
+    # --- Dimensión de productos en memoria ---
+    # Cada cuánto se sondea dim_products (filas y huella) para recargarla si ha cambiado.
+    PRODUCT_DIMENSION_PROBE_INTERVAL = int(os.environ.get('PRODUCT_DIMENSION_PROBE_INTERVAL', 300))
+    # Con más códigos de 'Servicio Tecnico' que este límite, las consultas vuelven a unir con dim_products.
+    PRODUCT_DIMENSION_MAX_EXCLUDED_CODES = int(os.environ.get('PRODUCT_DIMENSION_MAX_EXCLUDED_CODES', 1000))
+
+    # --- Instrumentación de consultas ---
+    # Las consultas que superan este tiempo (ejecución + conversión) se registran en el log de consultas lentas.
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 2000))
+    # Tipos compactos en los resultados (texto Arrow o categórico, enteros reducidos); ver app/utils/dtypes.py.
+    COMPACT_DTYPES = os.environ.get('COMPACT_DTYPES', 'true').lower() == 'true'
+
+    # --- Caché de resultados de consultas (app/utils/result_cache.py) ---
+    # Ficheros Arrow en disco local compartidos por los workers; sobreviven a los reinicios.
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'false').lower() == 'true'
+    RESULT_CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'tecnomundo_results'))
+    # Segundos durante los que un resultado guardado es válido.
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 300))
+    # Al superar este tamaño se borran los resultados usados hace más tiempo.
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+    # --- Compresión HTTP (gzip; también brotli si el paquete está instalado) ---
+    HTTP_COMPRESSION_ENABLED = os.environ.get('HTTP_COMPRESSION_ENABLED', 'true').lower() == 'true'
+    # Las respuestas más pequeñas se envían sin comprimir.
+    HTTP_COMPRESSION_MIN_SIZE = int(os.environ.get('HTTP_COMPRESSION_MIN_SIZE', 1024))
+    HTTP_GZIP_LEVEL = int(os.environ.get('HTTP_GZIP_LEVEL', 6))
+    HTTP_BROTLI_QUALITY = int(os.environ.get('HTTP_BROTLI_QUALITY', 5))
+
+    # --- Perfilado por petición (X-Profile: 1 o ?profile=1) ---
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'tecnomundo_profiles'))
+    # Número de perfiles que se conservan en disco; los más antiguos se borran.
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+
+    # --- Tablas resumen de la capa gold ---
+    # Las consultas calientes leen de las tablas resumen cuando existen.
+    SUMMARY_TABLES_ENABLED = os.environ.get('SUMMARY_TABLES_ENABLED', 'true').lower() == 'true'
+    # Segundos durante los que se reutiliza la comprobación de que las tablas existen.
+    SUMMARY_PROBE_TTL = int(os.environ.get('SUMMARY_PROBE_TTL', 300))
+    # Mantenimiento desde la API (requiere permisos de escritura en el esquema gold).
+    SUMMARY_REFRESH_ENABLED = os.environ.get('SUMMARY_REFRESH_ENABLED', 'false').lower() == 'true'
+    SUMMARY_REFRESH_INTERVAL = int(os.environ.get('SUMMARY_REFRESH_INTERVAL', 900))
+    SUMMARY_FULL_REFRESH_INTERVAL = int(os.environ.get('SUMMARY_FULL_REFRESH_INTERVAL', 86400))
+
     # --- Configuración del Caché ---
-    CACHE_TYPE = 'SimpleCache'
+    # Caché compartida entre workers: Redis si hay URL configurada; si no, sistema de archivos.
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or ('RedisCache' if CACHE_REDIS_URL else 'FileSystemCache')
+    CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'tecnomundo_cache'))
+    CACHE_THRESHOLD = int(os.environ.get('CACHE_THRESHOLD', 2000))
+    CACHE_KEY_PREFIX = 'tecnomundo:'
     CACHE_DEFAULT_TIMEOUT = 300
+    # Segundos tras la caducidad durante los que se sirve el valor anterior mientras se refresca.
+    CACHE_STALE_TTL = int(os.environ.get('CACHE_STALE_TTL', 600))
+    # Tiempo máximo que un worker retiene el candado de recálculo de una clave.
+    CACHE_LOCK_TIMEOUT = int(os.environ.get('CACHE_LOCK_TIMEOUT', 60))
+
+    # --- Precalentamiento de caché ---
+    CACHE_WARMER_ENABLED = os.environ.get('CACHE_WARMER_ENABLED', 'false').lower() == 'true'
+    # Debe ser menor que el timeout de las vistas cacheadas (300s) para que nunca caduquen.
+    CACHE_WARMER_INTERVAL = int(os.environ.get('CACHE_WARMER_INTERVAL', 240))
+    CACHE_WARMER_WORKERS = int(os.environ.get('CACHE_WARMER_WORKERS', 4))
+    # Máximo de refrescos (y por tanto de consultas al warehouse) simultáneos.
+    CACHE_WARMER_MAX_QUERIES = int(os.environ.get('CACHE_WARMER_MAX_QUERIES', 2))
 
 class DevelopmentConfig(Config):
     """Configuración para desarrollo."""
     DEBUG = True
 
+class TestingConfig(Config):
+    """Configuración para pruebas: Redis simulado en memoria con fakeredis."""
+    TESTING = True
+    CACHE_TYPE = 'app.utils.cache_backends.FakeRedisCache'
+
 class ProductionConfig(Config):
     """Configuración para producción."""
-    pass
+    CACHE_WARMER_ENABLED = os.environ.get('CACHE_WARMER_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    LAST_KNOWN_GOOD_ENABLED = os.environ.get('LAST_KNOWN_GOOD_ENABLED', 'true').lower() == 'true'
 
 config_by_name = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
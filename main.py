@@ -13,8 +13,11 @@ if os.path.exists(env_path):
 # Obtener el entorno de la variable de entorno, si no, usar 'default'
 config_name = os.getenv('FLASK_CONFIG') or 'default'
 
-# Crear la aplicación usando la factory
-app = create_app(config_name)
+# Crear la aplicación usando la factory. Los procesos de la exportación PDF (spawn)
+# vuelven a importar este módulo como '__mp_main__': no deben crear otra aplicación
+# ni arrancar sus hilos de fondo (precalentado de caché, tablas resumen).
+if __name__ != '__mp_main__':
+    app = create_app(config_name)
 
 if __name__ == '__main__':
     # Usar un puerto diferente a 5000 si es necesario
@@ -0,0 +1,26 @@
+# tests/conftest.py
+import pytest
+
+from app import create_app
+from app.extensions import cache, warehouse_breaker
+
+
+@pytest.fixture
+def app():
+    """Aplicación con la configuración de pruebas (caché en fakeredis vacía y cortocircuito cerrado)."""
+    app = create_app('testing')
+    with app.app_context():
+        cache.clear()
+    warehouse_breaker.reset()
+    yield app
+    warehouse_breaker.reset()
+
+
+@pytest.fixture(scope='session')
+def warehouse_data(tmp_path_factory):
+    """Carpeta con fact_sales y dim_products sintéticos (benchmarks.datagen) para el backend DuckDB."""
+    from benchmarks import datagen
+
+    folder = tmp_path_factory.mktemp('warehouse')
+    datagen.write_dataset(str(folder), rows=50_000, days=365)
+    return str(folder)
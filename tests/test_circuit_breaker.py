@@ -0,0 +1,89 @@
+# tests/test_circuit_breaker.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def fail(breaker, error=TimeoutError):
+    with pytest.raises(error):
+        with breaker.guard(failures=(TimeoutError,)):
+            raise TimeoutError('sin respuesta')
+
+
+def succeed(breaker):
+    with breaker.guard(failures=(TimeoutError,)):
+        pass
+
+
+def test_opens_after_consecutive_failures_and_rejects_calls(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    fail(breaker)
+    fail(breaker)
+    succeed(breaker)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as excinfo:
+        succeed(breaker)
+    assert excinfo.value.retry_after == pytest.approx(20)
+
+
+def test_half_open_trial_closes_the_circuit_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    fail(breaker)
+    clock.now += 30
+
+    with breaker.guard(failures=(TimeoutError,)):
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # Solo pasa una llamada de prueba a la vez.
+        with pytest.raises(CircuitOpenError):
+            succeed(breaker)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    succeed(breaker)
+
+
+def test_failed_half_open_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    fail(breaker)
+    fail(breaker)
+    clock.now += 31
+
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        succeed(breaker)
+    assert excinfo.value.retry_after == pytest.approx(30)
+
+
+def test_errors_from_a_responding_service_do_not_count(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ValueError):
+        with breaker.guard(failures=(TimeoutError,)):
+            raise ValueError('SQL no válido')
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.guard(failures=(TimeoutError,), ignore=(KeyboardInterrupt,)):
+            raise KeyboardInterrupt
+    assert breaker.state == CircuitBreaker.CLOSED
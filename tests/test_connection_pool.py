@@ -0,0 +1,61 @@
+# tests/test_connection_pool.py
+import pytest
+
+from app.utils.connection_pool import ConnectionPool, PoolConnectError, PoolTimeoutError
+from app.utils.duckdb_backend import DuckDBBackend
+from app.utils.warehouse_backend import WarehouseUnavailable
+
+
+def test_connect_failures_raise_after_the_retries():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        raise OSError("Conexión rechazada")
+
+    pool = ConnectionPool(connect, connect_retries=3, backoff_base=0.001, backoff_max=0.001)
+    with pytest.raises(PoolConnectError):
+        with pool.connection():
+            pass
+    assert len(attempts) == 3
+    assert pool.metrics()['in_use'] == 0
+
+
+class FlakyBackend(DuckDBBackend):
+    RETRYABLE_ERRORS = (ConnectionResetError,)
+
+    def __init__(self, data_folder, errors):
+        super().__init__(data_folder=data_folder)
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _fetch_arrow(self, query, params):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return super()._fetch_arrow(query, params)
+
+
+def test_a_single_retryable_error_is_retried(app, warehouse_data):
+    backend = FlakyBackend(warehouse_data, [ConnectionResetError("reset")])
+    with app.app_context():
+        assert not backend.get_product_dimension().empty
+    assert backend.calls == 2
+
+
+@pytest.mark.parametrize('cache', [True, False])
+@pytest.mark.parametrize('errors', [
+    [ConnectionResetError("reset"), ConnectionResetError("reset")],
+    [PoolTimeoutError("pool lleno")],
+    [PoolConnectError("sin conexión")],
+])
+def test_exhausted_retry_and_pool_failures_raise(app, warehouse_data, errors, cache):
+    backend = FlakyBackend(warehouse_data, errors)
+    with app.app_context(), pytest.raises(WarehouseUnavailable):
+        backend.execute_query("SELECT 1 AS x", label='test', cache=cache)
+
+
+def test_query_errors_in_probes_return_an_empty_frame(app, warehouse_data):
+    backend = DuckDBBackend(data_folder=warehouse_data)
+    with app.app_context():
+        assert backend.execute_query("SELECT * FROM tabla_inexistente", label='test', cache=False).empty
@@ -0,0 +1,56 @@
+# tests/test_demand_forecast.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.demand_forecast import build_demand_matrix, forecast_demand
+
+
+@pytest.fixture
+def matrix():
+    """Cinco productos × 30 días: constante, creciente, decreciente, sin ventas y ruidoso."""
+    days = np.arange(30, dtype='float64')
+    rng = np.random.default_rng(3)
+    return np.vstack([
+        np.full(30, 4.0),
+        1 + 0.5 * days,
+        np.clip(20 - 0.6 * days, 0, None),
+        np.zeros(30),
+        rng.poisson(6, 30).astype('float64'),
+    ]).astype('float32')
+
+
+def test_trend_rate_and_deviation_match_numpy_reference(matrix):
+    forecast = forecast_demand(matrix, stock=np.full(len(matrix), 50.0), rate_window_days=7)
+
+    days = np.arange(matrix.shape[1])
+    expected_trend = [np.polyfit(days, row.astype('float64'), 1)[0] for row in matrix]
+    np.testing.assert_allclose(forecast['tendencia_diaria'], expected_trend, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(forecast['demanda_diaria'], matrix[:, -7:].mean(axis=1), rtol=1e-6)
+    np.testing.assert_allclose(forecast['desviacion_diaria'], matrix.astype('float64').std(axis=1),
+                               rtol=1e-5, atol=1e-6)
+
+
+def test_days_to_stockout_solve_the_cumulative_demand(matrix):
+    stock = np.array([40.0, 100.0, 10.0, 5.0, 0.0])
+    forecast = forecast_demand(matrix, stock, rate_window_days=7, horizon_days=365)
+    rate, trend, days = forecast['demanda_diaria'], forecast['tendencia_diaria'], forecast['dias_hasta_quiebre']
+
+    # Constante: 40 unidades a 4/día son 10 días.
+    assert days[0] == pytest.approx(10.0)
+    # Con tendencia: la demanda acumulada hasta el quiebre iguala el stock.
+    assert rate[1] * days[1] + trend[1] * days[1] ** 2 / 2 == pytest.approx(stock[1])
+    # Sin ventas no hay quiebre; sin stock, ya está en quiebre.
+    assert np.isinf(days[3])
+    assert days[4] == 0.0
+    assert forecast['cantidad_reorden'][3] == 0
+
+
+def test_demand_matrix_places_units_by_days_ago():
+    daily = pd.DataFrame({
+        'codigo_producto': ['B', 'A', 'A', 'X', 'B'],
+        'dias_atras': [0, 2, 0, 1, 5],
+        'total_unidades': [3, 1, 2, 9, 4],
+    })
+    matrix = build_demand_matrix(daily, ['A', 'B'], history_days=4)
+    np.testing.assert_array_equal(matrix, [[0, 1, 0, 2], [0, 0, 0, 3]])
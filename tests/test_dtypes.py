@@ -0,0 +1,41 @@
+# tests/test_dtypes.py
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.utils.dtypes import frame_to_records, table_to_frame
+
+
+def test_records_write_nulls_and_non_finite_values_as_none(app):
+    # Como llega del warehouse: texto con nulos, categóricas con nulos y decimales con NaN.
+    table = pa.table({
+        'codigo_producto': pa.array([1, 2, 3], type=pa.int64()),
+        'nombre_del_producto': pa.array(['Mouse', None, 'Cable']),
+        'categoria': pa.array(['Audio', 'Audio', None]),
+        'stock_actual': pa.array([3.5, None, 1.0]),
+    })
+    with app.app_context():
+        df = table_to_frame(table)
+    df['demanda_diaria'] = [np.inf, 0.25, -np.inf]
+    df['fecha_quiebre'] = pd.Series(['2026-01-01', pd.NA, pd.NA], dtype=pd.StringDtype('pyarrow'))
+
+    records = frame_to_records(df)
+
+    assert records == [
+        {'codigo_producto': 1, 'nombre_del_producto': 'Mouse', 'categoria': 'Audio', 'stock_actual': 3.5,
+         'demanda_diaria': None, 'fecha_quiebre': '2026-01-01'},
+        {'codigo_producto': 2, 'nombre_del_producto': None, 'categoria': 'Audio', 'stock_actual': None,
+         'demanda_diaria': 0.25, 'fecha_quiebre': None},
+        {'codigo_producto': 3, 'nombre_del_producto': 'Cable', 'categoria': None, 'stock_actual': 1.0,
+         'demanda_diaria': None, 'fecha_quiebre': None},
+    ]
+    # Serializable como JSON estricto (sin NaN ni Infinity).
+    json.dumps(records, allow_nan=False, default=lambda value: value.item())
+
+
+def test_records_without_nulls_keep_their_values(app):
+    df = pd.DataFrame({'codigo_producto': np.array([1, 2], dtype='int16'), 'stock_actual': [0.0, 2.5]})
+    assert frame_to_records(df) == [{'codigo_producto': 1, 'stock_actual': 0.0},
+                                    {'codigo_producto': 2, 'stock_actual': 2.5}]
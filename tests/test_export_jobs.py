@@ -0,0 +1,62 @@
+# tests/test_export_jobs.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import export_jobs as export_jobs_module
+from app.services.export_jobs import JOB_DONE, ExportJobQueue
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    """Cola con un pool de hilos y un renderizado que espera a `release` para terminar."""
+    release = threading.Event()
+
+    def render_pdf(data, title):
+        release.wait(5)
+        return b'%PDF-' + title.encode()
+
+    monkeypatch.setattr(export_jobs_module, 'render_pdf', render_pdf)
+    queue = ExportJobQueue(app)
+    queue._executor = ThreadPoolExecutor(max_workers=4)
+    queue.release = release
+    yield queue
+    release.set()
+    queue.shutdown()
+
+
+def test_concurrent_submits_share_one_job(app, queue):
+    loads = []
+    barrier = threading.Barrier(4)
+    jobs = []
+
+    def load_data():
+        loads.append(1)
+        return [{"codigo_producto": "A"}]
+
+    def submit():
+        with app.app_context():
+            barrier.wait()
+            jobs.append(queue.submit({"statuses": ["Crítico"]}, 'v1', load_data, 'Informe'))
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert len({job['job_id'] for job in jobs}) == 1
+
+
+def test_finished_export_is_reused(app, queue):
+    with app.app_context():
+        job = queue.submit({"statuses": ["Crítico"]}, 'v1', lambda: [{"codigo_producto": "A"}], 'Informe')
+        queue.release.set()
+        queue._executor.shutdown(wait=True)
+        assert queue.get(job['job_id'])['status'] == JOB_DONE
+
+        again = queue.submit({"statuses": ["Crítico"]}, 'v1', lambda: pytest.fail('no debe recargar'), 'Informe')
+        assert again['cached'] and again['status'] == JOB_DONE
+        assert queue.get_result(again['job_id']) == b'%PDF-Informe'
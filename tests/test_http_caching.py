@@ -0,0 +1,62 @@
+# tests/test_http_caching.py
+import gzip
+
+import pytest
+
+from app.utils.view_cache import cached_view
+
+
+@pytest.fixture
+def client(app):
+    """Registra /cached (con cached_view) y /plain (sin caché), con cuerpos grandes y comprimibles."""
+    calls = {'cached': 0}
+
+    @app.route('/cached')
+    @cached_view(timeout=60)
+    def cached():
+        calls['cached'] += 1
+        return {"items": list(range(2000))}
+
+    @app.route('/plain')
+    def plain():
+        return {"items": list(range(2000))}
+
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+@pytest.mark.parametrize('path', ['/cached', '/plain'])
+def test_matching_if_none_match_returns_304_without_body(client, path):
+    first = client.get(path)
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag
+
+    second = client.get(path, headers={'If-None-Match': etag})
+
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+
+@pytest.mark.parametrize('path', ['/cached', '/plain'])
+def test_other_etag_returns_the_full_body(client, path):
+    response = client.get(path, headers={'If-None-Match': 'W/"otra-version"'})
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 2000
+
+
+def test_304_from_the_cache_does_not_run_the_view(client):
+    etag = client.get('/cached').headers['ETag']
+    client.get('/cached', headers={'If-None-Match': etag})
+    assert client.calls['cached'] == 1
+
+
+def test_same_etag_for_every_encoding(client):
+    plain = client.get('/cached', headers={'Accept-Encoding': 'identity'})
+    compressed = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] == plain.headers['ETag']
+    assert client.get('/cached', headers={'If-None-Match': plain.headers['ETag'],
+                                          'Accept-Encoding': 'gzip'}).status_code == 304
@@ -0,0 +1,80 @@
+# tests/test_inventory_index.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.inventory_index import InventoryIndex, normalize_inventory_filters
+
+STATUSES = ['Crítico', 'Riesgo', 'Saludable', 'Sobrestock']
+CATEGORIES = ['Audio', 'Cables', 'Gaming']
+
+
+@pytest.fixture(scope='module')
+def frame():
+    """Inventario sintético con nulos en categoría, stock y nombre."""
+    rng = np.random.default_rng(7)
+    size = 2_000
+    stock = rng.integers(0, 200, size).astype('float64')
+    stock[rng.random(size) < 0.05] = np.nan
+    category = pd.Series(rng.choice(CATEGORIES, size), dtype=object)
+    category[rng.random(size) < 0.05] = None
+    names = pd.Series([f"Producto {i} {rng.choice(['Cable', 'Auricular', 'Mando'])}" for i in range(size)], dtype=object)
+    names[rng.random(size) < 0.02] = None
+    return pd.DataFrame({
+        'codigo_producto': np.arange(size),
+        'nombre_del_producto': names,
+        'categoria': category,
+        'estado': pd.Categorical(rng.choice(STATUSES, size), categories=STATUSES),
+        'stock_actual': stock,
+        'unidades_vendidas_30d': rng.integers(0, 60, size),
+    })
+
+
+def expected_rows(frame: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Referencia: las mismas reglas con máscaras de pandas sobre el DataFrame."""
+    mask = pd.Series(True, index=frame.index)
+    if filters.get('statuses'):
+        mask &= frame['estado'].astype(object).isin(filters['statuses'])
+    if filters.get('categories'):
+        mask &= frame['categoria'].isin(filters['categories'])
+    for column, low, high in (('stock_actual', 'stock_min', 'stock_max'),
+                              ('unidades_vendidas_30d', 'sales_min', 'sales_max')):
+        if filters.get(low) is not None:
+            mask &= frame[column] >= filters[low]
+        if filters.get(high) is not None:
+            mask &= frame[column] <= filters[high]
+    if filters.get('name'):
+        mask &= frame['nombre_del_producto'].str.lower().str.contains(filters['name'].lower(), regex=False).fillna(False).astype(bool)
+    return frame[mask]
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'statuses': []},
+    {'categories': [], 'statuses': []},
+    {'name': ''},
+    {'name': '   '},
+    {'statuses': ['Crítico']},
+    {'statuses': ['Crítico', 'Riesgo'], 'categories': ['Audio']},
+    {'statuses': ['No existe']},
+    {'categories': ['Audio', 'Gaming']},
+    {'stock_min': 50},
+    {'stock_max': 20},
+    {'stock_min': 10, 'stock_max': 10},
+    {'sales_min': 5, 'sales_max': 30},
+    {'stock_min': 500},
+    {'name': 'cable'},
+    {'name': 'AURICULAR', 'statuses': ['Saludable'], 'stock_max': 100},
+    {'statuses': ['Sobrestock'], 'categories': ['Cables'], 'stock_min': 20, 'stock_max': 150,
+     'sales_min': 1, 'sales_max': 40, 'name': 'producto 1'},
+], ids=repr)
+def test_index_matches_pandas_masks(frame, filters):
+    normalized = normalize_inventory_filters(filters)
+    actual = InventoryIndex(frame).select(normalized)
+    expected = expected_rows(frame, normalized)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_empty_filters_return_the_whole_frame(frame):
+    index = InventoryIndex(frame)
+    assert index.select(normalize_inventory_filters({'statuses': [], 'name': ''})) is frame
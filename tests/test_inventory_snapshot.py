@@ -0,0 +1,96 @@
+# tests/test_inventory_snapshot.py
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.services import inventory_snapshot
+from app.services.inventory_snapshot import InventorySnapshot
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(inventory_snapshot, 'time', SimpleNamespace(time=clock.time, perf_counter=time.perf_counter))
+    return clock
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    def __call__(self):
+        self.calls += 1
+        return pd.DataFrame() if self.failing else pd.DataFrame({'codigo_producto': [1, 2]})
+
+
+def test_failed_refresh_backs_off_and_serves_the_previous_frame(app, clock):
+    app.config['INVENTORY_SNAPSHOT_RETRY_INTERVAL'] = 30
+    loader = Loader()
+    snapshot = InventorySnapshot(loader, ttl=300)
+    with app.app_context():
+        first = snapshot.get()
+        clock.now += 301
+        loader.failing = True
+
+        assert snapshot.get() is first
+        assert loader.calls == 2
+        # Dentro del intervalo de reintento no se vuelve a llamar al warehouse.
+        for _ in range(10):
+            assert snapshot.get() is first
+        assert loader.calls == 2
+
+        clock.now += 31
+        loader.failing = False
+        assert snapshot.get() is not first
+        assert loader.calls == 3
+
+
+def test_retry_interval_is_capped_by_the_ttl(app, clock):
+    app.config['INVENTORY_SNAPSHOT_RETRY_INTERVAL'] = 120
+    loader = Loader()
+    snapshot = InventorySnapshot(loader, ttl=10)
+    with app.app_context():
+        snapshot.get()
+        clock.now += 11
+        loader.failing = True
+        snapshot.get()
+        clock.now += 11
+        snapshot.get()
+        assert loader.calls == 3
+
+
+def test_invalidate_retries_immediately(app, clock):
+    loader = Loader()
+    snapshot = InventorySnapshot(loader, ttl=300)
+    with app.app_context():
+        snapshot.get()
+        clock.now += 301
+        loader.failing = True
+        snapshot.get()
+        snapshot.invalidate()
+        snapshot.get()
+        assert loader.calls == 3
+
+
+def test_versioned_read_pairs_the_frame_with_its_own_version(app, clock):
+    frames = iter([pd.DataFrame({'codigo_producto': [1, 2]}), pd.DataFrame({'codigo_producto': [3]})])
+    snapshot = InventorySnapshot(lambda: next(frames), ttl=300)
+    with app.app_context():
+        first, first_version = snapshot.get_versioned()
+        clock.now += 301
+        second, second_version = snapshot.get_versioned()
+
+    assert first['codigo_producto'].tolist() == [1, 2]
+    assert second['codigo_producto'].tolist() == [3]
+    assert first_version != second_version == snapshot.version
@@ -0,0 +1,42 @@
+# tests/test_pdf_service.py
+from reportlab.lib.styles import getSampleStyleSheet
+
+from app.services.pdf_service import STATUS_COLORS, PDFService, render_inventory_pdf
+
+STATUSES = ['Sin Stock', 'Sin Stock', 'Alta Rotación', 'Sin Stock', 'Lenta Rotación', 'Lenta Rotación', 'Otro']
+
+
+def rows():
+    # Ordenadas por ventas descendentes, como las pide quien exporta; estados mezclados.
+    return [{'nombre_del_producto': f'Producto {i}', 'stock_actual': 10.0, 'unidades_vendidas_30d': 100 - i,
+             'estado': status} for i, status in enumerate(STATUSES)]
+
+
+def test_chunked_tables_keep_the_input_order(app):
+    app.config['PDF_ROWS_PER_TABLE'] = 4
+    with app.app_context():
+        tables = PDFService()._build_chunked_tables(rows(), getSampleStyleSheet())
+
+    names = [cells[0] for table in tables for cells in table._cellvalues[1:]]
+    assert names == [f'Producto {i}' for i in range(len(STATUSES))]
+    assert [len(table._cellvalues) - 1 for table in tables] == [4, 3]
+
+
+def test_adjacent_rows_with_the_same_status_share_one_color_run(app):
+    app.config['PDF_ROWS_PER_TABLE'] = 40
+    with app.app_context():
+        table, = PDFService()._build_chunked_tables(rows(), getSampleStyleSheet())
+
+    runs = [(command[1][1], command[2][1], command[3]) for command in table._bkgrndcmds if command[1][1] > 0]
+    assert runs == [
+        (1, 2, STATUS_COLORS['Sin Stock']),
+        (3, 3, STATUS_COLORS['Alta Rotación']),
+        (4, 4, STATUS_COLORS['Sin Stock']),
+        (5, 6, STATUS_COLORS['Lenta Rotación']),
+    ]
+
+
+def test_chunked_pdf_renders(app):
+    app.config['PDF_CHUNKED_THRESHOLD'] = 1
+    with app.app_context():
+        assert render_inventory_pdf(rows(), 'Informe').startswith(b'%PDF-')
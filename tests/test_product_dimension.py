@@ -0,0 +1,53 @@
+# tests/test_product_dimension.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.product_dimension import ProductDimension
+
+DIM_PRODUCTS = pd.DataFrame({
+    'codigo_producto': [1, 2, 3, 4],
+    'nombre_del_producto': ['Mouse', 'Reparación', 'Teclado', 'Sin categoría'],
+    'categoria': ['Periféricos', 'Servicio Tecnico', 'Periféricos', None],
+})
+
+
+@pytest.mark.parametrize('dimension_codes, df_codes', [
+    ([1, 2, 3, 4], ['3', '1', '2', '9']),
+    (['1', '2', '3', '4'], np.array([3, 1, 2, 9], dtype='int64')),
+    ([1, 2, 3, 4], [3.0, 1.0, 2.0, np.nan]),
+])
+def test_attach_matches_codes_of_different_dtypes(dimension_codes, df_codes):
+    dimension = ProductDimension(DIM_PRODUCTS.assign(codigo_producto=dimension_codes))
+    df = pd.DataFrame({'codigo_producto': df_codes, 'stock_actual': [10, 20, 30, 40]})
+
+    attached = dimension.attach(df)
+
+    # Solo los productos con categoría y fuera de 'Servicio Tecnico', en el orden de df.
+    assert attached['stock_actual'].tolist() == [10, 20]
+    assert attached['nombre_del_producto'].tolist() == ['Teclado', 'Mouse']
+    assert attached['codigo_producto'].dtype == df['codigo_producto'].dtype
+
+
+def test_service_codes_keep_their_original_type():
+    dimension = ProductDimension(DIM_PRODUCTS)
+    assert dimension.service_codes == [2]
+    assert dimension.categories == ['Periféricos']
+
+
+def test_reload_bypasses_the_result_cache(app):
+    from app.services.product_dimension import ProductDimensionCache
+    from app.utils.result_cache import bypassing_results
+
+    seen = []
+
+    def loader():
+        seen.append(bypassing_results())
+        return DIM_PRODUCTS
+
+    signatures = iter([(4, 1.0), (4, 2.0)])
+    dimensions = ProductDimensionCache(loader, lambda: next(signatures), probe_interval=0)
+    with app.app_context():
+        dimensions.get()
+        dimensions.get()
+    assert seen == [True, True]
@@ -0,0 +1,40 @@
+# tests/test_profiling.py
+import contextvars
+import time
+
+from app.utils import profiling
+from app.utils.profiling import profile_stage
+from app.utils.query_executor import QueryExecutor
+
+
+def sleepy_query():
+    with profile_stage('warehouse'):
+        time.sleep(0.1)
+    return 1
+
+
+def profiled(fn):
+    """Ejecuta `fn` como una petición perfilada y devuelve sus etapas y su duración."""
+    def run():
+        profiling._stages.set({})
+        started = time.perf_counter()
+        fn()
+        return profiling._stages.get(), time.perf_counter() - started
+    return contextvars.copy_context().run(run)
+
+
+def test_fan_out_counts_its_wall_clock_time_once():
+    executor = QueryExecutor()
+    executor.max_workers = 4
+    try:
+        stages, total = profiled(lambda: executor.run_all({f"q{i}": sleepy_query for i in range(4)}))
+    finally:
+        executor.shutdown()
+
+    # Las cuatro consultas se solapan: la etapa no suma 4 × 0.1 s ni supera el total.
+    assert 0.1 <= stages['warehouse'] <= total < 0.3
+
+
+def test_sequential_stages_still_add_up():
+    stages, total = profiled(lambda: [sleepy_query(), sleepy_query()])
+    assert 0.2 <= stages['warehouse'] <= total
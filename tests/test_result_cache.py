@@ -0,0 +1,85 @@
+# tests/test_result_cache.py
+import os
+
+import pyarrow as pa
+import pytest
+
+from app.extensions import result_cache
+from app.utils.duckdb_backend import DuckDBBackend
+from app.utils.result_cache import QueryResultCache, fresh_results
+
+
+@pytest.fixture
+def enabled_result_cache(tmp_path):
+    previous = result_cache.directory, result_cache.enabled, result_cache.ttl
+    result_cache.directory, result_cache.enabled, result_cache.ttl = str(tmp_path), True, 300
+    result_cache.clear()
+    yield result_cache
+    result_cache.directory, result_cache.enabled, result_cache.ttl = previous
+
+
+def test_fresh_results_skips_the_lookup_but_refreshes_the_entry(app, warehouse_data, enabled_result_cache):
+    backend = DuckDBBackend(data_folder=warehouse_data)
+    with app.app_context():
+        backend.get_product_dimension()
+        hits = enabled_result_cache.stats()['hits']
+        backend.get_product_dimension()
+        assert enabled_result_cache.stats()['hits'] == hits + 1
+
+        writes = enabled_result_cache.stats()['writes']
+        with fresh_results():
+            assert not backend.get_product_dimension().empty
+        stats = enabled_result_cache.stats()
+        assert stats['hits'] == hits + 1
+        assert stats['writes'] == writes + 1
+
+
+def small_table(seed: int) -> pa.Table:
+    return pa.table({'codigo_producto': pa.array(range(seed, seed + 1000), type=pa.int64())})
+
+
+def backdate(cache: QueryResultCache, key: str, seconds: float, access_only: bool = False):
+    path = cache._path(key)
+    stat = os.stat(path)
+    atime = stat.st_atime - seconds
+    mtime = stat.st_mtime if access_only else stat.st_mtime - seconds
+    os.utime(path, (atime, mtime))
+
+
+def test_size_limit_evicts_the_least_recently_used_entries(tmp_path):
+    probe = QueryResultCache(directory=str(tmp_path / 'probe'), ttl=300)
+    size = os.stat(probe.put('probe', small_table(0))).st_size
+    cache = QueryResultCache(directory=str(tmp_path / 'cache'), ttl=300, max_bytes=int(size * 2.5))
+
+    for age, key in ((30, 'a'), (20, 'b')):
+        cache.put(key, small_table(0))
+        backdate(cache, key, age, access_only=True)
+    # Leer 'a' la convierte en la más reciente: la que sobra es 'b'.
+    assert cache.get('a') is not None
+    cache.put('c', small_table(1))
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2 and stats['bytes'] <= cache.max_bytes
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_expired_entries_miss_and_are_swept(tmp_path):
+    cache = QueryResultCache(directory=str(tmp_path), ttl=60)
+    cache.put('old', small_table(0))
+    cache.put('stale', small_table(1))
+    backdate(cache, 'old', 61)
+    backdate(cache, 'stale', 120)
+
+    assert cache.get('old') is None
+    assert cache.stats()['expired'] == 1
+    assert not os.path.exists(cache._path('old'))
+
+    # El siguiente recorrido (como mucho uno por TTL) borra los caducados que nadie ha pedido.
+    cache._swept_at -= 61
+    cache.put('new', small_table(2))
+    assert not os.path.exists(cache._path('stale'))
+    stats = cache.stats()
+    assert stats['entries'] == 1 and stats['evictions'] == 1
+    assert cache.get('new') is not None
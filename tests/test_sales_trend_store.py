@@ -0,0 +1,30 @@
+# tests/test_sales_trend_store.py
+import json
+
+import pandas as pd
+
+from app.services.sales_trend_store import SalesTrendStore
+
+
+def loader(since=None):
+    # Como la suma de una columna decimal en el warehouse: unidades en coma flotante.
+    return pd.DataFrame({
+        'fecha_venta': ['2026-01-01', '2026-01-01', '2026-01-03'],
+        'categoria': ['Audio', None, 'Audio'],
+        'total_unidades': [2.0, 1.0, 5.0],
+    })
+
+
+def test_range_units_are_integers_with_missing_days_at_zero(app):
+    store = SalesTrendStore(loader, refresh_interval=300)
+    with app.app_context():
+        assert store.ensure_fresh()
+        total = store.get_range('2025-12-31', '2026-01-04')
+        audio = store.get_range('2026-01-01', '2026-01-03', category='Audio')
+        missing = store.get_range('2026-01-01', '2026-01-02', category='Gaming')
+
+    assert total['unidades'].dtype == 'int64'
+    assert total['unidades'].tolist() == [0, 3, 0, 5, 0]
+    assert audio['unidades'].tolist() == [2, 0, 5]
+    assert missing['unidades'].dtype == 'int64' and missing['unidades'].tolist() == [0, 0]
+    assert json.dumps(total['unidades'].tolist()) == '[0, 3, 0, 5, 0]'
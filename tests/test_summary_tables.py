@@ -0,0 +1,95 @@
+# tests/test_summary_tables.py
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.utils.duckdb_backend import DuckDBBackend
+from app.utils.summary_tables import get_full_refresh_statements, get_incremental_refresh_statements
+from benchmarks.datagen import generate_sales_chunk
+
+
+@pytest.fixture
+def data_folder(warehouse_data, tmp_path):
+    # Copia propia: la prueba incremental añade ventas a fact_sales.
+    folder = tmp_path / 'warehouse'
+    shutil.copytree(warehouse_data, folder)
+    return str(folder)
+
+
+def hot_queries(backend) -> dict:
+    """Resultados de las consultas que leen de las tablas resumen cuando existen."""
+    date_range = backend.get_sales_date_range()
+    start, end = str(date_range['min_date'].iloc[0])[:10], str(date_range['max_date'].iloc[0])[:10]
+    return {
+        'inventory': backend.get_inventory_data(window_days=30),
+        'inventory_7d': backend.get_inventory_data(window_days=7),
+        'date_range': date_range,
+        'trend': backend.get_sales_trend_data(start, end),
+        'daily_by_category': backend.get_daily_sales_by_category(),
+        'daily_by_product': backend.get_daily_sales_by_product(90),
+        'last_sales_date': pd.DataFrame({'max_fecha': [backend.get_last_sales_date()]}),
+    }
+
+
+def assert_same_results(actual: dict, expected: dict):
+    for name, frame in expected.items():
+        assert not frame.empty, name
+        columns = sorted(frame.columns)
+        left = actual[name][columns].sort_values(columns).reset_index(drop=True)
+        right = frame[columns].sort_values(columns).reset_index(drop=True)
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, obj=name)
+
+
+def refresh(backend, statements):
+    for statement, params in statements:
+        backend.execute_statement(statement, params, label='summary_test_refresh')
+    backend.reset_summary_probe()
+
+
+def test_summary_tables_match_the_fact_table(app, data_folder):
+    with app.app_context():
+        backend = DuckDBBackend(data_folder=data_folder)
+        assert not backend.summary_tables_available()
+        expected = hot_queries(backend)
+
+        refresh(backend, get_full_refresh_statements())
+
+        assert backend.summary_tables_available()
+        assert_same_results(hot_queries(backend), expected)
+
+
+def test_incremental_refresh_picks_up_new_sales(app, data_folder):
+    with app.app_context():
+        backend = DuckDBBackend(data_folder=data_folder)
+        refresh(backend, get_full_refresh_statements())
+        last_day = backend.get_last_sales_date().normalize()
+
+        # Ventas nuevas del último día ya resumido y de los dos siguientes.
+        products = len(backend.get_product_dimension())
+        sales = generate_sales_chunk(300, products, 1, np.random.default_rng(11))
+        # Una marca de tiempo por fila: el último stock de cada producto no depende del orden.
+        sales['fecha'] = (last_day + pd.to_timedelta(np.arange(300) % 3, unit='D')
+                          + pd.to_timedelta(np.arange(300), unit='s') + pd.Timedelta(hours=12))
+        pq.write_table(pa.Table.from_pandas(sales, preserve_index=False),
+                       f"{data_folder}/fact_sales/part-new.parquet")
+
+        refresh(backend, get_incremental_refresh_statements(str(last_day.date())))
+
+        # Referencia: las mismas consultas sobre la tabla de hechos, sin tablas resumen.
+        app.config['SUMMARY_TABLES_ENABLED'] = False
+        expected = hot_queries(backend)
+        app.config['SUMMARY_TABLES_ENABLED'] = True
+        backend.reset_summary_probe()
+        assert backend.get_last_sales_date().normalize() == last_day + pd.Timedelta(days=2)
+        assert_same_results(hot_queries(backend), expected)
+
+
+def test_incremental_refresh_writes_each_table_in_one_statement():
+    # Sin DELETE + INSERT sueltos: un lector nunca ve los días recalculados vacíos.
+    statements = [statement for statement, _ in get_incremental_refresh_statements('2024-01-01')]
+    assert not any('DELETE FROM' in statement for statement in statements)
+    assert sum('MERGE INTO' in statement for statement in statements) == 3
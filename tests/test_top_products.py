@@ -0,0 +1,34 @@
+# tests/test_top_products.py
+import pandas as pd
+import pytest
+
+from app import create_app
+from app.services.dashboard_service import DashboardService
+from app.utils.duckdb_backend import DuckDBBackend
+from benchmarks import datagen
+from benchmarks.datagen import CATEGORIES
+
+
+@pytest.fixture(scope='module')
+def service(tmp_path_factory):
+    """Servicio sobre un warehouse DuckDB propio con ventas sintéticas (benchmarks.datagen)."""
+    folder = tmp_path_factory.mktemp('top_products')
+    datagen.write_dataset(str(folder), rows=50_000, days=365)
+    app = create_app('testing')
+    with app.app_context():
+        yield DashboardService(connector=DuckDBBackend(data_folder=str(folder)))
+
+
+@pytest.mark.parametrize('category', [None, 'all'] + CATEGORIES[:-1])
+@pytest.mark.parametrize('top_n', [1, 5, 200])
+def test_warehouse_and_pandas_modes_agree(service, category, top_n):
+    warehouse = service.get_top_products_frame(category, top_n, mode='warehouse')
+    in_memory = service.get_top_products_frame(category, top_n, mode='pandas')
+
+    assert 0 < len(warehouse) <= top_n
+    pd.testing.assert_frame_equal(warehouse, in_memory, check_dtype=False)
+
+
+def test_service_category_is_excluded(service):
+    assert service.get_top_products_frame('Servicio Tecnico', 10, mode='warehouse').empty
+    assert service.get_top_products_frame('Servicio Tecnico', 10, mode='pandas').empty
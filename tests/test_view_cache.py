@@ -0,0 +1,99 @@
+# tests/test_view_cache.py
+import threading
+import time
+
+import pytest
+
+from app.extensions import cache
+from app.utils.view_cache import cached_view
+
+
+@pytest.fixture
+def counted_view(app):
+    """Registra /counted, cacheada con cached_view, y devuelve cuántas veces se ejecuta."""
+    calls = {'count': 0}
+
+    @app.route('/counted')
+    @cached_view(timeout=60, query_string=True)
+    def counted():
+        calls['count'] += 1
+        time.sleep(0.05)
+        return {"calls": calls['count']}
+
+    return calls
+
+
+def test_second_request_is_served_from_cache(app, counted_view):
+    client = app.test_client()
+    first = client.get('/counted')
+    second = client.get('/counted')
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json() == {"calls": 1}
+    assert counted_view['count'] == 1
+
+
+def test_query_string_is_part_of_the_key(app, counted_view):
+    client = app.test_client()
+    client.get('/counted?a=1')
+    client.get('/counted?a=2')
+    client.get('/counted?a=1')
+    assert counted_view['count'] == 2
+
+
+def test_etag_revalidation_returns_304(app, counted_view):
+    client = app.test_client()
+    etag = client.get('/counted').headers['ETag']
+    response = client.get('/counted', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_concurrent_misses_compute_once(app, counted_view):
+    app.config['CACHE_LOCK_POLL_INTERVAL'] = 0.01
+    bodies = []
+
+    def request():
+        bodies.append(app.test_client().get('/counted').get_json())
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counted_view['count'] == 1
+    assert bodies == [{"calls": 1}] * 5
+
+
+def test_expired_entry_is_served_while_refreshing(app):
+    calls = {'count': 0}
+
+    @app.route('/expiring')
+    @cached_view(timeout=0)
+    def expiring():
+        calls['count'] += 1
+        return {"calls": calls['count']}
+
+    client = app.test_client()
+    assert client.get('/expiring').get_json() == {"calls": 1}
+    # Caducada: se sirve la anterior y se refresca en segundo plano.
+    assert client.get('/expiring').get_json() == {"calls": 1}
+    deadline = time.monotonic() + 5
+    body = None
+    while time.monotonic() < deadline:
+        body = client.get('/expiring').get_json()
+        if body != {"calls": 1}:
+            break
+        time.sleep(0.01)
+    assert body == {"calls": 2}
+
+
+def test_backend_outage_falls_through_to_the_view(app, counted_view, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("Redis no responde")
+
+    for method in ('get', 'set', 'add', 'delete'):
+        monkeypatch.setattr(cache, method, unavailable)
+    client = app.test_client()
+    first = client.get('/counted')
+    second = client.get('/counted')
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == {"calls": 2}
@@ -0,0 +1,63 @@
+# tests/test_warehouse_unavailable.py
+import pytest
+
+from app.services.dashboard_service import DashboardService
+from app.utils.duckdb_backend import DuckDBBackend
+from app.utils.staleness import STALE_HEADER
+from app.utils.warehouse_backend import QueryTimeoutError
+
+ENDPOINTS = [
+    '/api/data/inventory_analysis',
+    '/api/data/sales_analysis',
+    '/api/categories',
+    '/api/reports/inventory_health',
+    '/api/reports/sales_date_range',
+    '/api/reports/sales_trend?start_date=2023-06-01&end_date=2023-06-30',
+]
+
+
+@pytest.fixture
+def backend(app, warehouse_data):
+    backend = DuckDBBackend(data_folder=warehouse_data)
+    app.extensions['dashboard_service'] = DashboardService(connector=backend)
+    return backend
+
+
+def take_warehouse_down(backend):
+    def timeout(query, params):
+        raise QueryTimeoutError("Plazo superado.")
+
+    backend._fetch_arrow = timeout
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def test_outage_without_last_known_good_is_a_503(app, backend, url):
+    take_warehouse_down(backend)
+    response = app.test_client().get(url)
+    assert response.status_code == 503
+    assert response.get_json()['error'] == "Servicio no disponible"
+
+
+def test_outage_is_not_cached(app, backend):
+    client = app.test_client()
+    fetch = backend._fetch_arrow
+    take_warehouse_down(backend)
+    assert client.get('/api/categories').status_code == 503
+    backend._fetch_arrow = fetch
+    response = client.get('/api/categories')
+    assert response.status_code == 200
+    assert response.get_json()
+
+
+def test_inventory_keeps_the_previous_snapshot_during_an_outage(app, backend):
+    client = app.test_client()
+    healthy = client.get('/api/data/inventory_analysis')
+    assert healthy.status_code == 200
+
+    take_warehouse_down(backend)
+    app.extensions['dashboard_service'].inventory_snapshot.invalidate()
+    response = client.get('/api/data/inventory_analysis?limit=5')
+
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 5
+    assert response.headers[STALE_HEADER] == 'inventory_snapshot'